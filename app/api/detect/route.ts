@@ -0,0 +1,14 @@
+import { NextResponse } from "next/server"
+import { getRegistryStats } from "@/lib/geminiRegistry"
+
+// Frames are analyzed by /api/detect/stream. This route only reports the
+// per-process registry counters, and only in development: model handles and
+// the prompt cache should be created once, `cachedPromptTokens` should track
+// `promptTokens` closely, and with structured output
+// `parseFallbacks`/`parseFailures` should stay at zero.
+export async function GET() {
+  if (process.env.NODE_ENV !== "development") {
+    return new NextResponse(null, { status: 404 })
+  }
+  return NextResponse.json(getRegistryStats())
+}
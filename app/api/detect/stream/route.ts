@@ -0,0 +1,51 @@
+import { NextResponse } from "next/server"
+import { streamEventsFromFrames } from "@/lib/eventDetection"
+import { parseFramePayload } from "@/lib/framePayload"
+
+// Receives raw JPEG frames as multipart form data (see lib/frameTransport.ts)
+// so the browser never has to base64-encode them; several `frame` fields (with
+// matching `offsetMs` fields) form one batch. Responds with NDJSON: one
+// {"type":"event","event":{...}} line per event as soon as the model has
+// produced it, then a final {"type":"done",...} (or {"type":"error",...}) line.
+export async function POST(request: Request) {
+  const payload = await parseFramePayload(request)
+  if (!payload.ok) {
+    return NextResponse.json({ error: payload.error }, { status: payload.status })
+  }
+
+  const encoder = new TextEncoder()
+  const messages = streamEventsFromFrames(payload.frames, payload.transcript, {
+    signal: request.signal,
+    localSignals: payload.localSignals,
+    layout: payload.layout,
+  })
+
+  const body = new ReadableStream<Uint8Array>({
+    async pull(controller) {
+      try {
+        const { value, done } = await messages.next()
+        if (done) {
+          controller.close()
+          return
+        }
+        controller.enqueue(encoder.encode(JSON.stringify(value) + "\n"))
+      } catch (error) {
+        console.error("Error streaming frame analysis:", error)
+        if (!request.signal.aborted) {
+          controller.enqueue(encoder.encode(JSON.stringify({ type: "error", error: "Error analyzing frame" }) + "\n"))
+        }
+        controller.close()
+      }
+    },
+    async cancel() {
+      await messages.return(undefined)
+    },
+  })
+
+  return new Response(body, {
+    headers: {
+      "Content-Type": "application/x-ndjson",
+      "Cache-Control": "no-cache",
+    },
+  })
+}
@@ -1,97 +1,191 @@
 "use client"
 
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { createPortal } from 'react-dom';
 import { cn } from "../../lib/utils"
+import { useSessionSelector, type SessionEventStore, type SessionSnapshot } from "../../lib/sessionEventStore"
+import { IntervalLog, TimelineBins } from "../../lib/timelineIndex"
+
+interface TimelineEvent {
+  startTime: number;
+  endTime: number;
+  type: 'normal' | 'warning';
+  label: string;
+}
 
 interface TimelineProps {
-  events: {
-    startTime: number;
-    endTime: number;
-    type: 'normal' | 'warning';
-    label: string;
-  }[];
+  store: SessionEventStore;
   totalDuration: number;
   currentTime?: number;
 }
 
-export function Timeline({ events, totalDuration, currentTime = 0 }: TimelineProps) {
+// Events are drawn as 3 s spans
+const EVENT_DURATION_SEC = 3;
+const HEIGHT = 96;
+const MARKERS = 14;
+// Hover reaches events within this many pixels of the pointer
+const HOVER_SLOP_PX = 3;
+const COLORS = {
+  track: '#4b5563',
+  marker: '#6b7280',
+  normal: '#3b82f6',
+  warning: '#ef4444',
+  playhead: '#ffffff',
+};
+
+const selectVersion = (snapshot: SessionSnapshot) => snapshot.version;
+
+function toTimelineEvent(store: SessionEventStore, index: number): TimelineEvent | null {
+  const event = store.events.get(index);
+  if (!event) return null;
+  return {
+    startTime: event.seconds,
+    endTime: event.seconds + EVENT_DURATION_SEC,
+    type: event.isDangerous ? 'warning' : 'normal',
+    label: event.description,
+  };
+}
+
+// Sizes a canvas to its CSS box at device resolution; returns a context in CSS pixels
+function prepareCanvas(canvas: HTMLCanvasElement, width: number): CanvasRenderingContext2D | null {
+  const ratio = window.devicePixelRatio || 1;
+  const pixelWidth = Math.round(width * ratio);
+  const pixelHeight = Math.round(HEIGHT * ratio);
+  if (canvas.width !== pixelWidth || canvas.height !== pixelHeight) {
+    canvas.width = pixelWidth;
+    canvas.height = pixelHeight;
+  }
+  const context = canvas.getContext('2d');
+  if (!context) return null;
+  context.setTransform(ratio, 0, 0, ratio, 0, 0);
+  context.clearRect(0, 0, width, HEIGHT);
+  return context;
+}
+
+// Canvas timeline. Events are binned into fixed time buckets
+// (lib/timelineIndex.ts) and drawn as column bars whose height grows with
+// density, so the cost depends on the width rather than the event count; the
+// growing duration while recording only re-bins when it doubles. The playhead
+// has its own canvas and redraws alone when `currentTime` changes; hover is
+// hit-tested with an interval index that new events are appended to.
+export function Timeline({ store, totalDuration, currentTime = 0 }: TimelineProps) {
+  const version = useSessionSelector(store, selectVersion);
+  const containerRef = useRef<HTMLDivElement>(null);
+  const eventsCanvasRef = useRef<HTMLCanvasElement>(null);
+  const playheadCanvasRef = useRef<HTMLCanvasElement>(null);
+  const [bins] = useState(() => new TimelineBins());
+  const [hoverIndex] = useState(() => new IntervalLog());
+  const [width, setWidth] = useState(0);
   const [hoveredEvent, setHoveredEvent] = useState<{
-    event: TimelineProps['events'][0],
+    event: TimelineEvent,
+    more: number,
     position: { x: number, y: number }
   } | null>(null);
-  return (
-    <>
-      <div className="w-full overflow-hidden">
-        <div className="relative w-full h-24 bg-gray-800 overflow-x-auto">
-          <div className="absolute w-full min-w-full">
-            {/* Timeline base */}
-            <div className="absolute top-1/2 left-0 w-full h-1 bg-gray-600 transform -translate-y-1/2">
-              {/* Time markers */}
-              {Array.from({ length: 14 }).map((_, i) => (
-                <div
-                  key={i}
-                  className="absolute h-3 w-px bg-gray-500"
-                  style={{
-                    left: `${(i / 13) * 100}%`,
-                    top: '50%',
-                    transform: 'translateY(-50%)',
-                  }}
-                >
-                  <span className="absolute -bottom-6 left-1/2 transform -translate-x-1/2 text-xs text-gray-400 whitespace-nowrap">
-                    {Math.floor((i / 13) * totalDuration)}s
-                  </span>
-                </div>
-              ))}
-            </div>
 
-            {/* Events */}
-            {events.map((event, index) => {
-              const startPercentage = (event.startTime / totalDuration) * 100;
-              const duration = ((event.endTime - event.startTime) / totalDuration) * 100;
-              
-              return (
-                <div
-                  key={index}
-                  className={cn(
-                    "absolute h-2 rounded-full cursor-pointer",
-                    event.type === 'warning' ? 'bg-red-500 hover:bg-red-400' : 'bg-blue-500 hover:bg-blue-400'
-                  )}
-                  style={{
-                    left: `${startPercentage}%`,
-                    width: `${duration}%`,
-                    top: '50%',
-                    transform: 'translateY(-50%)',
-                  }}
-                  onMouseEnter={(e) => {
-                    const rect = e.currentTarget.getBoundingClientRect();
-                    setHoveredEvent({
-                      event,
-                      position: {
-                        x: rect.left + (rect.width / 2),
-                        y: rect.top - 20
-                      }
-                    });
-                  }}
-                  onMouseLeave={() => setHoveredEvent(null)}
-                >
+  useEffect(() => {
+    const element = containerRef.current;
+    if (!element) return;
+    const observer = new ResizeObserver(() => setWidth(element.clientWidth));
+    observer.observe(element);
+    return () => observer.disconnect();
+  }, []);
 
-                </div>
-              );
-            })}
+  // Event layer: bin and index new events (all of them when the bucket span
+  // doubled or the list was cleared) and redraw
+  useEffect(() => {
+    const count = store.events.length;
+    if (hoverIndex.size > count) hoverIndex.clear();
+    for (let i = hoverIndex.size; i < count; i++) {
+      const event = store.events.get(i)!;
+      hoverIndex.add({ start: event.seconds, end: event.seconds + EVENT_DURATION_SEC });
+    }
 
-            {/* Current time indicator */}
-            {currentTime > 0 && (
-              <div
-                className="absolute w-0.5 h-8 bg-white"
-                style={{
-                  left: `${(currentTime / totalDuration) * 100}%`,
-                  top: '50%',
-                  transform: 'translateY(-50%)',
-                }}
-              />
-            )}
-          </div>
+    const canvas = eventsCanvasRef.current;
+    if (!canvas || width === 0) return;
+    const columns = Math.round(width);
+    if (bins.needsReset(totalDuration, columns) || bins.added > count) {
+      bins.reset(totalDuration, columns);
+    }
+    for (let i = bins.added; i < count; i++) {
+      const event = store.events.get(i)!;
+      bins.add(event.seconds, event.seconds + EVENT_DURATION_SEC, event.isDangerous);
+    }
+
+    const context = prepareCanvas(canvas, width);
+    if (!context) return;
+    const middle = HEIGHT / 2;
+    context.fillStyle = COLORS.track;
+    context.fillRect(0, middle - 2, width, 4);
+    context.fillStyle = COLORS.marker;
+    for (let i = 0; i < MARKERS; i++) {
+      context.fillRect(Math.min(width - 1, (i / (MARKERS - 1)) * width), middle - 6, 1, 12);
+    }
+    const logMax = Math.log2(bins.maxDensity + 1);
+    bins.project(columns, totalDuration, (column, density, warnings) => {
+      // 8 px for a single event, up to 32 px for the densest column
+      const height = 8 + (logMax > 1 ? (24 * (Math.log2(density + 1) - 1)) / (logMax - 1) : 0);
+      context.fillStyle = warnings > 0 ? COLORS.warning : COLORS.normal;
+      context.fillRect(column, middle - height / 2, 1, height);
+    });
+  }, [store, bins, hoverIndex, version, totalDuration, width]);
+
+  // Playhead layer
+  useEffect(() => {
+    const canvas = playheadCanvasRef.current;
+    if (!canvas || width === 0) return;
+    const context = prepareCanvas(canvas, width);
+    if (!context || currentTime <= 0) return;
+    context.fillStyle = COLORS.playhead;
+    context.fillRect(Math.min(width - 2, (currentTime / totalDuration) * width), HEIGHT / 2 - 16, 2, 32);
+  }, [currentTime, totalDuration, width]);
+
+  const handleMouseMove = (e: React.MouseEvent<HTMLDivElement>) => {
+    const rect = e.currentTarget.getBoundingClientRect();
+    const x = e.clientX - rect.left;
+    const y = e.clientY - rect.top;
+    if (rect.width === 0 || Math.abs(y - HEIGHT / 2) > 16) {
+      setHoveredEvent(null);
+      return;
+    }
+    const secondsPerPixel = totalDuration / rect.width;
+    const time = x * secondsPerPixel;
+    const hits = hoverIndex.query(time - HOVER_SLOP_PX * secondsPerPixel, time + HOVER_SLOP_PX * secondsPerPixel);
+    const event = hits.length > 0 ? toTimelineEvent(store, hits[0]) : null;
+    if (!event) {
+      setHoveredEvent(null);
+      return;
+    }
+    setHoveredEvent({
+      event,
+      more: hits.length - 1,
+      position: {
+        x: e.clientX,
+        y: rect.top + HEIGHT / 2 - 20
+      }
+    });
+  };
+
+  return (
+    <>
+      <div className="w-full overflow-hidden">
+        <div
+          ref={containerRef}
+          className="relative w-full h-24 bg-gray-800 cursor-pointer"
+          onMouseMove={handleMouseMove}
+          onMouseLeave={() => setHoveredEvent(null)}
+        >
+          <canvas ref={eventsCanvasRef} className="absolute inset-0 w-full h-full" />
+          <canvas ref={playheadCanvasRef} className="absolute inset-0 w-full h-full pointer-events-none" />
+          {/* Time marker labels */}
+          {Array.from({ length: MARKERS }).map((_, i) => (
+            <span
+              key={i}
+              className="absolute top-1/2 mt-3 text-xs text-gray-400 whitespace-nowrap transform -translate-x-1/2 pointer-events-none"
+              style={{ left: `${(i / (MARKERS - 1)) * 100}%` }}
+            >
+              {Math.floor((i / (MARKERS - 1)) * totalDuration)}s
+            </span>
+          ))}
         </div>
       </div>
       {hoveredEvent && typeof window !== 'undefined' && createPortal(
@@ -101,13 +195,14 @@ export function Timeline({ events, totalDuration, currentTime = 0 }: TimelinePro
             left: `${hoveredEvent.position.x}px`,
             top: `${hoveredEvent.position.y}px`,
             transform: 'translate(-50%, -100%)'
-          }}  
+          }}
         >
           <div className="font-medium text-sm mb-1.5">{hoveredEvent.event.label}</div>
           <div className="text-gray-300 text-xs flex justify-between items-center">
             <span>
               Time: {Math.floor(hoveredEvent.event.startTime / 60)}:
               {String(Math.floor(hoveredEvent.event.startTime % 60)).padStart(2, '0')}
+              {hoveredEvent.more > 0 && ` (+${hoveredEvent.more} more)`}
             </span>
             <span className={cn(
               "px-2 py-0.5 rounded",
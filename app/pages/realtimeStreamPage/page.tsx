@@ -1,87 +1,131 @@
 "use client"
 
 import type React from "react"
-import { useState, useRef, useEffect } from "react"
+import { Profiler, useState, useRef, useEffect } from "react"
 import Image from "next/image"
 import { Camera, StopCircle, PlayCircle, Save, Loader2 } from "lucide-react"
 import { Progress } from "@/components/ui/progress"
 import { Button } from "@/components/ui/button"
 import { Input } from "@/components/ui/input"
 import TimestampList from "@/components/timestamp-list"
+import DetectionStatus from "@/components/detection-status"
+import SchedulerStatus from "@/components/scheduler-status"
+import TranscriptText from "@/components/transcript-text"
+import RecordingReview from "@/components/recording-review"
 import { Timeline } from "../../components/Timeline"
 import type { Timestamp } from "@/app/types"
-import { detectEvents, type VideoEvent } from "./actions"
-
-// Dynamically import TensorFlow.js and models
-import type * as blazeface from '@tensorflow-models/blazeface'
-import type * as posedetection from '@tensorflow-models/pose-detection'
-import type * as tf from '@tensorflow/tfjs'
-
-let tfjs: typeof tf
-let blazefaceModel: typeof blazeface
-let poseDetection: typeof posedetection
+import type { VideoEvent } from "./actions"
+import { encodeCanvasJpeg, streamFrames } from "@/lib/frameTransport"
+import { FrameBatcher, type BufferedFrame } from "@/lib/frameBatcher"
+import type { DetectionResult } from "@/lib/eventDetection"
+import { FrameSequencer, type FrameTicket } from "@/lib/frameSequencer"
+import { StrikeTracker, type StrikeEvent } from "@/lib/strikeTracker"
+import { FrameGate, HASH_SIZE, averageHash, type GateFace, type GateSample } from "@/lib/frameGate"
+import { AnalysisScheduler, ANALYSIS_MODES, GATE_MAX_STALENESS_MS, SUPERSEDED, type AnalysisOutcome } from "@/lib/analysisScheduler"
+import { createVisionClient, InlineVisionClient, type VisionClient } from "@/lib/visionClient"
+import { VisionStore } from "@/lib/visionStore"
+import { GazeMonitor } from "@/lib/gazeEstimator"
+import { ObjectSignalMonitor } from "@/lib/objectSignals"
+import { DetectionRateController } from "@/lib/detectionRateController"
+import { MOSAIC_LAYOUT, drawMosaic } from "@/lib/roiMosaic"
+import { TranscriptStore } from "@/lib/transcriptStore"
+import { SessionEventStore, useSessionSelector, type SessionSnapshot } from "@/lib/sessionEventStore"
+import { RecordingWriter, deleteRecording, discardUnsavedRecordings, nameRecording, recoverInterruptedRecordings, type RecordingManifest } from "@/lib/recordingStore"
+import type { FrameLayout } from "@/lib/detectionPrompt"
+import { DEFAULT_VISION_OPTIONS, type VisionInitTimings } from "@/lib/visionPipeline"
+import { FrameTimeMonitor, PAGE_RENDER_BUDGET_PER_SEC, type FrameTimeSummary } from "@/lib/frameTimeMonitor"
 
 interface SavedVideo {
   id: string
   name: string
-  url: string
-  thumbnailUrl: string
+  /** Recording in IndexedDB, see lib/recordingStore.ts */
+  sessionId: string
   timestamps: Timestamp[]
 }
 
-interface Keypoint {
-  x: number
-  y: number
-  score?: number
-  name?: string
+// A detection response plus the capture time of each frame it covered
+interface AnalysisResponse {
+  result: DetectionResult
+  frameTimes: number[]
 }
 
-interface FacePrediction {
-  topLeft: [number, number] | tf.Tensor1D
-  bottomRight: [number, number] | tf.Tensor1D
-  landmarks?: Array<[number, number]> | tf.Tensor2D
-  probability: number | tf.Tensor1D
-}
+const selectHasEvents = (snapshot: SessionSnapshot) => snapshot.eventCount > 0
+const selectStrikeCount = (snapshot: SessionSnapshot) => snapshot.strikeCount
+
+// Face boxes older than this (detection paused or stalled) fall back to the full frame
+const FACE_CROP_MAX_AGE_MS = 1000
 
 export default function Page() {
   // States
   const [isRecording, setIsRecording] = useState(false)
-  const [timestamps, setTimestamps] = useState<Timestamp[]>([])
   const [analysisProgress, setAnalysisProgress] = useState(0)
   const [error, setError] = useState<string | null>(null)
   const [isInitializing, setIsInitializing] = useState(true)
-  const [strikeCount, setStrikeCount] = useState(0)
-  const [strikeHistory, setStrikeHistory] = useState<Array<{time: string, reason: string}>>([])
   const [hasShownCheatingAlert, setHasShownCheatingAlert] = useState(false)
   const [currentTime, setCurrentTime] = useState(0)
   const [videoDuration, setVideoDuration] = useState(0)
   const [initializationProgress, setInitializationProgress] = useState<string>('')
-  const [transcript, setTranscript] = useState('')
   const [isTranscribing, setIsTranscribing] = useState(false)
   const [analysisMode, setAnalysisMode] = useState<'demo' | 'normal' | 'conservative'>('normal')
-  const [videoName, setVideoName] = useState('')
-  const [recordedVideoUrl, setRecordedVideoUrl] = useState<string | null>(null)
+  // Finished recording of this page, offered for saving
+  const [recordedSessionId, setRecordedSessionId] = useState<string | null>(null)
+  // Recordings cut off by a crashed or closed tab; kept until saved or discarded
+  const [recoveredRecordings, setRecoveredRecordings] = useState<RecordingManifest[]>([])
   const [mlModelsReady, setMlModelsReady] = useState(false)
-  const [lastPoseKeypoints, setLastPoseKeypoints] = useState<Keypoint[]>([])
   const [isClient, setIsClient] = useState(false)
+  const [batchFrames, setBatchFrames] = useState(false)
+  const [objectDetection, setObjectDetection] = useState(false)
+  const [faceCrop, setFaceCrop] = useState(false)
+  const [frameTimeSummary, setFrameTimeSummary] = useState<FrameTimeSummary | null>(null)
 
-  // Refs
+  // Refs. Long-lived helpers below use a lazy useState initializer so they
+  // are constructed once, not on every render
   const videoRef = useRef<HTMLVideoElement>(null)
   const canvasRef = useRef<HTMLCanvasElement>(null)
   const mediaStreamRef = useRef<MediaStream | null>(null)
-  const analysisIntervalRef = useRef<NodeJS.Timeout | null>(null)
+  const schedulerRef = useRef<AnalysisScheduler | null>(null)
   const detectionFrameRef = useRef<number | null>(null)
-  const lastDetectionTime = useRef<number>(0)
+  // Detection interval and input resolution, adapted to measured inference cost
+  const [detectionRate] = useState(() => new DetectionRateController(DEFAULT_VISION_OPTIONS.inputWidth))
   const lastFrameTimeRef = useRef<number>(performance.now())
   const startTimeRef = useRef<Date | null>(null)
-  const faceModelRef = useRef<blazeface.BlazeFaceModel | null>(null)
-  const poseModelRef = useRef<posedetection.PoseDetector | null>(null)
+  // Face/pose inference, in a worker that owns the overlay canvas
+  const visionClientRef = useRef<VisionClient | null>(null)
+  const visionDisposeTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null)
+  // Frame-time instrumentation, enabled with ?perf=1
+  const frameTimeMonitorRef = useRef<FrameTimeMonitor | null>(null)
   const recognitionRef = useRef<SpeechRecognition | null>(null)
+  // Final speech results with timestamps; requests take a window of it
+  const [transcriptStore] = useState(() => new TranscriptStore())
+  // When the recognizer first reported the utterance it has not finalized yet
+  const speechStartedAtRef = useRef<number | null>(null)
   const mediaRecorderRef = useRef<MediaRecorder | null>(null)
-  const recordedChunksRef = useRef<Blob[]>([])
+  // Streams recorder chunks to IndexedDB as they arrive
+  const recordingWriterRef = useRef<RecordingWriter | null>(null)
   const isRecordingRef = useRef<boolean>(false)
   const durationIntervalRef = useRef<NodeJS.Timeout | null>(null)
-  const hasShownAlertRef = useRef<boolean>(false)
+  // Strike counting shared with the offline replay harness
+  const [strikeTracker] = useState(() => new StrikeTracker())
+  // Detection events and strikes of the session; appends are O(1) and
+  // subscribers re-render at most once per animation frame
+  const [sessionStore] = useState(() => new SessionEventStore())
+  const hasEvents = useSessionSelector(sessionStore, selectHasEvents)
+  const strikeCount = useSessionSelector(sessionStore, selectStrikeCount)
+  const captureCanvasRef = useRef<HTMLCanvasElement | null>(null)
+  const mosaicCanvasRef = useRef<HTMLCanvasElement | null>(null)
+  const hashCanvasRef = useRef<HTMLCanvasElement | null>(null)
+  const frameGateRef = useRef<FrameGate | null>(null)
+  const frameSequencerRef = useRef<FrameSequencer<AnalysisResponse> | null>(null)
+  const frameBatcherRef = useRef<FrameBatcher | null>(null)
+  // Latest face/pose results. The detection loop publishes here instead of
+  // setting state, so the page does not re-render at 10 FPS
+  const [visionStore] = useState(() => new VisionStore())
+  // Looking-away / reading heuristics from the face landmarks, run per tick
+  const [gazeMonitor] = useState(() => new GazeMonitor())
+  // Phone / extra person / book / screen flags from the optional object detector
+  const [objectMonitor] = useState(() => new ObjectSignalMonitor())
+
+  frameTimeMonitorRef.current?.recordRender()
 
   // -----------------------------
   // 1) Initialize ML Models
@@ -92,54 +136,36 @@ export default function Page() {
       setMlModelsReady(false)
       setError(null)
 
-      // Start loading TensorFlow.js in parallel with other initialization
-      setInitializationProgress('Loading TensorFlow.js...')
-      const tfPromise = import('@tensorflow/tfjs').then(async (tf) => {
-        tfjs = tf
-        // Configure TF.js for better performance
-        await tf.ready()
-        await tf.setBackend('webgl')
-        await tf.env().set('WEBGL_FORCE_F16_TEXTURES', true) // Use F16 textures for better performance
-        await tf.env().set('WEBGL_PACK', true) // Enable texture packing
-        await tf.env().set('WEBGL_CHECK_NUMERICAL_PROBLEMS', false) // Disable numerical checks in production
-      })
-
-      // Load models in parallel
-      setInitializationProgress('Loading face and pose detection models...')
-      const [blazefaceModule, poseDetectionModule] = await Promise.all([
-        import('@tensorflow-models/blazeface'),
-        import('@tensorflow-models/pose-detection')
-      ])
-
-      blazefaceModel = blazefaceModule
-      poseDetection = poseDetectionModule
-
-      // Wait for TF.js to be ready
-      await tfPromise
-
-      // Load models in parallel
-      setInitializationProgress('Initializing models...')
-      const [faceModel, poseModel] = await Promise.all([
-        blazefaceModel.load({
-          maxFaces: 1, // Limit to 1 face for better performance
-          scoreThreshold: 0.5 // Increase threshold for better performance
-        }),
-        poseDetection.createDetector(
-          poseDetection.SupportedModels.MoveNet,
-          {
-            modelType: poseDetection.movenet.modelType.SINGLEPOSE_LIGHTNING,
-            enableSmoothing: true,
-            minPoseScore: 0.3
-          }
-        )
-      ])
-
-      faceModelRef.current = faceModel
-      poseModelRef.current = poseModel
+      // Models load inside the vision worker; ?vision=main keeps inference on
+      // the main thread for frame-time comparisons
+      const params = new URLSearchParams(window.location.search)
+      if (!visionClientRef.current && canvasRef.current) {
+        visionClientRef.current = createVisionClient(canvasRef.current, params.get("vision") === "main")
+      }
+      if (!visionClientRef.current || !canvasRef.current) throw new Error("Overlay canvas not mounted")
+      let timings: VisionInitTimings
+      try {
+        timings = await visionClientRef.current.init(setInitializationProgress)
+      } catch (err) {
+        if (visionClientRef.current.mode !== "worker") throw err
+        // The worker failed before taking over the overlay canvas, so the
+        // main thread can still run the same pipeline on it
+        console.warn("Vision worker failed, running face/pose on the main thread:", err)
+        visionClientRef.current.dispose()
+        visionClientRef.current = new InlineVisionClient(canvasRef.current)
+        timings = await visionClientRef.current.init(setInitializationProgress)
+      }
+      const { backend, ...phases } = timings
+      console.table({ [`${visionClientRef.current.mode} thread`]: phases })
+      console.log(`TF.js backend: ${backend.backend}${timings.backendReused ? " (stored choice)" : ""}`)
+      console.table(backend.results)
+      if (params.get("perf") === "1") {
+        frameTimeMonitorRef.current = new FrameTimeMonitor()
+      }
 
       setMlModelsReady(true)
       setIsInitializing(false)
-      console.log('All ML models loaded successfully')
+      console.log(`All ML models loaded successfully (${visionClientRef.current.mode} thread)`)
     } catch (err) {
       console.error('Error loading ML models:', err)
       setError('Failed to load ML models: ' + (err as Error).message)
@@ -148,14 +174,6 @@ export default function Page() {
     }
   }
 
-  // Helper to set canvas dimensions
-  const updateCanvasSize = () => {
-    if (!videoRef.current || !canvasRef.current) return
-    const canvas = canvasRef.current
-    canvas.width = 640 // fixed width
-    canvas.height = 360 // fixed height (16:9)
-  }
-
   // -----------------------------
   // 2) Set up the webcam
   // -----------------------------
@@ -174,12 +192,10 @@ export default function Page() {
         videoRef.current.srcObject = stream
         mediaStreamRef.current = stream
 
-        // Wait for video metadata so we can set the canvas size
+        // Wait for video metadata; the overlay canvas has a fixed 640x360 size
+        // (it may already belong to the vision worker, so it is not resized)
         await new Promise<void>((resolve) => {
-          videoRef.current!.onloadedmetadata = () => {
-            updateCanvasSize()
-            resolve()
-          }
+          videoRef.current!.onloadedmetadata = () => resolve()
         })
       }
     } catch (error) {
@@ -198,10 +214,6 @@ export default function Page() {
     if (videoRef.current) {
       videoRef.current.srcObject = null
     }
-    if (recordedVideoUrl) {
-      URL.revokeObjectURL(recordedVideoUrl)
-      setRecordedVideoUrl(null)
-    }
   }
 
   // -----------------------------
@@ -216,14 +228,22 @@ export default function Page() {
       recognition.interimResults = true
 
       recognition.onresult = (event: SpeechRecognitionEvent) => {
+        const now = Date.now()
         let finalTranscript = ""
+        let interim = false
         for (let i = event.resultIndex; i < event.results.length; ++i) {
           if (event.results[i].isFinal) {
             finalTranscript += event.results[i][0].transcript
+          } else {
+            interim = true
           }
         }
         if (finalTranscript) {
-          setTranscript((prev) => prev + " " + finalTranscript)
+          transcriptStore.append(finalTranscript, speechStartedAtRef.current ?? now, now)
+          speechStartedAtRef.current = null
+        }
+        if (interim && speechStartedAtRef.current === null) {
+          speechStartedAtRef.current = now
         }
       }
 
@@ -236,159 +256,126 @@ export default function Page() {
   // -----------------------------
   // 4) TensorFlow detection loop
   // -----------------------------
-  const runDetection = async () => {
+  const runDetection = () => {
     if (!isRecordingRef.current) return
-
-    // Throttle detection to ~10 FPS (every 100ms)
-    const now = performance.now()
-    if (now - lastDetectionTime.current < 100) {
-      detectionFrameRef.current = requestAnimationFrame(runDetection)
+    if (visionClientRef.current?.failed) {
+      // The worker crashed after taking over the overlay canvas; there is
+      // nothing left to fall back to
+      detectionFrameRef.current = null
+      setError("Face and pose detection stopped. Reload the page to restart it.")
       return
     }
-    lastDetectionTime.current = now
+    detectionFrameRef.current = requestAnimationFrame(runDetection)
 
+    // Interval set by the rate controller (inference within ~40% of wall
+    // time), one frame in flight at a time, nothing while the tab is hidden
     const video = videoRef.current
-    const canvas = canvasRef.current
-    if (!video || !canvas) {
-      detectionFrameRef.current = requestAnimationFrame(runDetection)
-      return
-    }
-
-    const ctx = canvas.getContext("2d")
-    if (!ctx) {
-      detectionFrameRef.current = requestAnimationFrame(runDetection)
-      return
-    }
-
-    // Clear canvas and draw current video frame
-    ctx.clearRect(0, 0, canvas.width, canvas.height)
-    drawVideoToCanvas(video, canvas, ctx)
-
-    // Scale for drawing predictions
-    const scaleX = canvas.width / video.videoWidth
-    const scaleY = canvas.height / video.videoHeight
-
-    // Face detection
-    if (faceModelRef.current) {
-      try {
-        const predictions = await faceModelRef.current.estimateFaces(video, false)
-        predictions.forEach((prediction: blazeface.NormalizedFace) => {
-          const start = prediction.topLeft as [number, number]
-          const end = prediction.bottomRight as [number, number]
-          const size = [end[0] - start[0], end[1] - start[1]]
-
-          const scaledStart = [start[0] * scaleX, start[1] * scaleY]
-          const scaledSize = [size[0] * scaleX, size[1] * scaleX]
-
-          // Draw bounding box
-          ctx.strokeStyle = "rgba(0, 255, 0, 0.8)"
-          ctx.lineWidth = 2
-          ctx.strokeRect(
-            scaledStart[0],
-            scaledStart[1],
-            scaledSize[0],
-            scaledSize[1]
-          )
-
-          // Draw confidence
-          const confidence = Math.round((prediction.probability as number) * 100)
-          ctx.fillStyle = "white"
-          ctx.font = "16px Arial"
-          ctx.fillText(`${confidence}%`, scaledStart[0], scaledStart[1] - 5)
-        })
-      } catch (err) {
-        console.error("Face detection error:", err)
-      }
+    const vision = visionClientRef.current
+    const rate = detectionRate
+    if (!video || !vision || vision.busy || !rate.tick(performance.now())) return
+
+    // Buffer downscaled frames for batched analysis
+    const batcher = frameBatcherRef.current
+    if (batcher && batcher.due(Date.now())) {
+      batcher.capture(video, Date.now()).catch((err) => console.error("Batch capture error:", err))
     }
 
-    // Pose detection
-    if (poseModelRef.current) {
+    // Inference and overlay drawing happen in the vision worker; only the
+    // packed face boxes and keypoints come back
+    vision.process(video).then((result) => {
+      if (!result) return
       try {
-        const poses = await poseModelRef.current.estimatePoses(video)
-        if (poses.length > 0) {
-          const keypoints = poses[0].keypoints
-          // Convert TF keypoints to our Keypoint type
-          const convertedKeypoints: Keypoint[] = keypoints.map(kp => ({
-            x: kp.x,
-            y: kp.y,
-            score: kp.score ?? 0, // Use 0 as default if score is undefined
-            name: kp.name
-          }))
-          setLastPoseKeypoints(convertedKeypoints)
-
-          keypoints.forEach((keypoint) => {
-            // Use nullish coalescing to provide a default value of 0
-            if ((keypoint.score ?? 0) > 0.3) {
-              const x = keypoint.x * scaleX
-              const y = keypoint.y * scaleY
-
-              // Draw keypoint
-              ctx.beginPath()
-              ctx.arc(x, y, 4, 0, 2 * Math.PI)
-              ctx.fillStyle = "rgba(255, 0, 0, 0.8)"
-              ctx.fill()
-
-              // Outer circle
-              ctx.beginPath()
-              ctx.arc(x, y, 6, 0, 2 * Math.PI)
-              ctx.strokeStyle = "white"
-              ctx.lineWidth = 1.5
-              ctx.stroke()
-
-              // Label (if available)
-              // Use nullish coalescing to provide a default value of 0
-              if ((keypoint.score ?? 0) > 0.5 && keypoint.name) {
-                ctx.fillStyle = "white"
-                ctx.font = "12px Arial"
-                ctx.fillText(`${keypoint.name}`, x + 8, y)
-              }
-            }
-          })
+        const inputWidth = rate.record(result.inferenceMs)
+        if (inputWidth !== null) {
+          vision.configure({ inputWidth })
+          console.log("Detection rate adjusted:", rate.state())
         }
-      } catch (err) {
-        console.error("Pose detection error:", err)
+        const at = Date.now()
+        // Copied into the store's ring buffer; the result buffer is reused below
+        visionStore.publish(result, at)
+        const gazeEvent = gazeMonitor.update(visionStore.history, at)
+        if (gazeEvent) applyEvent(gazeEvent, at)
+        if (result.objects.length > 0) {
+          for (const event of objectMonitor.update(result.objects, at)) applyEvent(event, at)
+        }
+        // (Optional) Compute FPS
+        lastFrameTimeRef.current = performance.now()
+      } finally {
+        vision.release(result)
       }
-    }
-
-    // (Optional) Compute FPS
-    lastFrameTimeRef.current = performance.now()
-
-    detectionFrameRef.current = requestAnimationFrame(runDetection)
+    }).catch((err) => console.error("Detection error:", err))
   }
 
-  // Helper: Draw video to canvas (maintaining aspect ratio)
-  const drawVideoToCanvas = (
-    video: HTMLVideoElement,
-    canvas: HTMLCanvasElement,
-    ctx: CanvasRenderingContext2D
-  ) => {
-    const videoAspect = video.videoWidth / video.videoHeight
-    const canvasAspect = canvas.width / canvas.height
-
-    let drawWidth = canvas.width
-    let drawHeight = canvas.height
-    let offsetX = 0
-    let offsetY = 0
-
-    if (videoAspect > canvasAspect) {
-      drawHeight = canvas.width / videoAspect
-      offsetY = (canvas.height - drawHeight) / 2
+  // Apply one event, stamped with the capture time of its frame
+  const applyEvent = (event: StrikeEvent, capturedAt: number) => {
+    const seconds = getElapsedSeconds(capturedAt);
+    sessionStore.appendEvent({
+      timestamp: formatElapsed(seconds),
+      description: event.description,
+      isDangerous: event.isDangerous,
+      at: capturedAt,
+      seconds,
+    });
+
+    // Handle suspicious behavior with 3-strike system
+    const update = strikeTracker.record(event, capturedAt);
+    if (!update) return;
+    const { count: currentStrike, history: newHistory, level } = update;
+    console.log('🚨 isDangerous=true detected! Adding strike...');
+    console.log('Event:', event);
+    console.log(`⚠️ STRIKE ${currentStrike}/3 - Suspicious Behavior Detected`);
+    console.log(`Behavior: ${event.description}`);
+    sessionStore.appendStrike(update.strike);
+
+    if (level === "alert") {
+      // 3rd strike - major alert ONCE ONLY, then CONTINUE monitoring
+      setHasShownCheatingAlert(true);
+      setTimeout(() => {
+        alert(`🚨 ALERT: Potential Cheating Detected!\n\nInterviewee has 3 strikes of suspicious behavior:\n\n${newHistory.map((s, i) => `Strike ${i + 1} (${s.time}): ${s.reason}`).join('\n\n')}\n\n⚠️ The interviewee MAY BE CHEATING.\n\n✅ Recording will continue to capture additional evidence.`);
+      }, 100);
+
+      // Send critical notification
+      try {
+        fetch("http://localhost:5400/send-telegram", {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json",
+          },
+          body: JSON.stringify({
+            message: `🚨 POTENTIAL CHEATING: 3 Strikes!\n\n${newHistory.map((s, i) => `Strike ${i + 1}: ${s.reason}`).join('\n')}`,
+          }),
+        }).then(() => console.log("Critical alert sent")).catch(() => {});
+      } catch (error) {
+        console.log("Telegram service not running (optional feature)");
+      }
+    } else if (level === "continued") {
+      // After 3rd strike - continue logging
+      console.log(`⚠️ Additional suspicious behavior (Strike ${currentStrike}): ${event.description}`);
     } else {
-      drawWidth = canvas.height * videoAspect
-      offsetX = (canvas.width - drawWidth) / 2
+      // Strike 1 or 2 - subtle notification
+      console.log(`⚠️ Strike ${currentStrike}/3 logged - ${event.description}`);
+      const notification = document.createElement('div');
+      notification.style.cssText = 'position:fixed;top:20px;right:20px;background:orange;color:white;padding:15px 20px;border-radius:8px;z-index:99999;font-weight:bold;box-shadow:0 4px 6px rgba(0,0,0,0.3);font-size:16px;';
+      notification.textContent = `⚠️ Strike ${currentStrike}/3: Suspicious behavior detected`;
+      document.body.appendChild(notification);
+      setTimeout(() => {
+        notification.remove();
+      }, 5000);
     }
+  };
 
-    ctx.drawImage(video, offsetX, offsetY, drawWidth, drawHeight)
-  }
+  // Apply one request's events
+  const applyDetectionResult = ({ result, frameTimes }: AnalysisResponse, ticket: FrameTicket) => {
+    for (const event of result.events ?? []) {
+      applyEvent(event, frameTimes[event.frame ?? 0] ?? ticket.capturedAt);
+    }
+  };
 
   // -----------------------------
   // 5) Send noti and analyze frame via API 
   // -----------------------------
-  const analyzeFrame = async () => {
-    if (!isRecordingRef.current) return;
-  
-    const currentTranscript = transcript.trim();
-    const currentPoseKeypoints = [...lastPoseKeypoints];
+  const analyzeFrame = async (): Promise<AnalysisOutcome | null> => {
+    if (!isRecordingRef.current) return null;
   
     // List of random locations near Bethlehem, PA
     const locations = [
@@ -402,95 +389,89 @@ export default function Page() {
     const randomLocation = locations[Math.floor(Math.random() * locations.length)];
   
     try {
-      const frame = await captureFrame();
-      if (!frame) return;
-  
-      if (!frame.startsWith("data:image/jpeg")) {
-        console.error("Invalid frame format");
-        return;
+      // Skip the remote call when nothing meaningful changed since the last one
+      const gate = frameGateRef.current;
+      let gateSample: GateSample | null = null;
+      if (gate && videoRef.current) {
+        gateSample = {
+          keypoints: visionStore.latestKeypoints(),
+          faces: visionStore.latestFaces(),
+          frameHash: hashFrame(),
+          frameWidth: videoRef.current.videoWidth || 640,
+          // A new phone or person escalates; a confirmed-empty desk waits longer
+          objectFlags: objectMonitor.gateFlags(Date.now())
+        };
+        if (!gate.evaluate(gateSample).escalate) return null;
+      }
+
+      const sequencer = frameSequencerRef.current;
+      if (!sequencer) return null;
+      // Batched mode sends the buffered window; otherwise grab a fresh frame
+      let frames: BufferedFrame[] = frameBatcherRef.current?.flush() ?? [];
+      const ticket = sequencer.issue(frames[0]?.capturedAt ?? Date.now());
+      let layout: FrameLayout = 'full';
+      if (frames.length === 0) {
+        // Face-crop mosaic while the face box is current, full frame otherwise
+        const face = faceCrop ? currentFace() : null;
+        const frame = face ? await captureMosaic(face) : await captureFrame();
+        if (!frame) {
+          sequencer.fail(ticket);
+          return null;
+        }
+        frames = [{ blob: frame, capturedAt: ticket.capturedAt }];
+        if (face) layout = 'mosaic';
       }
   
-      const result = await detectEvents(frame, currentTranscript);
-      if (!isRecordingRef.current) return;
-  
-      if (result.events && result.events.length > 0) {
-        for (const event of result.events) {
-          const newTimestamp = {
-            timestamp: getElapsedTime(),
-            description: event.description,
-            isDangerous: event.isDangerous,
-          };
-          setTimestamps((prev) => [...prev, newTimestamp]);
-  
-          // Handle suspicious behavior with 3-strike system
-          if (event.isDangerous) {
-            console.log('🚨 isDangerous=true detected! Adding strike...');
-            console.log('Event:', event);
-            setStrikeCount(prev => {
-              const currentStrike = prev + 1;
-              console.log(`Strike count updated: ${prev} -> ${currentStrike}`);
-              const timestamp = new Date().toLocaleTimeString();
-              
-              setStrikeHistory(prevHistory => {
-                const newHistory = [...prevHistory, {
-                  time: timestamp,
-                  reason: event.description
-                }];
-                
-                console.log(`⚠️ STRIKE ${currentStrike}/3 - Suspicious Behavior Detected`);
-                console.log(`Behavior: ${event.description}`);
-                
-                if (currentStrike === 3 && !hasShownAlertRef.current) {
-                  // 3rd strike - major alert ONCE ONLY, then CONTINUE monitoring
-                  hasShownAlertRef.current = true;
-                  setHasShownCheatingAlert(true);
-                  setTimeout(() => {
-                    alert(`🚨 ALERT: Potential Cheating Detected!\n\nInterviewee has 3 strikes of suspicious behavior:\n\n${newHistory.map((s, i) => `Strike ${i + 1} (${s.time}): ${s.reason}`).join('\n\n')}\n\n⚠️ The interviewee MAY BE CHEATING.\n\n✅ Recording will continue to capture additional evidence.`);
-                  }, 100);
-                  
-                  // Send critical notification
-                  try {
-                    fetch("http://localhost:5400/send-telegram", {
-                      method: "POST",
-                      headers: {
-                        "Content-Type": "application/json",
-                      },
-                      body: JSON.stringify({
-                        message: `🚨 POTENTIAL CHEATING: 3 Strikes!\n\n${newHistory.map((s, i) => `Strike ${i + 1}: ${s.reason}`).join('\n')}`,
-                      }),
-                    }).then(() => console.log("Critical alert sent")).catch(() => {});
-                  } catch (error) {
-                    console.log("Telegram service not running (optional feature)");
-                  }
-                } else if (currentStrike > 3) {
-                  // After 3rd strike - continue logging
-                  console.log(`⚠️ Additional suspicious behavior (Strike ${currentStrike}): ${event.description}`);
-                } else {
-                  // Strike 1 or 2 - subtle notification
-                  console.log(`⚠️ Strike ${currentStrike}/3 logged - ${event.description}`);
-                  console.log('Creating notification popup...');
-                  
-                  const notification = document.createElement('div');
-                  notification.style.cssText = 'position:fixed;top:20px;right:20px;background:orange;color:white;padding:15px 20px;border-radius:8px;z-index:99999;font-weight:bold;box-shadow:0 4px 6px rgba(0,0,0,0.3);font-size:16px;';
-                  notification.textContent = `⚠️ Strike ${currentStrike}/3: Suspicious behavior detected`;
-                  document.body.appendChild(notification);
-                  console.log('Notification added to DOM');
-                  setTimeout(() => {
-                    notification.remove();
-                    console.log('Notification removed');
-                  }, 5000);
-                }
-                
-                return newHistory;
-              });
-              
-              return currentStrike;
-            });
+      // Stream events so strikes can start before the model finishes; events
+      // of a frame that is no longer the newest wait for completion ordering
+      const frameTimes = frames.map((frame) => frame.capturedAt);
+      // Only the speech around these frames, so the request does not grow with
+      // the session; speech that started after the last frame is left out
+      const currentTranscript = transcriptStore.window(frameTimes[0], frameTimes[frameTimes.length - 1]);
+      const deferred: VideoEvent[] = [];
+      let result: DetectionResult;
+      try {
+        result = await streamFrames(
+          frames.map((frame) => ({ blob: frame.blob, offsetMs: frame.capturedAt - ticket.capturedAt })),
+          currentTranscript,
+          {
+            signal: ticket.signal,
+            localSignals: objectMonitor.summary(Date.now()),
+            layout,
+            onEvent: (event) => {
+              if (isRecordingRef.current && sequencer.claim(ticket)) {
+                applyEvent(event, frameTimes[event.frame ?? 0] ?? ticket.capturedAt);
+              } else {
+                deferred.push(event);
+              }
+            }
           }
-        }
+        );
+      } catch (error) {
+        sequencer.fail(ticket);
+        // Superseded by a newer frame; the request was still sent
+        if (ticket.signal.aborted) return SUPERSEDED;
+        throw error;
+      }
+      // A newer frame's result already landed; this one is dropped
+      const superseded = sequencer.isSuperseded(ticket);
+      // The frame was analyzed; later ticks are compared against it
+      if (gate && gateSample && !superseded) gate.commit(gateSample);
+      const outcome: AnalysisOutcome = {
+        suspicious: result.events?.some((event) => event.isDangerous) ?? false,
+        tokens: result.tokens,
+        superseded
+      };
+      if (!isRecordingRef.current) return outcome;
+  
+      const response = { result: { ...result, events: deferred }, frameTimes };
+      for (const applied of sequencer.complete(ticket, response)) {
+        applyDetectionResult(applied.result, applied.ticket);
       }
+      return outcome;
     } catch (error) {
       console.error("Error analyzing frame:", error);
+      throw error;
     }
     };
   
@@ -498,39 +479,87 @@ export default function Page() {
   // -----------------------------
   // 6) Capture current video frame (for analysis)
   // -----------------------------
-  const captureFrame = async (): Promise<string | null> => {
+  const captureFrame = async (): Promise<Blob | null> => {
     if (!videoRef.current) return null
 
     const video = videoRef.current
-    const tempCanvas = document.createElement("canvas")
     const width = 640
     const height = 360
-    tempCanvas.width = width
-    tempCanvas.height = height
+    // Reuse one capture canvas instead of allocating a new one per frame
+    if (!captureCanvasRef.current) {
+      captureCanvasRef.current = document.createElement("canvas")
+      captureCanvasRef.current.width = width
+      captureCanvasRef.current.height = height
+    }
+    const tempCanvas = captureCanvasRef.current
 
     const context = tempCanvas.getContext("2d")
     if (!context) return null
 
     try {
       context.drawImage(video, 0, 0, width, height)
-      const dataUrl = tempCanvas.toDataURL("image/jpeg", 0.8)
-      return dataUrl
+      // Raw JPEG bytes; avoids the ~33% base64 inflation of toDataURL
+      return await encodeCanvasJpeg(tempCanvas, 0.8)
     } catch (error) {
       console.error("Error capturing frame:", error)
       return null
     }
   }
 
+  // The single face from the latest detection tick, if it is recent enough to
+  // crop around; with several faces the full frame says more
+  const currentFace = (): GateFace | null => {
+    const snapshot = visionStore.getSnapshot()
+    if (snapshot.faceCount !== 1 || Date.now() - snapshot.updatedAt > FACE_CROP_MAX_AGE_MS) return null
+    return visionStore.latestFaces()[0] ?? null
+  }
+
+  // Face crop at native resolution plus context and desk tiles (lib/roiMosaic.ts)
+  const captureMosaic = async (face: GateFace): Promise<Blob | null> => {
+    const video = videoRef.current
+    if (!video || !video.videoWidth) return null
+    if (!mosaicCanvasRef.current) {
+      mosaicCanvasRef.current = document.createElement("canvas")
+      mosaicCanvasRef.current.width = MOSAIC_LAYOUT.width
+      mosaicCanvasRef.current.height = MOSAIC_LAYOUT.height
+    }
+    const context = mosaicCanvasRef.current.getContext("2d")
+    if (!context) return null
+
+    try {
+      drawMosaic(context, video, video.videoWidth, video.videoHeight, face)
+      return await encodeCanvasJpeg(mosaicCanvasRef.current, 0.8)
+    } catch (error) {
+      console.error("Error capturing face crop:", error)
+      return null
+    }
+  }
+
+  // Helper: 64-bit average hash of the current frame for the analysis gate
+  const hashFrame = (): [number, number] | null => {
+    if (!videoRef.current) return null
+    if (!hashCanvasRef.current) {
+      hashCanvasRef.current = document.createElement("canvas")
+      hashCanvasRef.current.width = HASH_SIZE
+      hashCanvasRef.current.height = HASH_SIZE
+    }
+    const context = hashCanvasRef.current.getContext("2d", { willReadFrequently: true })
+    if (!context) return null
+    context.drawImage(videoRef.current, 0, 0, HASH_SIZE, HASH_SIZE)
+    return averageHash(context.getImageData(0, 0, HASH_SIZE, HASH_SIZE).data)
+  }
+
   // -----------------------------
   // 7) Get elapsed time string
   // -----------------------------
-  const getElapsedTime = () => {
-    if (!startTimeRef.current) return "00:00"
-    const elapsed = Math.floor(
-      (Date.now() - startTimeRef.current.getTime()) / 1000
-    )
-    // Update current time for timeline
-    setCurrentTime(elapsed)
+  const getElapsedSeconds = (at: number = Date.now()) => {
+    if (!startTimeRef.current) return 0
+    return Math.max(0, Math.floor(
+      (at - startTimeRef.current.getTime()) / 1000
+    ))
+  }
+
+  const formatElapsed = (elapsed: number) => {
     const minutes = Math.floor(elapsed / 60)
     const seconds = elapsed % 60
     return `${String(minutes).padStart(2, "0")}:${String(seconds).padStart(2, "0")}`
@@ -549,7 +578,7 @@ export default function Page() {
     if (!mediaStreamRef.current) return
 
     setError(null)
-    setTimestamps([])
+    sessionStore.clearEvents()
     setAnalysisProgress(0)
 
     startTimeRef.current = new Date()
@@ -568,42 +597,35 @@ export default function Page() {
 
     // Start speech recognition
     if (recognitionRef.current) {
-      setTranscript("")
+      transcriptStore.clear()
+      speechStartedAtRef.current = null
       setIsTranscribing(true)
       recognitionRef.current.start()
     }
 
-    // Start video recording using MediaRecorder with MP4 container
-    recordedChunksRef.current = []
+    // Start video recording using MediaRecorder with MP4 container. Chunks go
+    // straight to IndexedDB, so the recording survives a crash and does not
+    // accumulate in memory
     const mediaRecorder = new MediaRecorder(mediaStreamRef.current, {
       mimeType: "video/mp4"
     })
-
-    mediaRecorder.ondataavailable = (event) => {
-      if (event.data.size > 0) {
-        recordedChunksRef.current.push(event.data)
-      }
-    }
-
-    mediaRecorder.onstop = () => {
-      const blob = new Blob(recordedChunksRef.current, { type: "video/mp4" })
-      const url = URL.createObjectURL(blob)
-      setRecordedVideoUrl(url)
-      setVideoName("stream.mp4")
-    }
+    const writer = new RecordingWriter(mediaRecorder.mimeType || "video/mp4")
+    recordingWriterRef.current = writer
+    // The previous recording goes unless it was saved; recovered ones stay
+    discardUnsavedRecordings([writer.sessionId]).catch(() => {})
+    setRecordedSessionId(null)
 
     // Set up data handling before starting
     mediaRecorder.ondataavailable = (event) => {
       if (event.data && event.data.size > 0) {
-        recordedChunksRef.current.push(event.data)
+        writer.append(event.data)
       }
     }
 
-    mediaRecorder.onstop = () => {
-      const blob = new Blob(recordedChunksRef.current, { type: "video/mp4" })
-      const url = URL.createObjectURL(blob)
-      setRecordedVideoUrl(url)
-      setVideoName("stream.mp4")
+    mediaRecorder.onstop = async () => {
+      const manifest = await writer.finish()
+      console.log(`Recording stored: ${manifest.chunkCount} chunks, ${(manifest.bytes / 1e6).toFixed(1)} MB`)
+      if (writer.persisted) setRecordedSessionId(writer.sessionId)
     }
 
     mediaRecorderRef.current = mediaRecorder
@@ -614,24 +636,44 @@ export default function Page() {
     if (detectionFrameRef.current) {
       cancelAnimationFrame(detectionFrameRef.current)
     }
-    lastDetectionTime.current = 0
+    visionStore.reset()
+    gazeMonitor.reset()
+    objectMonitor.reset()
+    // COCO-SSD loads on first enable and then runs at ~1-2 FPS alongside face/pose
+    visionClientRef.current?.configure({ objectDetection })
     detectionFrameRef.current = requestAnimationFrame(runDetection)
-
-    // Set up repeated frame analysis based on mode
-    const intervalTimes = {
-      demo: 500,      // 2 req/sec = 120 req/min (for impressive 2-min demos, ~$0.03)
-      normal: 10000,  // 6 req/min (allows ~40 min sessions within free tier)
-      conservative: 20000 // 3 req/min (allows ~80 min sessions within free tier)
-    }
-    
-    if (analysisIntervalRef.current) {
-      clearInterval(analysisIntervalRef.current)
+    frameTimeMonitorRef.current?.start()
+
+    frameGateRef.current = new FrameGate({ maxStalenessMs: GATE_MAX_STALENESS_MS[analysisMode] })
+
+    // Results are applied in capture order; superseded requests get aborted
+    frameSequencerRef.current?.abortAll()
+    frameSequencerRef.current = new FrameSequencer<AnalysisResponse>({ policy: "latest-wins" })
+
+    // Batched mode: the detection loop buffers a few downscaled frames and each
+    // request sends the whole window, so requests never outpace the window
+    const schedulerOptions = { ...ANALYSIS_MODES[analysisMode] }
+    if (batchFrames) {
+      const batcher = new FrameBatcher()
+      frameBatcherRef.current = batcher
+      schedulerOptions.baseIntervalMs = Math.max(schedulerOptions.baseIntervalMs, batcher.options.windowMs)
+      schedulerOptions.minIntervalMs = Math.max(schedulerOptions.minIntervalMs, batcher.options.windowMs)
+    } else {
+      frameBatcherRef.current = null
     }
-    analyzeFrame() // first immediate call
-    analysisIntervalRef.current = setInterval(analyzeFrame, intervalTimes[analysisMode])
+
+    // Adaptive analysis cadence per mode (see ANALYSIS_MODES for the base rates)
+    schedulerRef.current?.stop()
+    const scheduler = new AnalysisScheduler(analyzeFrame, schedulerOptions)
+    schedulerRef.current = scheduler
+    scheduler.start()
   }
 
   const stopRecording = () => {
+    if (frameGateRef.current) {
+      const { evaluated, skipped } = frameGateRef.current.stats
+      console.log(`Analysis gate: ${skipped}/${evaluated} remote calls avoided`)
+    }
     startTimeRef.current = null
     isRecordingRef.current = false
     setIsRecording(false)
@@ -646,15 +688,26 @@ export default function Page() {
       mediaRecorderRef.current.stop()
     }
 
-    // Stop detection loop and analysis interval
+    // Stop detection loop and analysis scheduler
     if (detectionFrameRef.current) {
       cancelAnimationFrame(detectionFrameRef.current)
       detectionFrameRef.current = null
     }
-    if (analysisIntervalRef.current) {
-      clearInterval(analysisIntervalRef.current)
-      analysisIntervalRef.current = null
+    if (frameTimeMonitorRef.current) {
+      const summary = frameTimeMonitorRef.current.stop()
+      console.table({ [visionClientRef.current?.mode ?? "unknown"]: summary })
+      console.log("Detection rate:", detectionRate.state())
+      if (summary.pageRendersPerSec > PAGE_RENDER_BUDGET_PER_SEC) {
+        console.warn(`Page re-rendered ${summary.pageRendersPerSec}/s while recording (budget ${PAGE_RENDER_BUDGET_PER_SEC}/s)`)
+      }
+      setFrameTimeSummary(summary)
     }
+    if (schedulerRef.current) {
+      schedulerRef.current.stop()
+      schedulerRef.current = null
+    }
+    frameSequencerRef.current?.abortAll()
+    frameBatcherRef.current = null
     if (durationIntervalRef.current) {
       clearInterval(durationIntervalRef.current)
       durationIntervalRef.current = null
@@ -664,8 +717,8 @@ export default function Page() {
   // -----------------------------
   // 9) Save video functionality
   // -----------------------------
-  const handleSaveVideo = () => {
-    if (!recordedVideoUrl || !videoName) return
+  const handleSaveVideo = async (sessionId: string, name: string, timestamps: Timestamp[]) => {
+    if (!name) return
 
     try {
       const savedVideos: SavedVideo[] = JSON.parse(
@@ -673,13 +726,15 @@ export default function Page() {
       )
       const newVideo: SavedVideo = {
         id: Date.now().toString(),
-        name: videoName,
-        url: recordedVideoUrl,
-        thumbnailUrl: recordedVideoUrl,
-        timestamps: timestamps
+        name,
+        sessionId,
+        timestamps
       }
+      // Named recordings are kept when later sessions clean up
+      await nameRecording(sessionId, name)
       savedVideos.push(newVideo)
       localStorage.setItem("savedVideos", JSON.stringify(savedVideos))
+      dismissRecording(sessionId)
       alert("Video saved successfully!")
     } catch (error) {
       console.error("Error saving video:", error)
@@ -687,6 +742,29 @@ export default function Page() {
     }
   }
 
+  const handleDiscardVideo = async (sessionId: string) => {
+    try {
+      await deleteRecording(sessionId)
+      dismissRecording(sessionId)
+    } catch (error) {
+      console.error("Error discarding video:", error)
+    }
+  }
+
+  // Takes a saved or discarded recording off the page
+  const dismissRecording = (sessionId: string) => {
+    setRecordedSessionId((current) => (current === sessionId ? null : current))
+    setRecoveredRecordings((current) => current.filter((manifest) => manifest.id !== sessionId))
+  }
+
+  // Events of this session, in the shape saved with a video
+  const sessionTimestamps = (): Timestamp[] =>
+    sessionStore.events.slice().map(({ timestamp, description, isDangerous }) => ({
+      timestamp,
+      description,
+      isDangerous,
+    }))
+
   // -----------------------------
   // 10) useEffect hooks
   // -----------------------------
@@ -719,10 +797,31 @@ export default function Page() {
       video.removeEventListener('timeupdate', handleTimeUpdate)
       video.removeEventListener('loadedmetadata', handleLoadedMetadata)
     }
-  }, [recordedVideoUrl])
+  }, [recordedSessionId])
+
+  // Recordings left behind by a crashed or closed tab are offered for saving
+  // on every visit until they are saved or discarded
+  useEffect(() => {
+    recoverInterruptedRecordings()
+      .then((recovered) => {
+        if (recovered.length === 0) return
+        console.info(`Recovered ${recovered.length} interrupted recording(s)`)
+        setRecoveredRecordings(recovered)
+      })
+      .catch((error) => console.warn("Recording recovery unavailable:", error))
+  }, [])
 
   useEffect(() => {
+    // Strict mode re-runs this effect right away; keep the worker (which owns
+    // the transferred canvas) unless the page really unmounted
+    if (visionDisposeTimerRef.current) {
+      clearTimeout(visionDisposeTimerRef.current)
+      visionDisposeTimerRef.current = null
+    }
     initSpeechRecognition()
+    const handleVisibilityChange = () => detectionRate.setHidden(document.hidden)
+    handleVisibilityChange()
+    document.addEventListener("visibilitychange", handleVisibilityChange)
     const init = async () => {
       await startWebcam()
       await initMLModels()
@@ -730,16 +829,29 @@ export default function Page() {
     init()
 
     return () => {
+      document.removeEventListener("visibilitychange", handleVisibilityChange)
       stopWebcam()
-      if (analysisIntervalRef.current) clearInterval(analysisIntervalRef.current)
+      schedulerRef.current?.stop()
       if (detectionFrameRef.current) cancelAnimationFrame(detectionFrameRef.current)
+      frameTimeMonitorRef.current?.stop()
+      visionDisposeTimerRef.current = setTimeout(() => {
+        visionClientRef.current?.dispose()
+        visionClientRef.current = null
+      }, 0)
     }
   }, [])
 
+  // Page renders and commit cost of the page subtree for ?perf=1 (Profiler
+  // only reports in dev and profiling builds)
+  const handleProfilerRender: React.ProfilerOnRenderCallback = (_id, _phase, actualDuration) => {
+    frameTimeMonitorRef.current?.recordCommit(actualDuration)
+  }
+
   // -----------------------------
   // Render
   // -----------------------------
   return (
+    <Profiler id="realtime-page" onRender={handleProfilerRender}>
     <div className="min-h-screen flex items-center justify-center p-4 bg-transparent text-white relative overflow-hidden">
       {/* Dynamic particle background across entire screen */}
       <div className="absolute inset-0 z-0 pointer-events-none">
@@ -801,6 +913,42 @@ export default function Page() {
               >
                 Conservative (3 req/min)
               </button>
+              <button
+                onClick={() => setBatchFrames((prev) => !prev)}
+                disabled={isRecording}
+                title="Send a 3 s window of frames per request for motion context"
+                className={`px-4 py-2 rounded-lg text-sm font-medium transition-colors ${
+                  batchFrames
+                    ? 'bg-purple-600 text-white'
+                    : 'bg-zinc-800 text-zinc-400 hover:bg-zinc-700'
+                }`}
+              >
+                Batch frames
+              </button>
+              <button
+                onClick={() => setObjectDetection((prev) => !prev)}
+                disabled={isRecording}
+                title="Detect phones, extra people, books and screens on-device (loads an extra model)"
+                className={`px-4 py-2 rounded-lg text-sm font-medium transition-colors ${
+                  objectDetection
+                    ? 'bg-purple-600 text-white'
+                    : 'bg-zinc-800 text-zinc-400 hover:bg-zinc-700'
+                }`}
+              >
+                Object detection
+              </button>
+              <button
+                onClick={() => setFaceCrop((prev) => !prev)}
+                disabled={isRecording}
+                title="Send a full-resolution face crop with small context and desk views instead of the downscaled frame"
+                className={`px-4 py-2 rounded-lg text-sm font-medium transition-colors ${
+                  faceCrop
+                    ? 'bg-purple-600 text-white'
+                    : 'bg-zinc-800 text-zinc-400 hover:bg-zinc-700'
+                }`}
+              >
+                Face crop
+              </button>
             </div>
 
             <div className="space-y-4">
@@ -866,6 +1014,29 @@ export default function Page() {
                 )}
               </div>
 
+              {!isRecording && recordedSessionId && (
+                <RecordingReview
+                  key={recordedSessionId}
+                  sessionId={recordedSessionId}
+                  title="Recording"
+                  defaultName="stream.mp4"
+                  onSave={(name) => handleSaveVideo(recordedSessionId, name, sessionTimestamps())}
+                  onDiscard={() => handleDiscardVideo(recordedSessionId)}
+                />
+              )}
+
+              {!isRecording && recoveredRecordings.map((manifest) => (
+                <RecordingReview
+                  key={manifest.id}
+                  sessionId={manifest.id}
+                  title={`Interrupted recording from ${new Date(manifest.startedAt).toLocaleString()}`}
+                  defaultName="recovered.mp4"
+                  // Its events were lost with the page that recorded it
+                  onSave={(name) => handleSaveVideo(manifest.id, name, [])}
+                  onDiscard={() => handleDiscardVideo(manifest.id)}
+                />
+              ))}
+
               {isRecording && (
                 <div className="space-y-2">
                   <div className="flex items-center gap-2">
@@ -874,6 +1045,21 @@ export default function Page() {
                       Recording and analyzing...
                     </span>
                   </div>
+                  <SchedulerStatus scheduler={schedulerRef.current} />
+                  <DetectionStatus store={visionStore} />
+                </div>
+              )}
+
+              {!isRecording && frameTimeSummary && (
+                <div
+                  data-testid="frame-time-summary"
+                  data-page-renders-per-sec={frameTimeSummary.pageRendersPerSec}
+                  className="flex gap-4 text-xs text-zinc-500 font-mono"
+                >
+                  <span>frame p50/p95/p99: {frameTimeSummary.p50Ms}/{frameTimeSummary.p95Ms}/{frameTimeSummary.p99Ms} ms</span>
+                  <span>slow frames: {frameTimeSummary.slowFrames}/{frameTimeSummary.frames}</span>
+                  <span>long tasks: {frameTimeSummary.longTasks} ({frameTimeSummary.longTaskMs} ms)</span>
+                  <span>page renders: {frameTimeSummary.pageRendersPerSec}/s ({frameTimeSummary.commitMs} ms)</span>
                 </div>
               )}
 
@@ -894,7 +1080,7 @@ export default function Page() {
                       </div>
                     </div>
                     <div className="space-y-1 text-sm">
-                      {strikeHistory.map((strike, idx) => (
+                      {sessionStore.strikes.slice().map((strike, idx) => (
                         <div key={idx} className="text-white bg-black/30 p-2 rounded">
                           <span className="font-semibold">Strike {idx + 1}</span> ({strike.time}): {strike.reason}
                         </div>
@@ -922,21 +1108,12 @@ export default function Page() {
                   <h2 className="text-xl font-semibold text-white">
                     Key Moments Timeline
                   </h2>
-                  {timestamps.length > 0 ? (
+                  {hasEvents ? (
                     <Timeline
-                      events={timestamps.map(ts => {
-                        // Parse the MM:SS format into seconds
-                        const [minutes, seconds] = ts.timestamp.split(':').map(Number);
-                        const timeInSeconds = minutes * 60 + seconds;
-                        return {
-                          startTime: timeInSeconds,
-                          endTime: timeInSeconds + 3, // Assuming each event lasts 3 seconds
-                          type: ts.isDangerous ? 'warning' : 'normal',
-                          label: ts.description
-                        };
-                      })}
+                      store={sessionStore}
                       totalDuration={videoDuration || 60} // Default to 60 seconds if not set
-                      currentTime={currentTime}
+                      // While recording the playhead follows the live edge
+                      currentTime={isRecording ? videoDuration : currentTime}
                     />
                   ) : (
                     <p className="text-zinc-400 text-sm">
@@ -947,7 +1124,7 @@ export default function Page() {
                   )}
                 </div>
                 <TimestampList
-                  timestamps={timestamps}
+                  store={sessionStore}
                   onTimestampClick={() => {}}
                 />
               </div>
@@ -966,17 +1143,10 @@ export default function Page() {
                       </span>
                     </div>
                   )}
-                  {transcript ? (
-                    <p className="text-zinc-300 whitespace-pre-wrap">
-                      {transcript}
-                    </p>
-                  ) : (
-                    <p className="text-zinc-500 italic">
-                      {isRecording
-                        ? "Waiting for speech..."
-                        : "Start recording to capture audio"}
-                    </p>
-                  )}
+                  <TranscriptText
+                    store={transcriptStore}
+                    placeholder={isRecording ? "Waiting for speech..." : "Start recording to capture audio"}
+                  />
                 </div>
               </div>
 
@@ -987,5 +1157,6 @@ export default function Page() {
         {/* <ChatInterface timestamps={timestamps} /> */}
       </div>
     </div>
+    </Profiler>
   )
 }
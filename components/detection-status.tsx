@@ -0,0 +1,31 @@
+"use client"
+
+import { useVisionSelector, type VisionSnapshot, type VisionStore } from "@/lib/visionStore"
+
+interface DetectionStatusProps {
+  store: VisionStore
+}
+
+const selectFaceCount = (snapshot: VisionSnapshot) => snapshot.faceCount
+const selectVisibleKeypoints = (snapshot: VisionSnapshot) => snapshot.visibleKeypoints
+const selectGaze = (snapshot: VisionSnapshot) => snapshot.gaze
+// Rounded to 10 ms so small jitter does not re-render
+const selectInferenceMs = (snapshot: VisionSnapshot) => Math.round(snapshot.inferenceMs / 10) * 10
+
+// Live face/pose readout. Subscribes to the vision store directly, so only
+// this line re-renders when a detection result changes.
+export default function DetectionStatus({ store }: DetectionStatusProps) {
+  const faces = useVisionSelector(store, selectFaceCount)
+  const keypoints = useVisionSelector(store, selectVisibleKeypoints)
+  const gaze = useVisionSelector(store, selectGaze)
+  const inferenceMs = useVisionSelector(store, selectInferenceMs)
+
+  return (
+    <div className="flex gap-4 text-xs text-zinc-500 font-mono">
+      <span>faces: {faces}</span>
+      <span>keypoints: {keypoints}</span>
+      <span>gaze: {gaze}</span>
+      <span>inference: ~{inferenceMs} ms</span>
+    </div>
+  )
+}
@@ -0,0 +1,83 @@
+"use client"
+
+import { useEffect, useState } from "react"
+import { Save, Trash2 } from "lucide-react"
+import { Button } from "@/components/ui/button"
+import { Input } from "@/components/ui/input"
+import { getRecording, recordingPlaybackUrl } from "@/lib/recordingStore"
+
+interface RecordingReviewProps {
+  /** Recording in IndexedDB, see lib/recordingStore.ts */
+  sessionId: string
+  title: string
+  defaultName: string
+  onSave: (name: string) => Promise<void>
+  onDiscard: () => Promise<void>
+}
+
+// Playback of a stored recording with Save and Discard. The video streams
+// from IndexedDB through a MediaSource (recordingPlaybackUrl), so opening a
+// long recording does not load it into memory first.
+export default function RecordingReview({ sessionId, title, defaultName, onSave, onDiscard }: RecordingReviewProps) {
+  const [url, setUrl] = useState<string | null>(null)
+  const [name, setName] = useState(defaultName)
+  const [busy, setBusy] = useState(false)
+
+  useEffect(() => {
+    let cancelled = false
+    let revoke: (() => void) | null = null
+    getRecording(sessionId)
+      .then((manifest) => (manifest ? recordingPlaybackUrl(manifest) : null))
+      .then((playback) => {
+        if (!playback) return
+        if (cancelled) {
+          playback.revoke()
+          return
+        }
+        revoke = playback.revoke
+        setUrl(playback.url)
+      })
+      .catch((error) => console.error("Failed to open recording:", error))
+    return () => {
+      cancelled = true
+      revoke?.()
+      setUrl(null)
+    }
+  }, [sessionId])
+
+  const run = async (action: () => Promise<void>) => {
+    setBusy(true)
+    try {
+      await action()
+    } finally {
+      setBusy(false)
+    }
+  }
+
+  return (
+    <div className="p-4 bg-zinc-900/50 rounded-lg space-y-3">
+      <h2 className="text-xl font-semibold text-white">{title}</h2>
+      {url ? (
+        <video src={url} controls playsInline className="w-full rounded-lg bg-black" />
+      ) : (
+        <p className="text-zinc-400 text-sm">Loading recording...</p>
+      )}
+      <div className="flex gap-2">
+        <Input
+          value={name}
+          onChange={(event) => setName(event.target.value)}
+          placeholder="Recording name"
+          className="text-black"
+        />
+        <Button onClick={() => run(() => onSave(name))} disabled={busy || !name}>
+          <Save className="w-4 h-4 mr-2" />
+          Save
+        </Button>
+        <Button variant="destructive" onClick={() => run(onDiscard)} disabled={busy}>
+          <Trash2 className="w-4 h-4 mr-2" />
+          Discard
+        </Button>
+      </div>
+    </div>
+  )
+}
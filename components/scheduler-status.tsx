@@ -0,0 +1,38 @@
+"use client"
+
+import { useEffect, useState } from "react"
+import type { AnalysisScheduler, SchedulerState } from "@/lib/analysisScheduler"
+
+interface SchedulerStatusProps {
+  scheduler: AnalysisScheduler | null
+}
+
+// Analysis cadence readout. Subscribes to the scheduler itself so its
+// frequent state changes re-render this line, not the whole page.
+export default function SchedulerStatus({ scheduler }: SchedulerStatusProps) {
+  const [state, setState] = useState<SchedulerState | null>(() => scheduler?.getState() ?? null)
+
+  useEffect(() => {
+    setState(scheduler?.getState() ?? null)
+    return scheduler?.subscribe(setState)
+  }, [scheduler])
+
+  if (!state) return null
+  return (
+    <div className="space-y-1">
+      <div className="flex gap-4 text-xs text-zinc-500 font-mono">
+        <span>in-flight: {state.inFlight}</span>
+        <span>queued: {state.queueDepth}</span>
+        <span>rate: {state.effectiveRate} req/min</span>
+        <span>every {(state.intervalMs / 1000).toFixed(1)}s{state.boosted ? " (boosted)" : ""}</span>
+      </div>
+      {/* The scheduler stops itself once the session budget is spent */}
+      {state.budgetExhausted && (
+        <div role="status" className="p-2 text-sm rounded-lg border border-orange-500 bg-orange-900/20 text-orange-200">
+          Session analysis budget used up ({state.requests} requests, {state.tokens} tokens). Remote analysis has
+          stopped; on-device checks continue.
+        </div>
+      )}
+    </div>
+  )
+}
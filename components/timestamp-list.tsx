@@ -2,63 +2,112 @@
 
 import { Button } from "@/components/ui/button"
 import { Clock, AlertTriangle, Shield, ShieldAlert, ChevronDown, ChevronUp } from "lucide-react"
-import type { Timestamp } from "@/app/types"
-import { useState, useEffect, useRef } from "react"
+import { RowHeights } from "@/lib/rowHeights"
+import { useSessionSelector, type SessionEvent, type SessionEventStore, type SessionSnapshot } from "@/lib/sessionEventStore"
+import { useState, useEffect, useCallback, useRef } from "react"
 
 interface TimestampListProps {
-  timestamps: Timestamp[]
+  store: SessionEventStore
   onTimestampClick: (timestamp: string) => void
 }
 
-export default function TimestampList({ timestamps, onTimestampClick }: TimestampListProps) {
-  const [expandedItems, setExpandedItems] = useState<number[]>([])
-  const [longDescriptions, setLongDescriptions] = useState<number[]>([])
-  const textRefs = useRef<(HTMLParagraphElement | null)[]>([])
+// Collapsed row height including the gap below it, until the row is measured
+const ROW_ESTIMATE = 92
+// Rows mounted above and below the visible ones
+const OVERSCAN = 4
+const VIEWPORT_HEIGHT = 480
 
-  useEffect(() => {
-    const checkTextOverflow = () => {
-      const longItems = timestamps
-        .map((_, index) => {
-          const textElement = textRefs.current[index]
-          if (!textElement) return { index, hasOverflow: false }
+const selectEventCount = (snapshot: SessionSnapshot) => snapshot.eventCount
 
-          // Check if the element has overflow and ellipsis
-          const hasOverflow = (
-            textElement.offsetWidth < textElement.scrollWidth ||
-            textElement.offsetHeight < textElement.scrollHeight
-          )
-          
-          return { index, hasOverflow }
-        })
-        .filter(({ hasOverflow }) => hasOverflow)
-        .map(({ index }) => index)
+// Windowed list: only the rows in (or near) the viewport are mounted. Row
+// heights start as an estimate and are corrected by a ResizeObserver on the
+// mounted rows, which is also when a row's description is checked for
+// overflow, so long sessions never lay out the whole list.
+export default function TimestampList({ store, onTimestampClick }: TimestampListProps) {
+  const count = useSessionSelector(store, selectEventCount)
+  const [heights] = useState(() => new RowHeights(ROW_ESTIMATE))
+  heights.setCount(count)
+  const viewportRef = useRef<HTMLDivElement>(null)
+  const rowObserverRef = useRef<ResizeObserver | null>(null)
+  const [viewport, setViewport] = useState({ top: 0, height: VIEWPORT_HEIGHT })
+  const [, setLayoutVersion] = useState(0)
+  const [expandedItems, setExpandedItems] = useState<ReadonlySet<number>>(() => new Set())
+  const [longDescriptions, setLongDescriptions] = useState<ReadonlySet<number>>(() => new Set())
 
-      setLongDescriptions(longItems)
+  // Row measurements: correct the height estimate and flag clamped descriptions
+  const onRowsResized = (entries: ResizeObserverEntry[]) => {
+    let moved = false
+    const long: number[] = []
+    for (const entry of entries) {
+      const row = entry.target as HTMLElement
+      const index = Number(row.dataset.index)
+      const height = entry.borderBoxSize?.[0]?.blockSize ?? row.offsetHeight
+      moved = heights.set(index, height) || moved
+      const text = row.querySelector<HTMLElement>("[data-description]")
+      if (text && (text.offsetWidth < text.scrollWidth || text.offsetHeight < text.scrollHeight)) {
+        long.push(index)
+      }
     }
-
-    // Check after a short delay to ensure rendering is complete
-    const timeoutId = setTimeout(checkTextOverflow, 100)
-
-    // Recheck on window resize
-    const handleResize = () => {
-      clearTimeout(timeoutId)
-      setTimeout(checkTextOverflow, 100)
+    if (moved) setLayoutVersion((version) => version + 1)
+    if (long.length > 0) {
+      setLongDescriptions((prev) => (long.every((index) => prev.has(index)) ? prev : new Set([...prev, ...long])))
     }
+  }
 
-    window.addEventListener('resize', handleResize)
+  const observeRow = useCallback((row: HTMLDivElement | null) => {
+    if (!row) return
+    rowObserverRef.current ??= new ResizeObserver(onRowsResized)
+    const observer = rowObserverRef.current
+    observer.observe(row)
+    return () => observer.unobserve(row)
+    // onRowsResized only touches refs and state setters
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [])
 
+  useEffect(() => {
+    const element = viewportRef.current
+    if (!element) return
+    const observer = new ResizeObserver(() => {
+      setViewport((prev) => (prev.height === element.clientHeight ? prev : { ...prev, height: element.clientHeight }))
+    })
+    observer.observe(element)
     return () => {
-      clearTimeout(timeoutId)
-      window.removeEventListener('resize', handleResize)
+      observer.disconnect()
+      rowObserverRef.current?.disconnect()
+    }
+  }, [])
+
+  // Indexes restart when the session is cleared
+  useEffect(() => {
+    if (count === 0) {
+      setExpandedItems(new Set())
+      setLongDescriptions(new Set())
     }
-  }, [timestamps])
+  }, [count])
+
+  const handleScroll = () => {
+    const element = viewportRef.current
+    if (!element) return
+    setViewport((prev) => (prev.top === element.scrollTop ? prev : { ...prev, top: element.scrollTop }))
+  }
 
   const toggleExpand = (index: number, e: React.MouseEvent | React.KeyboardEvent) => {
     e.stopPropagation()
-    setExpandedItems(prev => 
-      prev.includes(index) ? prev.filter(i => i !== index) : [...prev, index]
-    )
+    setExpandedItems((prev) => {
+      const next = new Set(prev)
+      if (!next.delete(index)) next.add(index)
+      return next
+    })
   }
+
+  const first = Math.max(0, heights.indexAt(viewport.top) - OVERSCAN)
+  const last = Math.min(count - 1, heights.indexAt(viewport.top + viewport.height) + OVERSCAN)
+  const rows: { item: SessionEvent; index: number }[] = []
+  for (let index = first; index <= last; index++) {
+    const item = store.events.get(index)
+    if (item) rows.push({ item, index })
+  }
+
   return (
     <div className="grid gap-2">
       <div className="flex justify-between items-center mb-2">
@@ -74,75 +123,89 @@ export default function TimestampList({ timestamps, onTimestampClick }: Timestam
           </div>
         </div>
       </div>
-      <div className="grid gap-2">
-        {timestamps.map((item, index) => (
-          <Button
-            key={index}
-            variant="outline"
-            className={`group w-full justify-start gap-2 h-auto py-4 transition-all duration-200 ${
-              item.isDangerous 
-                ? 'bg-red-950/20 border-red-900/50 hover:bg-red-950/30 hover:border-red-700/70' 
-                : 'bg-zinc-800/50 border-zinc-700/50 hover:bg-zinc-800 hover:border-zinc-600'
-            } text-left relative overflow-hidden`}
-            onClick={() => onTimestampClick(item.timestamp)}
-          >
-            <div className={`absolute left-0 top-0 bottom-0 w-1 transition-all duration-200 ${
-              item.isDangerous
-                ? 'bg-red-500 group-hover:bg-red-400'
-                : 'bg-green-500 group-hover:bg-green-400'
-            }`} />
-            {item.isDangerous ? (
-              <ShieldAlert className="h-4 w-4 shrink-0 text-red-400" />
-            ) : (
-              <Shield className="h-4 w-4 shrink-0 text-green-400" />
-            )}
-            <div className="flex flex-col items-start w-full overflow-hidden">
-              <div className="flex items-center gap-2 flex-wrap w-full">
-                <span className="font-mono text-white shrink-0">{item.timestamp}</span>
-                {item.isDangerous && (
-                  <span className="text-xs px-2 py-0.5 rounded-full bg-red-500/20 text-red-400 border border-red-500/30 shrink-0">
-                    Dangerous
-                  </span>
+      <div
+        ref={viewportRef}
+        onScroll={handleScroll}
+        className="relative overflow-y-auto"
+        style={{ maxHeight: VIEWPORT_HEIGHT }}
+      >
+        <div className="relative" style={{ height: heights.total() }}>
+          {rows.map(({ item, index }) => (
+            <div
+              key={index}
+              ref={observeRow}
+              data-index={index}
+              className="absolute left-0 right-0 pb-2"
+              style={{ top: heights.offset(index) }}
+            >
+              <Button
+                variant="outline"
+                className={`group w-full justify-start gap-2 h-auto py-4 transition-all duration-200 ${
+                  item.isDangerous 
+                    ? 'bg-red-950/20 border-red-900/50 hover:bg-red-950/30 hover:border-red-700/70' 
+                    : 'bg-zinc-800/50 border-zinc-700/50 hover:bg-zinc-800 hover:border-zinc-600'
+                } text-left relative overflow-hidden`}
+                onClick={() => onTimestampClick(item.timestamp)}
+              >
+                <div className={`absolute left-0 top-0 bottom-0 w-1 transition-all duration-200 ${
+                  item.isDangerous
+                    ? 'bg-red-500 group-hover:bg-red-400'
+                    : 'bg-green-500 group-hover:bg-green-400'
+                }`} />
+                {item.isDangerous ? (
+                  <ShieldAlert className="h-4 w-4 shrink-0 text-red-400" />
+                ) : (
+                  <Shield className="h-4 w-4 shrink-0 text-green-400" />
                 )}
-              </div>
-              <div className="w-full mt-1.5">
-                <div 
-                  className={`relative text-sm transition-all duration-200 ${longDescriptions.includes(index) ? 'cursor-pointer' : ''}`}
-                  onClick={(e: React.MouseEvent) => longDescriptions.includes(index) && toggleExpand(index, e)}
-                >
-                  <p 
-                    ref={(el) => { textRefs.current[index] = el }}
-                    className={`whitespace-pre-wrap break-words ${expandedItems.includes(index) ? '' : 'line-clamp-1'} ${
-                    item.isDangerous ? 'text-red-200/80' : 'text-zinc-400'
-                  }`}>
-                    {item.description}
-                  </p>
-                  {longDescriptions.includes(index) && (
+                <div className="flex flex-col items-start w-full overflow-hidden">
+                  <div className="flex items-center gap-2 flex-wrap w-full">
+                    <span className="font-mono text-white shrink-0">{item.timestamp}</span>
+                    {item.isDangerous && (
+                      <span className="text-xs px-2 py-0.5 rounded-full bg-red-500/20 text-red-400 border border-red-500/30 shrink-0">
+                        Dangerous
+                      </span>
+                    )}
+                  </div>
+                  <div className="w-full mt-1.5">
                     <div 
-                      role="button"
-                      tabIndex={0}
-                      onClick={(e: React.MouseEvent) => toggleExpand(index, e)}
-                      onKeyDown={(e: React.KeyboardEvent) => e.key === 'Enter' && toggleExpand(index, e)}
-                      className={`flex items-center gap-1 text-xs mt-1 cursor-pointer ${item.isDangerous ? 'text-red-400 hover:text-red-300' : 'text-zinc-500 hover:text-zinc-300'} transition-colors`}
+                      className={`relative text-sm transition-all duration-200 ${longDescriptions.has(index) ? 'cursor-pointer' : ''}`}
+                      onClick={(e: React.MouseEvent) => longDescriptions.has(index) && toggleExpand(index, e)}
                     >
-                      {expandedItems.includes(index) ? (
-                        <>
-                          <ChevronUp className="h-3 w-3" />
-                          Show less
-                        </>
-                      ) : (
-                        <>
-                          <ChevronDown className="h-3 w-3" />
-                          Show more
-                        </>
+                      <p 
+                        data-description
+                        className={`whitespace-pre-wrap break-words ${expandedItems.has(index) ? '' : 'line-clamp-1'} ${
+                        item.isDangerous ? 'text-red-200/80' : 'text-zinc-400'
+                      }`}>
+                        {item.description}
+                      </p>
+                      {longDescriptions.has(index) && (
+                        <div 
+                          role="button"
+                          tabIndex={0}
+                          onClick={(e: React.MouseEvent) => toggleExpand(index, e)}
+                          onKeyDown={(e: React.KeyboardEvent) => e.key === 'Enter' && toggleExpand(index, e)}
+                          className={`flex items-center gap-1 text-xs mt-1 cursor-pointer ${item.isDangerous ? 'text-red-400 hover:text-red-300' : 'text-zinc-500 hover:text-zinc-300'} transition-colors`}
+                        >
+                          {expandedItems.has(index) ? (
+                            <>
+                              <ChevronUp className="h-3 w-3" />
+                              Show less
+                            </>
+                          ) : (
+                            <>
+                              <ChevronDown className="h-3 w-3" />
+                              Show more
+                            </>
+                          )}
+                        </div>
                       )}
                     </div>
-                  )}
+                  </div>
                 </div>
-              </div>
+              </Button>
             </div>
-          </Button>
-        ))}
+          ))}
+        </div>
       </div>
     </div>
   )
@@ -0,0 +1,27 @@
+"use client"
+
+import { useTranscriptSegments, type TranscriptStore } from "@/lib/transcriptStore"
+
+interface TranscriptTextProps {
+  store: TranscriptStore
+  /** Shown while there are no segments */
+  placeholder: string
+}
+
+// Session transcript. Subscribes to the transcript store, so a new segment
+// re-renders this block only; earlier segments keep their keys and are not
+// touched.
+export default function TranscriptText({ store, placeholder }: TranscriptTextProps) {
+  const segments = useTranscriptSegments(store)
+
+  if (segments.length === 0) {
+    return <p className="text-zinc-500 italic">{placeholder}</p>
+  }
+  return (
+    <p className="text-zinc-300 whitespace-pre-wrap">
+      {segments.map((segment, index) => (
+        <span key={index}>{index > 0 ? " " : ""}{segment.text}</span>
+      ))}
+    </p>
+  )
+}
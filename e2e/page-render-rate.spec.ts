@@ -0,0 +1,27 @@
+import { expect, test } from "@playwright/test"
+import { PAGE_RENDER_BUDGET_PER_SEC } from "@/lib/frameTimeMonitor"
+
+// Detection results and scheduler state reach their own subscribers, so the
+// realtime page itself must not re-render at the detection rate. ?perf=1
+// counts page renders per <Profiler> commit while recording (dev builds only,
+// which is what the dev server serves).
+const RECORD_MS = 15000
+
+test("page re-renders stay within budget while recording", async ({ page }) => {
+  await page.goto("/pages/realtimeStreamPage?perf=1")
+
+  const start = page.getByRole("button", { name: "Start Analysis" })
+  await expect(start).toBeVisible({ timeout: 2 * 60000 })
+  await start.click()
+  await expect(page.getByRole("button", { name: "Stop Analysis" })).toBeVisible()
+  await page.waitForTimeout(RECORD_MS)
+  await page.getByRole("button", { name: "Stop Analysis" }).click()
+
+  const summary = page.getByTestId("frame-time-summary")
+  await expect(summary).toBeVisible()
+  const rendersPerSec = Number(await summary.getAttribute("data-page-renders-per-sec"))
+  // The once-a-second duration tick alone re-renders the page, so zero means
+  // nothing was counted
+  expect(rendersPerSec).toBeGreaterThan(0)
+  expect(rendersPerSec).toBeLessThanOrEqual(PAGE_RENDER_BUDGET_PER_SEC)
+})
@@ -0,0 +1,314 @@
+// Adaptive scheduler for remote frame analysis. Replaces a fixed setInterval:
+// never more than `maxInFlight` requests at once (extra ticks are coalesced
+// into a single pending one), cadence follows observed round-trip latency and
+// a per-minute/per-session request and token budget, speeds up for a while
+// after a suspicious result and backs off while results stay calm. The
+// session budget is paced: the remaining requests (or tokens, at the average
+// cost so far) are spread evenly over the expected remaining session time.
+
+export type AnalysisMode = "demo" | "normal" | "conservative"
+
+export interface AnalysisOutcome {
+  suspicious: boolean
+  tokens?: number
+  /**
+   * The request was sent but aborted or dropped for a newer frame. It counts
+   * against the rate and budget, but says nothing about latency or the scene.
+   */
+  superseded?: boolean
+}
+
+export const SUPERSEDED: AnalysisOutcome = { suspicious: false, superseded: true }
+
+/**
+ * One analysis tick. Resolve to `null` when no remote request was made (e.g.
+ * the frame gate skipped it) so it does not count against latency or budget.
+ */
+export type AnalysisTask = () => Promise<AnalysisOutcome | null>
+
+export interface SchedulerClock {
+  now(): number
+  setTimeout(callback: () => void, ms: number): unknown
+  clearTimeout(handle: unknown): void
+}
+
+export interface SchedulerOptions {
+  baseIntervalMs: number
+  minIntervalMs: number
+  maxIntervalMs: number
+  maxInFlight: number
+  requestsPerMinute: number
+  /** Session budget; cadence stretches as it runs down and stops once it is spent */
+  maxRequestsPerSession: number
+  maxTokensPerSession: number
+  /** Session length the budget is paced over; past it, over another `minBudgetWindowMs` */
+  expectedSessionMs: number
+  minBudgetWindowMs: number
+  /** Interval multiplier while boosted after a suspicious result */
+  boostFactor: number
+  boostDurationMs: number
+  /** Interval multiplier applied per calm result after `calmAfter` in a row */
+  calmBackoff: number
+  calmAfter: number
+}
+
+export interface SchedulerState {
+  running: boolean
+  inFlight: number
+  queueDepth: number
+  intervalMs: number
+  /** Requests actually sent over the last minute */
+  effectiveRate: number
+  avgLatencyMs: number | null
+  boosted: boolean
+  budgetExhausted: boolean
+  requests: number
+  skipped: number
+  superseded: number
+  errors: number
+  tokens: number
+}
+
+const SHARED_OPTIONS = {
+  boostFactor: 0.5,
+  boostDurationMs: 30000,
+  calmBackoff: 1.25,
+  calmAfter: 3,
+  // The free tier's 250 requests/day, less a few for retries; a request is
+  // ~2k tokens (frame, uncached prompt, JSON answer)
+  maxRequestsPerSession: 240,
+  maxTokensPerSession: 500000,
+  minBudgetWindowMs: 10 * 60000,
+}
+
+export const ANALYSIS_MODES: Record<AnalysisMode, SchedulerOptions> = {
+  // 2 req/sec for short demos (~$0.03 for 2 min). Already at its per-minute
+  // cap, so there is no faster rate to boost to (boostFactor 1)
+  demo: { ...SHARED_OPTIONS, baseIntervalMs: 500, minIntervalMs: 500, maxIntervalMs: 2000, maxInFlight: 2, requestsPerMinute: 120, boostFactor: 1, boostDurationMs: 5000, expectedSessionMs: 2 * 60000, minBudgetWindowMs: 60000 },
+  // ~6 req/min, allows ~40 min sessions within the free tier
+  normal: { ...SHARED_OPTIONS, baseIntervalMs: 10000, minIntervalMs: 5000, maxIntervalMs: 20000, maxInFlight: 1, requestsPerMinute: 10, expectedSessionMs: 40 * 60000 },
+  // ~3 req/min, allows ~80 min sessions within the free tier
+  conservative: { ...SHARED_OPTIONS, baseIntervalMs: 20000, minIntervalMs: 10000, maxIntervalMs: 40000, maxInFlight: 1, requestsPerMinute: 5, expectedSessionMs: 80 * 60000 },
+}
+
+// Longest a quiet session goes without a remote look, per mode (FrameGate)
+export const GATE_MAX_STALENESS_MS: Record<AnalysisMode, number> = {
+  demo: 5000,
+  normal: 30000,
+  conservative: 60000,
+}
+
+const realClock: SchedulerClock = {
+  now: () => Date.now(),
+  setTimeout: (callback, ms) => setTimeout(callback, ms),
+  clearTimeout: (handle) => clearTimeout(handle as ReturnType<typeof setTimeout>),
+}
+
+// Weight of the newest sample in the latency moving average
+const LATENCY_ALPHA = 0.3
+const RATE_WINDOW_MS = 60000
+
+export class AnalysisScheduler {
+  private options: SchedulerOptions
+  private task: AnalysisTask
+  private clock: SchedulerClock
+  private listeners = new Set<(state: SchedulerState) => void>()
+  private timer: unknown = null
+  private running = false
+  private inFlight = 0
+  private pending = false
+  private nextDueAt = 0
+  private startedAt = 0
+  private avgLatencyMs: number | null = null
+  private boostUntil = 0
+  private calmStreak = 0
+  private requestTimes: number[] = []
+  private counters = { requests: 0, skipped: 0, superseded: 0, errors: 0, tokens: 0 }
+
+  constructor(task: AnalysisTask, options: SchedulerOptions, clock: SchedulerClock = realClock) {
+    this.task = task
+    this.options = options
+    this.clock = clock
+  }
+
+  start() {
+    if (this.running) return
+    this.running = true
+    this.startedAt = this.clock.now()
+    this.nextDueAt = this.startedAt
+    this.tick()
+  }
+
+  stop() {
+    this.running = false
+    this.pending = false
+    if (this.timer !== null) {
+      this.clock.clearTimeout(this.timer)
+      this.timer = null
+    }
+    this.emit()
+  }
+
+  subscribe(listener: (state: SchedulerState) => void): () => void {
+    this.listeners.add(listener)
+    return () => {
+      this.listeners.delete(listener)
+    }
+  }
+
+  /** Current cadence, after boost/backoff and latency/budget floors. */
+  intervalMs(now: number = this.clock.now()): number {
+    const { baseIntervalMs, minIntervalMs, maxIntervalMs, maxInFlight, requestsPerMinute, boostFactor, calmBackoff, calmAfter } = this.options
+
+    // Boost and backoff scale the paced interval, so a boost spends budget
+    // that later ticks then make up for
+    let interval = Math.max(baseIntervalMs, this.budgetIntervalMs(now))
+    if (now < this.boostUntil) {
+      interval *= boostFactor
+    } else if (this.calmStreak > calmAfter) {
+      interval *= Math.pow(calmBackoff, this.calmStreak - calmAfter)
+    }
+    // No point ticking faster than responses can come back
+    if (this.avgLatencyMs !== null) {
+      interval = Math.max(interval, this.avgLatencyMs / maxInFlight)
+    }
+    interval = Math.max(interval, RATE_WINDOW_MS / requestsPerMinute)
+    return Math.min(maxIntervalMs, Math.max(minIntervalMs, interval))
+  }
+
+  getState(): SchedulerState {
+    const now = this.clock.now()
+    return {
+      running: this.running,
+      inFlight: this.inFlight,
+      queueDepth: this.pending ? 1 : 0,
+      intervalMs: Math.round(this.intervalMs(now)),
+      effectiveRate: this.recentRequests(now),
+      avgLatencyMs: this.avgLatencyMs === null ? null : Math.round(this.avgLatencyMs),
+      boosted: now < this.boostUntil,
+      budgetExhausted: this.budgetExhausted(),
+      ...this.counters,
+    }
+  }
+
+  private recentRequests(now: number): number {
+    while (this.requestTimes.length > 0 && this.requestTimes[0] <= now - RATE_WINDOW_MS) {
+      this.requestTimes.shift()
+    }
+    return this.requestTimes.length
+  }
+
+  /** Interval that spreads the remaining session budget over the remaining session time. */
+  budgetIntervalMs(now: number = this.clock.now()): number {
+    const { maxRequestsPerSession, maxTokensPerSession, expectedSessionMs, minBudgetWindowMs } = this.options
+    const { requests, tokens } = this.counters
+    let remaining = maxRequestsPerSession - requests
+    if (requests > 0 && tokens > 0) {
+      remaining = Math.min(remaining, (maxTokensPerSession - tokens) / (tokens / requests))
+    }
+    if (remaining <= 0) return Infinity
+    const elapsed = this.running ? now - this.startedAt : 0
+    return Math.max(expectedSessionMs - elapsed, minBudgetWindowMs) / remaining
+  }
+
+  private budgetExhausted(): boolean {
+    const { maxRequestsPerSession, maxTokensPerSession } = this.options
+    return this.counters.requests >= maxRequestsPerSession || this.counters.tokens >= maxTokensPerSession
+  }
+
+  private schedule(at: number) {
+    if (this.timer !== null) this.clock.clearTimeout(this.timer)
+    this.timer = this.clock.setTimeout(() => {
+      this.timer = null
+      this.tick()
+    }, Math.max(0, at - this.clock.now()))
+  }
+
+  private tick() {
+    if (!this.running) return
+    if (this.budgetExhausted()) {
+      this.stop()
+      return
+    }
+
+    const now = this.clock.now()
+    if (this.inFlight >= this.options.maxInFlight) {
+      // Coalesce: run once a slot frees up instead of piling up requests
+      this.pending = true
+      this.emit()
+      return
+    }
+
+    if (this.recentRequests(now) >= this.options.requestsPerMinute) {
+      this.schedule(this.requestTimes[0] + RATE_WINDOW_MS)
+      this.emit()
+      return
+    }
+
+    this.pending = false
+    this.nextDueAt = now + this.intervalMs(now)
+    this.schedule(this.nextDueAt)
+    this.dispatch(now)
+  }
+
+  private async dispatch(startedAt: number) {
+    this.inFlight++
+    this.emit()
+
+    let outcome: AnalysisOutcome | null = null
+    let failed = false
+    try {
+      outcome = await this.task()
+    } catch (error) {
+      failed = true
+    }
+    this.inFlight--
+
+    const now = this.clock.now()
+    if (failed) {
+      this.counters.errors++
+      this.recordRequest(startedAt, now)
+    } else if (outcome?.superseded) {
+      // Our own cancellation: neither a latency sample nor a calm result
+      this.counters.superseded++
+      this.recordRequest(startedAt)
+      this.counters.tokens += outcome.tokens ?? 0
+    } else if (outcome) {
+      this.recordRequest(startedAt, now)
+      this.counters.tokens += outcome.tokens ?? 0
+      if (outcome.suspicious) {
+        this.boostUntil = now + this.options.boostDurationMs
+        this.calmStreak = 0
+      } else {
+        this.calmStreak++
+      }
+    } else {
+      this.counters.skipped++
+    }
+
+    if (this.running && this.pending) {
+      this.tick()
+    } else if (this.running && this.timer !== null) {
+      // Cadence may have changed (boost/backoff/latency); re-aim the next tick
+      this.nextDueAt = Math.min(this.nextDueAt, now + this.intervalMs(now))
+      this.schedule(this.nextDueAt)
+    }
+    this.emit()
+  }
+
+  private recordRequest(startedAt: number, finishedAt?: number) {
+    this.counters.requests++
+    this.requestTimes.push(startedAt)
+    if (finishedAt === undefined) return
+    const latency = finishedAt - startedAt
+    this.avgLatencyMs = this.avgLatencyMs === null
+      ? latency
+      : this.avgLatencyMs + LATENCY_ALPHA * (latency - this.avgLatencyMs)
+  }
+
+  private emit() {
+    if (this.listeners.size === 0) return
+    const state = this.getState()
+    this.listeners.forEach((listener) => listener(state))
+  }
+}
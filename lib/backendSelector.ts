@@ -0,0 +1,190 @@
+import type * as tfjs from "@tensorflow/tfjs"
+
+// Picks the TF.js backend for the vision pipeline by timing a small
+// MobileNet-style network (the shape of work BlazeFace/MoveNet do) on each
+// candidate: WebGL, WASM (SIMD/threads when the browser allows) and CPU. The
+// winner is persisted by the caller and reused on later loads from the same
+// device, so the benchmark only runs once. Free of DOM APIs so it can run
+// headlessly in Node (`npm run bench:backends`).
+
+export type BackendName = "webgl" | "wasm" | "cpu"
+
+export const BACKEND_CANDIDATES: BackendName[] = ["webgl", "wasm", "cpu"]
+
+export interface BackendBenchmark {
+  backend: BackendName
+  /** Median time of one workload run, null if the backend is unavailable */
+  medianMs: number | null
+  error?: string
+}
+
+export interface BackendChoice {
+  backend: BackendName
+  results: BackendBenchmark[]
+  measuredAt: number
+  /** Device the benchmark ran on; a different one re-runs it */
+  fingerprint: string
+}
+
+export interface BackendSelectionOptions {
+  candidates: BackendName[]
+  /** Timed runs per backend, after one untimed warm-up run */
+  runs: number
+  /** Workload input size (square) */
+  inputSize: number
+  /** Re-benchmark once a stored choice is older than this */
+  maxAgeMs: number
+  /** Called right after a backend is activated, e.g. to set its flags */
+  onActivate?: (backend: BackendName) => void
+}
+
+export const DEFAULT_BACKEND_SELECTION: BackendSelectionOptions = {
+  candidates: BACKEND_CANDIDATES,
+  runs: 5,
+  inputSize: 192,
+  maxAgeMs: 7 * 24 * 60 * 60 * 1000,
+}
+
+export interface BackendSelection {
+  choice: BackendChoice
+  /** True when a stored choice was reused without benchmarking */
+  reused: boolean
+}
+
+interface Workload {
+  run(): Promise<void>
+  dispose(): void
+}
+
+/** Strided convolutions plus depthwise-separable blocks with random weights. */
+export function createBenchmarkWorkload(tf: typeof tfjs, inputSize: number = DEFAULT_BACKEND_SELECTION.inputSize): Workload {
+  const input = tf.randomUniform([1, inputSize, inputSize, 3]) as tfjs.Tensor4D
+  const stem = tf.randomNormal([3, 3, 3, 16]) as tfjs.Tensor4D
+  const depthwise1 = tf.randomNormal([3, 3, 16, 1]) as tfjs.Tensor4D
+  const pointwise1 = tf.randomNormal([1, 1, 16, 32]) as tfjs.Tensor4D
+  const depthwise2 = tf.randomNormal([3, 3, 32, 1]) as tfjs.Tensor4D
+  const pointwise2 = tf.randomNormal([1, 1, 32, 64]) as tfjs.Tensor4D
+
+  return {
+    async run() {
+      const output = tf.tidy(() => {
+        let x = tf.relu6(tf.conv2d(input, stem, 2, "same"))
+        x = tf.relu6(tf.conv2d(tf.depthwiseConv2d(x, depthwise1, 2, "same"), pointwise1, 1, "same"))
+        x = tf.relu6(tf.conv2d(tf.depthwiseConv2d(x, depthwise2, 2, "same"), pointwise2, 1, "same"))
+        return tf.mean(x)
+      })
+      // Reading the result waits for the GPU, so the timing is honest
+      await output.data()
+      output.dispose()
+    },
+    dispose() {
+      tf.dispose([input, stem, depthwise1, pointwise1, depthwise2, pointwise2])
+    },
+  }
+}
+
+function median(values: number[]): number {
+  const sorted = [...values].sort((a, b) => a - b)
+  return sorted[Math.floor(sorted.length / 2)]
+}
+
+async function activate(tf: typeof tfjs, backend: BackendName, onActivate?: (backend: BackendName) => void): Promise<boolean> {
+  try {
+    if (!(await tf.setBackend(backend))) return false
+    await tf.ready()
+    onActivate?.(backend)
+    return true
+  } catch {
+    return false
+  }
+}
+
+/** Times the workload on one backend. Leaves that backend active. */
+export async function benchmarkBackend(
+  tf: typeof tfjs,
+  backend: BackendName,
+  options: Partial<BackendSelectionOptions> = {}
+): Promise<BackendBenchmark> {
+  const { runs, inputSize, onActivate } = { ...DEFAULT_BACKEND_SELECTION, ...options }
+  if (!(await activate(tf, backend, onActivate))) {
+    return { backend, medianMs: null, error: "unavailable" }
+  }
+
+  let workload: Workload | null = null
+  try {
+    workload = createBenchmarkWorkload(tf, inputSize)
+    // First run compiles shaders / instantiates kernels
+    await workload.run()
+    const times: number[] = []
+    for (let i = 0; i < runs; i++) {
+      const started = performance.now()
+      await workload.run()
+      times.push(performance.now() - started)
+    }
+    return { backend, medianMs: median(times) }
+  } catch (err) {
+    return { backend, medianMs: null, error: (err as Error).message }
+  } finally {
+    workload?.dispose()
+  }
+}
+
+/**
+ * Activates the fastest backend. A `previous` choice for the same
+ * `fingerprint` that is recent enough and still activates is reused as is.
+ */
+export async function selectBackend(
+  tf: typeof tfjs,
+  fingerprint: string,
+  previous: BackendChoice | null = null,
+  options: Partial<BackendSelectionOptions> = {}
+): Promise<BackendSelection> {
+  const settings = { ...DEFAULT_BACKEND_SELECTION, ...options }
+  const fresh = previous &&
+    previous.fingerprint === fingerprint &&
+    Date.now() - previous.measuredAt < settings.maxAgeMs &&
+    settings.candidates.includes(previous.backend)
+  if (previous && fresh && (await activate(tf, previous.backend, settings.onActivate))) {
+    return { choice: previous, reused: true }
+  }
+
+  const results: BackendBenchmark[] = []
+  for (const backend of settings.candidates) {
+    results.push(await benchmarkBackend(tf, backend, settings))
+  }
+  const available = results.filter((result) => result.medianMs !== null)
+  if (available.length === 0) {
+    throw new Error(`No usable TF.js backend (${results.map((r) => `${r.backend}: ${r.error}`).join(", ")})`)
+  }
+  const best = available.reduce((a, b) => (b.medianMs! < a.medianMs! ? b : a))
+  await activate(tf, best.backend, settings.onActivate)
+  return {
+    choice: { backend: best.backend, results, measuredAt: Date.now(), fingerprint },
+    reused: false,
+  }
+}
+
+const STORAGE_KEY = "phenomitor.tfBackend"
+
+/** Stored choice from localStorage (main thread only; the worker gets it in its init message). */
+export function loadBackendChoice(): BackendChoice | null {
+  try {
+    const stored = typeof localStorage !== "undefined" ? localStorage.getItem(STORAGE_KEY) : null
+    return stored ? (JSON.parse(stored) as BackendChoice) : null
+  } catch {
+    return null
+  }
+}
+
+export function saveBackendChoice(choice: BackendChoice) {
+  try {
+    localStorage.setItem(STORAGE_KEY, JSON.stringify(choice))
+  } catch {
+    // Private browsing / storage disabled: benchmark again next time
+  }
+}
+
+export function deviceFingerprint(): string {
+  if (typeof navigator === "undefined") return "unknown"
+  return `${navigator.userAgent}|${navigator.hardwareConcurrency ?? 0}`
+}
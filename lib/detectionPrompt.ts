@@ -0,0 +1,206 @@
+import type { GenerationConfig, ResponseSchema, SchemaType } from "@google/generative-ai";
+
+// Cheating-detection prompt for the frame analysis model. The instructions are
+// immutable and split around the only dynamic piece (the audio transcript).
+// `DETECTION_SYSTEM_INSTRUCTION` joins the fixed parts for the model's system
+// instruction / context cache; per-frame requests only carry the transcript.
+
+export const DETECTION_PROMPT_HEAD = `Analyze this interview video frame for potential cheating or dishonest behavior. Look for these specific indicators:
+
+1. **Eye Movement Patterns:**
+   - Reading behavior: Consistent left-to-right eye movements suggesting script reading
+   - Repeated glances to same off-screen location (notes, second monitor, phone)
+   - Looking down frequently (reading from desk/lap)
+   - Looking to the side repeatedly (consulting materials or another person)
+   - Unnatural eye patterns that don't match conversation flow
+   - Gaze moving in short, repeated loops consistent with scanning text
+   - Eyes scanning a bullet list rhythmically
+   - Looking from left monitor → center → right monitor in predictable sequence
+
+2. **Gaze Direction Anomalies:**
+   - Eyes not focused on camera during responses
+   - Systematic shifts away from camera at specific question times
+   - Looking up excessively (accessing written materials above screen)
+   - Darting eye movements between camera and off-screen locations
+   - Quick eye darting right after hearing question (reading AI-generated text)
+
+3. **Audio-Based Cheating Indicators:**
+   - Candidate's mouth moving before audio starts (listening to someone else first)
+   - Slight delays as they listen before speaking (earpiece coaching)
+   - Repeating "Let me think..." while clearly reading
+   - Overly robotic, monotone answers suggesting reading
+
+4. **Physical Indicators:**
+   - Multiple people visible in frame
+   - Person appears to be typing while answering verbal questions
+   - Earbuds/headphones visible (potential for coaching)
+   - Phone visible in hand or on desk
+   - Papers or notes visible in frame
+   - Second monitor reflection visible in glasses
+   - Touching earbuds to unmute hidden microphone
+   - Using smartwatch to scroll for answers
+   - Looking down and swiping phone screen off-frame
+   - Sticky notes on monitor bezel
+   - Mirror placed behind camera
+   - Mini whiteboard beside laptop
+
+5. **Behavioral Patterns:**
+   - Unnatural pauses before answering (waiting for prompts)
+   - Mouth movements not matching audio (if transcript provided)
+   - Person looking at keyboard while supposedly listening
+   - Sudden posture changes when responding
+   - Sudden increase in eye blinking when glancing at reference material
+   - Abrupt "freeze" posture while listening to secret coaching
+   - Desk vibrations or hand movements suggesting someone else typing
+
+6. **Device Interaction Cheating:**
+   - Silent phone notifications lighting up desk or face
+   - Frequent tab-switching (reflection visible in glasses)
+   - Keyboard shortcuts indicating pasting AI-generated answers
+   - Candidate briefly glances at screen with rapidly changing text
+   - Alt-tabbing frequently
+   - Visible white flashes from documents or searches
+   - Cursor moving unnaturally (remote desktop control)
+
+7. **Environmental Red Flags:**
+   - Multiple screens visible
+   - Another person partially visible in background or shadow on wall
+   - Suspicious objects on desk (phone, tablet, notes, book, extra laptop)
+   - Candidate positioning suggests viewing off-camera content
+   - Strategic camera framing hiding one side of desk
+   - Camera angled upward to obscure desk surfaces
+   - Sudden changes in room lighting (screen switching)
+   - Someone else's presence moving quietly behind camera
+   - Small teleprompter above webcam
+
+8. **Timing-Based Cheating:**
+   - Long pause before easy questions (waiting for help)
+   - Fast answers for complex questions (reading pre-written notes)
+   - Inconsistent response pattern: slow → fast → slow → fast
+
+`;
+
+const TRANSCRIPT_INSTRUCTIONS = `
+
+ANALYZE THE VISUAL FRAME for audio-related cheating indicators:
+- **Hands on keyboard while speaking**: If you see candidate's hands positioned on keyboard or typing while they should be talking → isDangerous=true
+- **Mouth moving but no speech**: Candidate appears to be whispering or mouthing words silently
+- **Looking down while hands move**: Indicates typing or writing notes during interview
+`;
+
+export const DETECTION_PROMPT_TAIL = `
+
+CRITICAL FLAGGING CRITERIA - FLAG AS isDangerous=true IF YOU SEE:
+
+**STRICT EYE MOVEMENT MONITORING (HIGHEST PRIORITY):**
+- **LEFT-TO-RIGHT eye scanning**: ANY horizontal eye movement pattern = READING TEXT → isDangerous=true
+  - Even if looking at camera level, if pupils shift left→right = READING FROM SCREEN → isDangerous=true
+  - This includes reading from browser tabs, notes on screen, teleprompter
+- **Eyes not centered on camera**: If gaze is slightly left, center, or right of camera = reading different parts of screen → isDangerous=true
+- **Systematic scanning**: Eyes moving in reading pattern (left→right, return, left→right) = READING → isDangerous=true
+- **Pupils tracking across screen**: Any smooth horizontal movement of pupils = READING → isDangerous=true
+- **Eyes shifting between screen areas**: Looking at different parts of monitor = consulting multiple sources → isDangerous=true
+
+CRITICAL: If candidate is looking at screen at camera level but eyes move horizontally (even slightly) = READING A SCRIPT on the same screen as the interview window → isDangerous=true
+
+This is EXTREMELY important - many people read scripts positioned next to the camera window. Flag ANY horizontal eye movement.
+
+**Other Red Flags:**
+- **Looking down at desk/lap**: Eyes directed downward repeatedly (reading notes below camera)
+- **Looking off to the side**: Eyes consistently glancing to left or right side of screen (second monitor or notes beside camera)
+- **Device visible**: Phone, tablet, second monitor, smartwatch visible in frame
+- **Notes/materials visible**: Papers, sticky notes, books, whiteboard visible on desk or walls
+- **Multiple people**: Another person visible in frame or background
+- **Typing while answering**: Hands on keyboard during verbal responses
+- **Earbuds/headphones**: Wearing audio devices that could receive coaching
+- **Not looking at camera**: Eyes consistently avoiding camera while responding
+- **Repetitive glance pattern**: Looking at same spot repeatedly (checking reference material)
+
+IGNORE: Camera angle/positioning is normal - DO NOT flag this.
+
+CRITICAL: ANY horizontal eye scanning movement = isDangerous=true. Be EXTREMELY strict about left-to-right eye movements.
+
+If you see ANY of the above patterns (especially horizontal eye movement), SET isDangerous=true IMMEDIATELY.
+
+Return a JSON object in this exact format:
+
+{
+    "events": [
+        {
+            "timestamp": "mm:ss",
+            "description": "Brief description of observed behavior",
+            "isDangerous": true/false // SET TO TRUE if any of the critical criteria above are met
+        }
+    ]
+}`;
+
+export function transcriptSection(transcript: string): string {
+    return `Audio transcript captured: "${transcript}"` + TRANSCRIPT_INSTRUCTIONS;
+}
+
+// Flags from the browser's object detector (lib/objectSignals.ts). They are
+// already counted as strikes client-side, so the model should not repeat them.
+export function localSignalsSection(summary: string): string {
+    return `On-device object detector, last few seconds: ${summary}. These are already recorded; do not report them again. Focus on behaviour the detector cannot see (gaze, typing, audio cues).`;
+}
+
+// How the frame image is composed, see lib/roiMosaic.ts. 'full' is the plain
+// downscaled camera frame.
+export type FrameLayout = 'full' | 'mosaic';
+
+export const MOSAIC_INSTRUCTIONS = `The image is a composite of three crops from the same camera frame:
+- Left (large square): the candidate's face at full camera resolution. Judge gaze direction, eye movements, mouth and earbuds from this crop.
+- Top right (small): the whole frame, downscaled. Use it for other people, screens and the room.
+- Bottom right: the area below the face (hands, desk, lap). Use it for phones, notes and typing.
+The black borders between the crops are not part of the scene.`;
+
+export function buildDetectionPrompt(transcript: string = '', localSignals: string = '', layout: FrameLayout = 'full'): string {
+    return DETECTION_PROMPT_HEAD
+        + (transcript ? transcriptSection(transcript) : '')
+        + (localSignals ? '\n\n' + localSignalsSection(localSignals) : '')
+        + (layout === 'mosaic' ? '\n\n' + MOSAIC_INSTRUCTIONS : '')
+        + DETECTION_PROMPT_TAIL;
+}
+
+export const DETECTION_SYSTEM_INSTRUCTION = DETECTION_PROMPT_HEAD.trimEnd() + '\n\n' + DETECTION_PROMPT_TAIL.trimStart();
+
+// Batched requests send several consecutive frames in one call so the model
+// can judge movement (scanning, repeated glances) that a single still cannot show.
+export function batchInstructions(frameCount: number, windowMs: number): string {
+    return `The following ${frameCount} images are consecutive frames from the same interview, captured over ${(windowMs / 1000).toFixed(1)} seconds and labelled with their time offset. Judge them together: compare eye, head and hand positions across frames to detect scanning, repeated glances and other patterns that need movement to see.
+
+Report each observed behavior once, on the frame where it is clearest, and add a "frame" field with that frame's number to every event, e.g. {"timestamp": "mm:ss", "frame": 2, "description": "...", "isDangerous": true}.`;
+}
+
+export function batchFrameLabel(index: number, offsetMs: number): string {
+    return `Frame ${index} (+${(offsetMs / 1000).toFixed(1)}s):`;
+}
+
+// Structured output: the model is constrained to this shape, so responses no
+// longer need to be dug out of code fences. `frame` is only set for batches.
+// (SchemaType is an SDK enum; its string values are used so this module has no
+// runtime dependency on the SDK.)
+export const DETECTION_RESPONSE_SCHEMA: ResponseSchema = {
+    type: 'object' as SchemaType,
+    properties: {
+        events: {
+            type: 'array' as SchemaType,
+            items: {
+                type: 'object' as SchemaType,
+                properties: {
+                    timestamp: { type: 'string' as SchemaType, description: 'mm:ss' },
+                    frame: { type: 'integer' as SchemaType, description: 'Frame number for batched requests' },
+                    description: { type: 'string' as SchemaType, description: 'Brief description of observed behavior' },
+                    isDangerous: { type: 'boolean' as SchemaType },
+                },
+                required: ['timestamp', 'description', 'isDangerous'],
+            },
+        },
+    },
+    required: ['events'],
+};
+
+export const DETECTION_GENERATION_CONFIG: GenerationConfig = {
+    responseMimeType: 'application/json',
+    responseSchema: DETECTION_RESPONSE_SCHEMA,
+};
@@ -0,0 +1,120 @@
+// Paces the face/pose detection loop by what inference actually costs on this
+// machine. An EWMA of per-tick inference time sets the interval so inference
+// takes at most `budget` of wall time; when even the slowest allowed rate
+// blows the budget the input resolution steps down, and when there is plenty
+// of headroom at the fastest rate it steps back up. Detection pauses while
+// the tab is hidden.
+
+export interface DetectionRateOptions {
+  /** Fraction of wall time inference may use */
+  budget: number
+  /** Fastest detection rate (ms between ticks) */
+  minIntervalMs: number
+  /** Slowest detection rate before resolution is reduced instead */
+  maxIntervalMs: number
+  /** Inference input widths to choose from, ascending */
+  inputWidths: number[]
+  /** EWMA weight of the newest sample */
+  smoothing: number
+  /** Ticks to wait after a resolution change before changing it again */
+  settleTicks: number
+}
+
+export const DEFAULT_DETECTION_RATE: DetectionRateOptions = {
+  budget: 0.4,
+  minIntervalMs: 66,
+  maxIntervalMs: 250,
+  // MoveNet resizes to 192 px internally, so going lower only loses detail
+  inputWidths: [192, 256, 320, 416],
+  smoothing: 0.2,
+  settleTicks: 20,
+}
+
+export interface DetectionRateState {
+  intervalMs: number
+  inputWidth: number
+  /** Smoothed inference time per tick */
+  costMs: number
+  paused: boolean
+}
+
+export class DetectionRateController {
+  private options: DetectionRateOptions
+  private widthIndex: number
+  private costMs: number | null = null
+  private lastTickAt = -Infinity
+  private ticksSinceResize = 0
+  private hidden = false
+  intervalMs: number
+
+  constructor(initialInputWidth: number, options: Partial<DetectionRateOptions> = {}) {
+    this.options = { ...DEFAULT_DETECTION_RATE, ...options }
+    const { inputWidths } = this.options
+    // Start at the closest rung to the pipeline's current width
+    this.widthIndex = inputWidths.reduce(
+      (best, width, index) => (Math.abs(width - initialInputWidth) < Math.abs(inputWidths[best] - initialInputWidth) ? index : best),
+      0
+    )
+    this.intervalMs = 100
+  }
+
+  get inputWidth(): number {
+    return this.options.inputWidths[this.widthIndex]
+  }
+
+  get paused(): boolean {
+    return this.hidden
+  }
+
+  /** Whether a detection tick should start at `now`; marks it started if so. */
+  tick(now: number): boolean {
+    if (this.hidden || now - this.lastTickAt < this.intervalMs) return false
+    this.lastTickAt = now
+    return true
+  }
+
+  /**
+   * Records the inference time of a finished tick. Returns the new input
+   * width when the resolution should change, otherwise null.
+   */
+  record(costMs: number): number | null {
+    const { budget, minIntervalMs, maxIntervalMs, inputWidths, smoothing, settleTicks } = this.options
+    this.costMs = this.costMs === null ? costMs : this.costMs + smoothing * (costMs - this.costMs)
+    this.ticksSinceResize++
+
+    const wanted = this.costMs / budget
+    this.intervalMs = Math.min(maxIntervalMs, Math.max(minIntervalMs, wanted))
+    if (this.ticksSinceResize < settleTicks) return null
+
+    let next = this.widthIndex
+    if (wanted > maxIntervalMs && this.widthIndex > 0) {
+      next--
+    } else if (this.widthIndex < inputWidths.length - 1) {
+      // Cost scales roughly with pixel count; only step up if the larger
+      // input would still fit at the fastest rate
+      const scale = (inputWidths[this.widthIndex + 1] / inputWidths[this.widthIndex]) ** 2
+      if (wanted * scale <= minIntervalMs) next++
+    }
+    if (next === this.widthIndex) return null
+
+    const scale = (inputWidths[next] / inputWidths[this.widthIndex]) ** 2
+    this.costMs *= scale
+    this.widthIndex = next
+    this.ticksSinceResize = 0
+    return this.inputWidth
+  }
+
+  /** Pauses detection while the page is hidden (wire to `visibilitychange`). */
+  setHidden(hidden: boolean) {
+    this.hidden = hidden
+  }
+
+  state(): DetectionRateState {
+    return {
+      intervalMs: Math.round(this.intervalMs),
+      inputWidth: this.inputWidth,
+      costMs: Math.round((this.costMs ?? 0) * 10) / 10,
+      paused: this.hidden,
+    }
+  }
+}
@@ -0,0 +1,155 @@
+import type { Part } from "@google/generative-ai";
+import { batchFrameLabel, batchInstructions } from "./detectionPrompt";
+import type { FrameLayout } from "./detectionPrompt";
+import { getDetectionModel, getPromptParts, recordParse, recordUsage } from "./geminiRegistry";
+import { EventArrayParser, parseEventsResponse } from "./incrementalJson";
+
+// Server-only detection core shared by the `detectEvents` server action and the
+// binary `/api/detect/stream` route handler. Callers hand over the raw base64 JPEG
+// payload; decoding/encoding of the transport format happens at the edges.
+
+export interface VideoEvent {
+    timestamp: string;
+    description: string;
+    isDangerous: boolean;
+    /** Index of the frame the event was seen in, for batched requests */
+    frame?: number;
+}
+
+export interface DetectionResult {
+    events: VideoEvent[];
+    rawResponse: string;
+    /** Total tokens billed for the request, for client-side budgeting */
+    tokens?: number;
+}
+
+export interface DetectionOptions {
+    /** Aborts the model call when the client has dropped the frame */
+    signal?: AbortSignal;
+    /** Summary of flags from the browser's object detector, see lib/objectSignals.ts */
+    localSignals?: string;
+    /** How the frame images are composed; 'mosaic' frames carry a face crop, see lib/roiMosaic.ts */
+    layout?: FrameLayout;
+}
+
+export interface BatchFrame {
+    imageBase64: string;
+    /** Capture time relative to the first frame of the batch */
+    offsetMs: number;
+}
+
+export type DetectionStreamMessage =
+    | { type: 'event'; event: VideoEvent }
+    | { type: 'done'; rawResponse: string; tokens?: number };
+
+function imagePart(imageBase64: string): Part {
+    return {
+        inlineData: {
+            data: imageBase64,
+            mimeType: 'image/jpeg'
+        },
+    };
+}
+
+async function generateEvents(contentParts: Part[], options: DetectionOptions): Promise<DetectionResult> {
+    const model = await getDetectionModel();
+
+    try {
+        const result = await model.generateContent(contentParts, { signal: options.signal });
+
+        const response = await result.response;
+        recordUsage(response.usageMetadata);
+        const text = response.text();
+        console.log('Raw API Response:', text);
+
+        // Structured output is plain JSON; the tolerant parser also copes with
+        // code fences, prose and truncation, keeping every event that parses
+        const parsed = parseEventsResponse<VideoEvent>(text);
+        recordParse(parsed.failures, parsed.recovered);
+        if (parsed.failures > 0) {
+            console.warn(`Skipped ${parsed.failures} unparseable part(s) of the API response`);
+            if (parsed.events.length === 0) {
+                throw new Error('Failed to parse API response');
+            }
+        }
+        return {
+            events: parsed.events,
+            rawResponse: text,
+            tokens: response.usageMetadata?.totalTokenCount
+        };
+
+    } catch (error) {
+        console.error('Error calling API:', error);
+        throw error;
+    }
+}
+
+export async function detectEventsFromImage(imageBase64: string, transcript: string = '', options: DetectionOptions = {}): Promise<DetectionResult> {
+    console.log('Starting frame analysis...');
+    try {
+        if (!imageBase64) {
+            throw new Error("No image data provided");
+        }
+
+        console.log('Sending image to API...', { imageSize: imageBase64.length });
+        return await generateEvents([
+            ...getPromptParts(transcript, options.localSignals, options.layout),
+            imagePart(imageBase64),
+        ], options);
+    } catch (error) {
+        console.error('Error in detectEventsFromImage:', error);
+        throw error;
+    }
+}
+
+function buildBatchParts(frames: BatchFrame[], transcript: string, options: DetectionOptions): Part[] {
+    const windowMs = frames[frames.length - 1].offsetMs - frames[0].offsetMs;
+    const parts: Part[] = [
+        ...getPromptParts(transcript, options.localSignals, options.layout),
+        { text: batchInstructions(frames.length, windowMs) },
+    ];
+    frames.forEach((frame, index) => {
+        parts.push({ text: batchFrameLabel(index, frame.offsetMs) }, imagePart(frame.imageBase64));
+    });
+    return parts;
+}
+
+// Keep frame indexes in range so clients can map them to capture times
+function clampFrame(event: VideoEvent, frameCount: number): VideoEvent {
+    if (frameCount <= 1) return event;
+    return { ...event, frame: Math.min(Math.max(Math.round(event.frame ?? 0), 0), frameCount - 1) };
+}
+
+/**
+ * Analyzes one frame, or a short window of consecutive frames, in a single
+ * request. Yields each event as soon as its JSON object is complete in the
+ * model output, then a final `done` message with the raw response and token
+ * usage. Events of a batch carry the index of the frame they were seen in.
+ */
+export async function* streamEventsFromFrames(frames: BatchFrame[], transcript: string = '', options: DetectionOptions = {}): AsyncGenerator<DetectionStreamMessage> {
+    if (frames.length === 0 || frames.some(frame => !frame.imageBase64)) {
+        throw new Error("No image data provided");
+    }
+
+    const parts = frames.length === 1
+        ? [...getPromptParts(transcript, options.localSignals, options.layout), imagePart(frames[0].imageBase64)]
+        : buildBatchParts(frames, transcript, options);
+    const model = await getDetectionModel();
+    const result = await model.generateContentStream(parts, { signal: options.signal });
+
+    const parser = new EventArrayParser<VideoEvent>();
+    let text = '';
+    for await (const chunk of result.stream) {
+        const piece = chunk.text();
+        text += piece;
+        for (const event of parser.push(piece)) {
+            yield { type: 'event', event: clampFrame(event, frames.length) };
+        }
+    }
+
+    const response = await result.response;
+    recordUsage(response.usageMetadata);
+    recordParse(parser.parseFailures + (parser.found ? 0 : 1), false);
+    console.log('Raw API Response:', text);
+    yield { type: 'done', rawResponse: text, tokens: response.usageMetadata?.totalTokenCount };
+}
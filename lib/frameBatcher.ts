@@ -0,0 +1,95 @@
+import { encodeCanvasJpeg } from "./frameTransport"
+
+// Buffers downscaled frames between analysis requests so one multimodal call
+// can cover a short window of motion. Frames are captured at
+// `windowMs / maxFrames` spacing; the buffer keeps only the newest
+// `maxFrames` frames that fall inside `windowMs`, and `flush` hands them over
+// (oldest first) when the scheduler fires.
+
+export interface BatcherOptions {
+  maxFrames: number
+  windowMs: number
+  width: number
+  height: number
+  quality: number
+}
+
+export interface BufferedFrame {
+  blob: Blob
+  capturedAt: number
+}
+
+export const DEFAULT_BATCHER_OPTIONS: BatcherOptions = {
+  maxFrames: 4,
+  windowMs: 3000,
+  width: 320,
+  height: 180,
+  quality: 0.7,
+}
+
+export class FrameBatcher {
+  readonly options: BatcherOptions
+  private frames: BufferedFrame[] = []
+  private lastCaptureAt = -Infinity
+  private canvas: HTMLCanvasElement | OffscreenCanvas | null = null
+
+  constructor(options: Partial<BatcherOptions> = {}) {
+    this.options = { ...DEFAULT_BATCHER_OPTIONS, ...options }
+  }
+
+  get size(): number {
+    return this.frames.length
+  }
+
+  get captureIntervalMs(): number {
+    return this.options.windowMs / this.options.maxFrames
+  }
+
+  /** Whether the next frame is due at `now`. */
+  due(now: number): boolean {
+    return now - this.lastCaptureAt >= this.captureIntervalMs
+  }
+
+  add(blob: Blob, capturedAt: number) {
+    this.lastCaptureAt = Math.max(this.lastCaptureAt, capturedAt)
+    this.frames.push({ blob, capturedAt })
+    const oldest = capturedAt - this.options.windowMs
+    while (
+      this.frames.length > this.options.maxFrames ||
+      (this.frames.length > 0 && this.frames[0].capturedAt < oldest)
+    ) {
+      this.frames.shift()
+    }
+  }
+
+  /** Draws `source` into the downscaled capture canvas and buffers the JPEG. */
+  async capture(source: CanvasImageSource, capturedAt: number): Promise<void> {
+    this.lastCaptureAt = capturedAt
+    const canvas = this.getCanvas()
+    const context = canvas.getContext("2d") as CanvasRenderingContext2D | OffscreenCanvasRenderingContext2D | null
+    if (!context) return
+    context.drawImage(source, 0, 0, this.options.width, this.options.height)
+    const blob = await encodeCanvasJpeg(canvas, this.options.quality)
+    if (blob) this.add(blob, capturedAt)
+  }
+
+  flush(): BufferedFrame[] {
+    const frames = this.frames
+    this.frames = []
+    return frames
+  }
+
+  private getCanvas(): HTMLCanvasElement | OffscreenCanvas {
+    if (!this.canvas) {
+      const { width, height } = this.options
+      if (typeof OffscreenCanvas !== "undefined") {
+        this.canvas = new OffscreenCanvas(width, height)
+      } else {
+        this.canvas = document.createElement("canvas")
+        this.canvas.width = width
+        this.canvas.height = height
+      }
+    }
+    return this.canvas
+  }
+}
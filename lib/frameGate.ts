@@ -0,0 +1,234 @@
+// Local pre-filter for remote frame analysis. Each analysis tick is scored
+// against the last frame that was actually sent to the model, using signals
+// the TF.js loop already produces (pose keypoints, face boxes) plus a 64-bit
+// average hash of the frame. Only meaningful change, or a frame that has gone
+// too long without a remote look, escalates to Gemini. `evaluate` only
+// decides; the caller `commit`s the sample once its request has been sent, so
+// a capture or request that never happens does not become the new baseline.
+// With the optional object detector on, a newly confirmed phone or person
+// escalates at once. An empty confirmed object set never stretches the
+// staleness limit: the detector cannot see gaze, which only the model judges.
+
+export interface GateKeypoint {
+  x: number
+  y: number
+  score?: number
+}
+
+export interface GateFace {
+  topLeft: [number, number]
+  bottomRight: [number, number]
+}
+
+export interface GateSample {
+  keypoints: GateKeypoint[]
+  faces: GateFace[]
+  /** 64-bit average hash as [high, low] 32-bit words, see `averageHash` */
+  frameHash: [number, number] | null
+  /** Source frame width, used to normalise keypoint displacement */
+  frameWidth: number
+  /**
+   * Confirmed object-detector flags (lib/objectSignals.ts), `[]` when the
+   * detector sees nothing of interest and null/absent when it is off or settling
+   */
+  objectFlags?: readonly string[] | null
+}
+
+export interface GateOptions {
+  /** Change score (max of the normalised components) that triggers a call */
+  threshold: number
+  /** Always escalate when the last remote call is older than this */
+  maxStalenessMs: number
+  /** Mean keypoint displacement, as a fraction of frame width, scored as 1 */
+  keypointScale: number
+  /** Face centre drift, as a fraction of face size, scored as 1 */
+  faceDriftScale: number
+  /** Hash Hamming distance (bits out of 64) scored as 1 */
+  hashBitsScale: number
+  minKeypointScore: number
+}
+
+export type GateReason = "first" | "objects" | "change" | "stale" | "quiet"
+
+export interface GateDecision {
+  escalate: boolean
+  reason: GateReason
+  score: number
+}
+
+export interface GateStats {
+  evaluated: number
+  escalated: number
+  skipped: number
+}
+
+export const DEFAULT_GATE_OPTIONS: GateOptions = {
+  threshold: 1,
+  maxStalenessMs: 30000,
+  keypointScale: 0.05,
+  faceDriftScale: 0.25,
+  hashBitsScale: 10,
+  minKeypointScore: 0.3,
+}
+
+export const HASH_SIZE = 8
+
+/**
+ * Computes a 64-bit average hash from the RGBA pixels of an 8x8 downscale of
+ * the frame (draw the video into an 8x8 canvas and pass `getImageData().data`).
+ */
+export function averageHash(rgba: Uint8ClampedArray): [number, number] {
+  const pixels = HASH_SIZE * HASH_SIZE
+  const luma = new Float32Array(pixels)
+  let mean = 0
+  for (let i = 0; i < pixels; i++) {
+    const offset = i * 4
+    luma[i] = 0.299 * rgba[offset] + 0.587 * rgba[offset + 1] + 0.114 * rgba[offset + 2]
+    mean += luma[i]
+  }
+  mean /= pixels
+
+  let high = 0
+  let low = 0
+  for (let i = 0; i < pixels; i++) {
+    if (luma[i] <= mean) continue
+    if (i < 32) high |= 1 << i
+    else low |= 1 << (i - 32)
+  }
+  return [high >>> 0, low >>> 0]
+}
+
+function popcount(value: number): number {
+  value = value - ((value >>> 1) & 0x55555555)
+  value = (value & 0x33333333) + ((value >>> 2) & 0x33333333)
+  return (((value + (value >>> 4)) & 0x0f0f0f0f) * 0x01010101) >>> 24
+}
+
+export function hashDistance(a: [number, number], b: [number, number]): number {
+  return popcount(a[0] ^ b[0]) + popcount(a[1] ^ b[1])
+}
+
+function keypointDisplacement(a: GateKeypoint[], b: GateKeypoint[], minScore: number): number {
+  let total = 0
+  let count = 0
+  const length = Math.min(a.length, b.length)
+  for (let i = 0; i < length; i++) {
+    if ((a[i].score ?? 0) < minScore || (b[i].score ?? 0) < minScore) continue
+    total += Math.hypot(a[i].x - b[i].x, a[i].y - b[i].y)
+    count++
+  }
+  return count > 0 ? total / count : 0
+}
+
+function faceDrift(a: GateFace, b: GateFace): number {
+  const size = Math.max(
+    a.bottomRight[0] - a.topLeft[0],
+    a.bottomRight[1] - a.topLeft[1],
+    1
+  )
+  const dx = (b.topLeft[0] + b.bottomRight[0] - a.topLeft[0] - a.bottomRight[0]) / 2
+  const dy = (b.topLeft[1] + b.bottomRight[1] - a.topLeft[1] - a.bottomRight[1]) / 2
+  const sizeB = Math.max(b.bottomRight[0] - b.topLeft[0], b.bottomRight[1] - b.topLeft[1], 1)
+  return Math.hypot(dx, dy) / size + Math.abs(sizeB - size) / size
+}
+
+const faceCentre = (face: GateFace): [number, number] => [
+  (face.topLeft[0] + face.bottomRight[0]) / 2,
+  (face.topLeft[1] + face.bottomRight[1]) / 2,
+]
+
+// Largest drift between each face and the nearest unclaimed face of the other
+// frame; detectors do not keep faces in the same order between frames
+function maxFaceDrift(reference: GateFace[], faces: GateFace[]): number {
+  const claimed = new Set<number>()
+  let max = 0
+  for (const face of faces) {
+    const [x, y] = faceCentre(face)
+    let nearest = -1
+    let nearestDistance = Infinity
+    reference.forEach((candidate, i) => {
+      if (claimed.has(i)) return
+      const [cx, cy] = faceCentre(candidate)
+      const distance = Math.hypot(cx - x, cy - y)
+      if (distance < nearestDistance) {
+        nearest = i
+        nearestDistance = distance
+      }
+    })
+    if (nearest === -1) return Infinity
+    claimed.add(nearest)
+    max = Math.max(max, faceDrift(reference[nearest], face))
+  }
+  return max
+}
+
+export class FrameGate {
+  private options: GateOptions
+  private reference: GateSample | null = null
+  private lastSentAt = 0
+  readonly stats: GateStats = { evaluated: 0, escalated: 0, skipped: 0 }
+
+  constructor(options: Partial<GateOptions> = {}) {
+    this.options = { ...DEFAULT_GATE_OPTIONS, ...options }
+  }
+
+  /** Change score of `sample` against the last committed frame. */
+  score(sample: GateSample): number {
+    const reference = this.reference
+    if (!reference) return Infinity
+    const { keypointScale, faceDriftScale, hashBitsScale, minKeypointScore } = this.options
+
+    if (sample.faces.length !== reference.faces.length) return Infinity
+
+    let score = 0
+    const displacement = keypointDisplacement(reference.keypoints, sample.keypoints, minKeypointScore)
+    score = Math.max(score, displacement / (sample.frameWidth * keypointScale))
+
+    score = Math.max(score, maxFaceDrift(reference.faces, sample.faces) / faceDriftScale)
+
+    if (sample.frameHash && reference.frameHash) {
+      score = Math.max(score, hashDistance(sample.frameHash, reference.frameHash) / hashBitsScale)
+    }
+    return score
+  }
+
+  /** Whether `sample` has a confirmed object flag the committed frame did not. */
+  hasNewObjects(sample: GateSample): boolean {
+    const previous = this.reference?.objectFlags ?? []
+    return sample.objectFlags?.some((flag) => !previous.includes(flag)) ?? false
+  }
+
+  /**
+   * Decides whether `sample` is worth a remote call. The baseline does not
+   * move until `commit`, so a skipped or failed escalation is retried.
+   */
+  evaluate(sample: GateSample, now: number = Date.now()): GateDecision {
+    this.stats.evaluated++
+    const score = this.score(sample)
+
+    let reason: GateReason = "quiet"
+    if (!this.reference) reason = "first"
+    else if (this.hasNewObjects(sample)) reason = "objects"
+    else if (score >= this.options.threshold) reason = "change"
+    else if (now - this.lastSentAt >= this.options.maxStalenessMs) reason = "stale"
+
+    const escalate = reason !== "quiet"
+    if (escalate) {
+      this.stats.escalated++
+    } else {
+      this.stats.skipped++
+    }
+    return { escalate, reason, score }
+  }
+
+  /** Makes `sample` the baseline once its frame has been sent for analysis. */
+  commit(sample: GateSample, now: number = Date.now()) {
+    this.reference = sample
+    this.lastSentAt = now
+  }
+
+  reset() {
+    this.reference = null
+    this.lastSentAt = 0
+  }
+}
@@ -0,0 +1,49 @@
+import type { FrameLayout } from "./detectionPrompt"
+import type { BatchFrame } from "./eventDetection"
+
+// Parses the multipart frame payload posted by lib/frameTransport.ts to the
+// /api/detect/stream route handler.
+
+// Upper bound on frames per batched request
+export const MAX_FRAMES = 8
+// Clients send a transcript window (lib/transcriptStore.ts); longer text is cut to its newest part
+export const MAX_TRANSCRIPT_CHARS = 2000
+
+export type FramePayload =
+  | { ok: true; frames: BatchFrame[]; transcript: string; localSignals: string; layout: FrameLayout }
+  | { ok: false; error: string; status: number }
+
+export async function parseFramePayload(request: Request): Promise<FramePayload> {
+  let files: File[]
+  let offsets: number[]
+  let transcript: string
+  let localSignals: string
+  let layout: FrameLayout
+  try {
+    const formData = await request.formData()
+    files = formData.getAll("frame") as File[]
+    offsets = formData.getAll("offsetMs").map(Number)
+    transcript = ((formData.get("transcript") as string | null) ?? "").slice(-MAX_TRANSCRIPT_CHARS)
+    localSignals = (formData.get("localSignals") as string | null) ?? ""
+    layout = formData.get("layout") === "mosaic" ? "mosaic" : "full"
+  } catch (error) {
+    return { ok: false, error: "Invalid frame payload", status: 400 }
+  }
+
+  if (files.length === 0 || files.some((file) => !file || file.size === 0)) {
+    return { ok: false, error: "No frame provided", status: 400 }
+  }
+  if (files.length > MAX_FRAMES) {
+    return { ok: false, error: `At most ${MAX_FRAMES} frames per request`, status: 413 }
+  }
+  if (files.some((file) => file.type !== "image/jpeg")) {
+    return { ok: false, error: "Frame must be image/jpeg", status: 415 }
+  }
+
+  // The only base64 step: Gemini's inlineData needs it, done once from bytes
+  const frames = await Promise.all(files.map(async (file, index) => ({
+    imageBase64: Buffer.from(await file.arrayBuffer()).toString("base64"),
+    offsetMs: Number.isFinite(offsets[index]) ? offsets[index] : 0,
+  })))
+  return { ok: true, frames, transcript, localSignals, layout }
+}
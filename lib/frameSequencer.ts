@@ -0,0 +1,153 @@
+// Orders remote analysis results by frame capture instead of arrival. Every
+// frame gets a monotonically increasing sequence number, its capture time and
+// an AbortController. Responses are released through `complete`:
+//
+// - "latest-wins": a response is applied only if it is newer than everything
+//   applied so far; older in-flight requests are aborted once a newer one lands.
+// - "reorder-window": responses are released in sequence order, waiting for a
+//   missing frame only while fewer than `window` newer frames are buffered;
+//   frames that fall out of the window are aborted and skipped.
+//
+// Streamed responses can `claim` their ticket on the first partial result
+// ("latest-wins" only) so events are applied before the request completes.
+
+export type ReorderPolicy = "latest-wins" | "reorder-window"
+
+export interface FrameTicket {
+  seq: number
+  capturedAt: number
+  signal: AbortSignal
+}
+
+export interface SequencedResult<T> {
+  ticket: FrameTicket
+  result: T
+}
+
+export interface SequencerStats {
+  issued: number
+  applied: number
+  dropped: number
+  aborted: number
+}
+
+export interface SequencerOptions {
+  policy: ReorderPolicy
+  /** Max frames buffered ahead of a missing one ("reorder-window" only) */
+  window: number
+}
+
+export class FrameSequencer<T> {
+  private options: SequencerOptions
+  private nextSeq = 0
+  private lastApplied = -1
+  private claimed = -1
+  private controllers = new Map<number, AbortController>()
+  private buffered = new Map<number, SequencedResult<T>>()
+  // Sequence numbers that finished without a result (failed/aborted)
+  private settled = new Set<number>()
+  readonly stats: SequencerStats = { issued: 0, applied: 0, dropped: 0, aborted: 0 }
+
+  constructor(options: Partial<SequencerOptions> = {}) {
+    this.options = { policy: "latest-wins", window: 2, ...options }
+  }
+
+  issue(capturedAt: number = Date.now()): FrameTicket {
+    const seq = this.nextSeq++
+    const controller = new AbortController()
+    this.controllers.set(seq, controller)
+    this.stats.issued++
+    return { seq, capturedAt, signal: controller.signal }
+  }
+
+  /**
+   * Claims a ticket for partial results before it completes. Returns false if
+   * a newer frame has already been applied (or the policy keeps strict order).
+   */
+  claim(ticket: FrameTicket): boolean {
+    if (this.options.policy !== "latest-wins" || ticket.signal.aborted) return false
+    if (ticket.seq < this.lastApplied) return false
+    if (ticket.seq > this.lastApplied) {
+      this.lastApplied = ticket.seq
+      this.claimed = ticket.seq
+      this.abortOlderThan(ticket.seq)
+    }
+    return ticket.seq === this.claimed
+  }
+
+  /** Whether `complete` would drop this ticket's result because a newer frame won. */
+  isSuperseded(ticket: FrameTicket): boolean {
+    return (
+      ticket.signal.aborted ||
+      ticket.seq < this.lastApplied ||
+      (ticket.seq === this.lastApplied && ticket.seq !== this.claimed)
+    )
+  }
+
+  /** Records a response and returns the results that should be applied now, in order. */
+  complete(ticket: FrameTicket, result: T): SequencedResult<T>[] {
+    this.controllers.delete(ticket.seq)
+    if (this.isSuperseded(ticket)) {
+      this.stats.dropped++
+      return []
+    }
+
+    if (this.options.policy === "latest-wins") {
+      this.lastApplied = ticket.seq
+      this.abortOlderThan(ticket.seq)
+      this.stats.applied++
+      return [{ ticket, result }]
+    }
+
+    this.buffered.set(ticket.seq, { ticket, result })
+    return this.release()
+  }
+
+  /** Marks a request that finished without a usable result. */
+  fail(ticket: FrameTicket): SequencedResult<T>[] {
+    this.controllers.delete(ticket.seq)
+    if (this.options.policy === "latest-wins" || ticket.seq <= this.lastApplied) return []
+    this.settled.add(ticket.seq)
+    return this.release()
+  }
+
+  abortAll() {
+    this.abortOlderThan(Infinity)
+    this.buffered.clear()
+    this.settled.clear()
+  }
+
+  private release(): SequencedResult<T>[] {
+    const released: SequencedResult<T>[] = []
+    for (;;) {
+      const next = this.lastApplied + 1
+      const ready = this.buffered.get(next)
+      if (ready) {
+        this.buffered.delete(next)
+        this.lastApplied = next
+        this.stats.applied++
+        released.push(ready)
+      } else if (this.settled.delete(next)) {
+        this.lastApplied = next
+      } else if (this.buffered.size >= this.options.window) {
+        // The missing frame is too far behind; give up on it
+        this.controllers.get(next)?.abort()
+        if (this.controllers.delete(next)) this.stats.aborted++
+        this.lastApplied = next
+      } else {
+        break
+      }
+    }
+    return released
+  }
+
+  private abortOlderThan(seq: number) {
+    this.controllers.forEach((controller, pending) => {
+      if (pending < seq) {
+        controller.abort()
+        this.controllers.delete(pending)
+        this.stats.aborted++
+      }
+    })
+  }
+}
@@ -0,0 +1,131 @@
+// Main-thread jank instrumentation. Records the interval between animation
+// frames, long tasks (>50 ms) where the browser reports them, and React
+// renders of the page. A page render is counted when a <Profiler> commit
+// follows a run of the component body, so Strict Mode's double render and
+// discarded renders are not counted; the Profiler only reports in dev and
+// profiling builds.
+// Enabled on the realtime page with `?perf=1`; combine with `?vision=main` to
+// compare inference on the main thread against the worker.
+
+export interface FrameTimeSummary {
+  frames: number
+  p50Ms: number
+  p95Ms: number
+  p99Ms: number
+  maxMs: number
+  /** Frames that took longer than two 60 Hz refreshes */
+  slowFrames: number
+  longTasks: number
+  longTaskMs: number
+  pageRenders: number
+  pageRendersPerSec: number
+  /** Time React spent rendering committed updates (Profiler actualDuration) */
+  commitMs: number
+}
+
+// While recording the page should only re-render for new events, the video
+// timeupdate (~4 Hz) and the once-a-second duration tick; detection results
+// and scheduler state go through their own subscriptions
+export const PAGE_RENDER_BUDGET_PER_SEC = 6
+
+// Two 60 Hz refreshes
+const SLOW_FRAME_MS = 1000 / 30
+
+function percentile(sorted: number[], p: number): number {
+  if (sorted.length === 0) return 0
+  return sorted[Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1)]
+}
+
+export class FrameTimeMonitor {
+  private frameTimes: number[] = []
+  private lastFrameAt: number | null = null
+  private frameHandle: number | null = null
+  private observer: PerformanceObserver | null = null
+  private longTasks = 0
+  private longTaskMs = 0
+  private pageRenders = 0
+  // The page body ran since the last commit
+  private renderPending = false
+  private commitMs = 0
+  private startedAt = 0
+  private stoppedAt: number | null = null
+
+  get running(): boolean {
+    return this.frameHandle !== null
+  }
+
+  start() {
+    this.stop()
+    this.frameTimes = []
+    this.lastFrameAt = null
+    this.longTasks = 0
+    this.longTaskMs = 0
+    this.pageRenders = 0
+    this.renderPending = false
+    this.commitMs = 0
+    this.startedAt = performance.now()
+    this.stoppedAt = null
+
+    const onFrame = (now: number) => {
+      if (this.lastFrameAt !== null) this.frameTimes.push(now - this.lastFrameAt)
+      this.lastFrameAt = now
+      this.frameHandle = requestAnimationFrame(onFrame)
+    }
+    this.frameHandle = requestAnimationFrame(onFrame)
+
+    if (typeof PerformanceObserver !== "undefined" && PerformanceObserver.supportedEntryTypes?.includes("longtask")) {
+      this.observer = new PerformanceObserver((list) => {
+        for (const entry of list.getEntries()) {
+          this.longTasks++
+          this.longTaskMs += entry.duration
+        }
+      })
+      this.observer.observe({ type: "longtask" })
+    }
+  }
+
+  /** Call from the component body; the render counts once its commit reaches `recordCommit`. */
+  recordRender() {
+    if (this.running) this.renderPending = true
+  }
+
+  /** Feed from a React <Profiler> onRender callback. */
+  recordCommit(actualDuration: number) {
+    if (!this.running) return
+    this.commitMs += actualDuration
+    if (this.renderPending) {
+      this.renderPending = false
+      this.pageRenders++
+    }
+  }
+
+  stop(): FrameTimeSummary {
+    if (this.frameHandle !== null) {
+      cancelAnimationFrame(this.frameHandle)
+      this.stoppedAt = performance.now()
+    }
+    this.frameHandle = null
+    this.observer?.disconnect()
+    this.observer = null
+    return this.summary()
+  }
+
+  summary(): FrameTimeSummary {
+    const sorted = [...this.frameTimes].sort((a, b) => a - b)
+    const round = (value: number) => Math.round(value * 10) / 10
+    const elapsedSec = Math.max(((this.stoppedAt ?? performance.now()) - this.startedAt) / 1000, 1e-3)
+    return {
+      frames: sorted.length,
+      p50Ms: round(percentile(sorted, 50)),
+      p95Ms: round(percentile(sorted, 95)),
+      p99Ms: round(percentile(sorted, 99)),
+      maxMs: round(sorted[sorted.length - 1] ?? 0),
+      slowFrames: sorted.filter((ms) => ms > SLOW_FRAME_MS).length,
+      longTasks: this.longTasks,
+      longTaskMs: Math.round(this.longTaskMs),
+      pageRenders: this.pageRenders,
+      pageRendersPerSec: round(this.pageRenders / elapsedSec),
+      commitMs: round(this.commitMs),
+    }
+  }
+}
@@ -0,0 +1,108 @@
+import type { DetectionResult, DetectionStreamMessage, VideoEvent } from "./eventDetection"
+import type { FrameLayout } from "./detectionPrompt"
+
+export const FRAME_STREAM_ENDPOINT = "/api/detect/stream"
+export const FRAME_MIME_TYPE = "image/jpeg"
+
+/**
+ * Encodes a canvas as a JPEG Blob without going through a base64 data URL.
+ * Uses `convertToBlob` for OffscreenCanvas and `toBlob` for DOM canvases.
+ */
+export function encodeCanvasJpeg(
+  canvas: HTMLCanvasElement | OffscreenCanvas,
+  quality: number = 0.8
+): Promise<Blob | null> {
+  if (typeof OffscreenCanvas !== "undefined" && canvas instanceof OffscreenCanvas) {
+    return canvas.convertToBlob({ type: FRAME_MIME_TYPE, quality })
+  }
+  return new Promise((resolve) => {
+    (canvas as HTMLCanvasElement).toBlob(resolve, FRAME_MIME_TYPE, quality)
+  })
+}
+
+export interface BatchedFrame {
+  blob: Blob
+  /** Capture time relative to the first frame of the batch */
+  offsetMs: number
+}
+
+/** Builds the multipart body understood by `parseFramePayload` (lib/framePayload.ts). */
+export function buildFrameForm(
+  frames: BatchedFrame[],
+  transcript: string,
+  localSignals: string = "",
+  layout: FrameLayout = "full"
+): FormData {
+  const body = new FormData()
+  frames.forEach((frame, index) => {
+    body.append("frame", frame.blob, `frame-${index}.jpg`)
+    body.append("offsetMs", String(Math.round(frame.offsetMs)))
+  })
+  if (transcript) {
+    body.append("transcript", transcript)
+  }
+  if (localSignals) {
+    body.append("localSignals", localSignals)
+  }
+  if (layout !== "full") {
+    body.append("layout", layout)
+  }
+  return body
+}
+
+async function postFormData(endpoint: string, body: FormData, signal?: AbortSignal): Promise<Response> {
+  const response = await fetch(endpoint, {
+    method: "POST",
+    body,
+    signal,
+  })
+  if (!response.ok) {
+    const { error } = await response.json().catch(() => ({ error: response.statusText }))
+    throw new Error(error || `Frame analysis failed (${response.status})`)
+  }
+  return response
+}
+
+/**
+ * Posts one frame, or a batch of consecutive frames, to the detection route
+ * as multipart form data; the frame bytes travel as-is. `onEvent` is called
+ * for each event as soon as its NDJSON line arrives; the promise resolves with
+ * the full result once the model has finished. Events of a batch carry the
+ * index of the frame they were observed in.
+ */
+export async function streamFrames(
+  frames: BatchedFrame[],
+  transcript: string = "",
+  init: { signal?: AbortSignal; localSignals?: string; layout?: FrameLayout; onEvent: (event: VideoEvent) => void }
+): Promise<DetectionResult> {
+  const response = await postFormData(FRAME_STREAM_ENDPOINT, buildFrameForm(frames, transcript, init.localSignals, init.layout), init.signal)
+  if (!response.body) {
+    throw new Error("Streaming not supported")
+  }
+
+  const events: VideoEvent[] = []
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+  let pending = ""
+  for (;;) {
+    const { value, done } = await reader.read()
+    if (done) break
+    pending += value
+    let newline: number
+    while ((newline = pending.indexOf("\n")) >= 0) {
+      const line = pending.slice(0, newline)
+      pending = pending.slice(newline + 1)
+      if (!line) continue
+
+      const message = JSON.parse(line) as DetectionStreamMessage | { type: "error"; error: string }
+      if (message.type === "event") {
+        events.push(message.event)
+        init.onEvent(message.event)
+      } else if (message.type === "done") {
+        return { events, rawResponse: message.rawResponse, tokens: message.tokens }
+      } else {
+        throw new Error(message.error)
+      }
+    }
+  }
+  throw new Error("Frame analysis stream ended early")
+}
@@ -0,0 +1,216 @@
+import type { StrikeEvent } from "./strikeTracker"
+import { HISTORY_FACE_OFFSET, type PoseHistory } from "./poseHistory"
+
+// On-device head pose and coarse gaze from the six BlazeFace landmarks, plus
+// temporal features over the pose history. BlazeFace has no iris landmarks,
+// so "gaze" here is where the head points: good enough for looking away from
+// the screen or sweeping side to side while reading, not for eye-only glances
+// (those are still left to the remote model).
+//
+// Conventions: yaw > 0 when the nose turns towards the image's right edge,
+// pitch > 0 when the head tilts up. Both are rough degrees from landmark
+// ratios, not a fitted 3D model.
+
+// Landmark order within a packed face (after x1, y1, x2, y2, probability)
+const RIGHT_EYE = 0
+const LEFT_EYE = 1
+const NOSE = 2
+const MOUTH = 3
+const RIGHT_EAR = 4
+const LEFT_EAR = 5
+const LANDMARKS_OFFSET = 5
+
+// Nose position between the eye line and the mouth when facing the camera
+const NEUTRAL_PITCH_RATIO = 0.5
+// Degrees per unit change of that ratio
+const PITCH_GAIN = 120
+
+export interface HeadPose {
+  yaw: number
+  pitch: number
+}
+
+export type GazeDirection = "center" | "left" | "right" | "up" | "down" | "none"
+
+export interface GazeOptions {
+  /** |yaw| beyond this counts as looking left/right of the screen */
+  yawThresholdDeg: number
+  /** |pitch| beyond this counts as looking up/down */
+  pitchThresholdDeg: number
+  /** Window the temporal features are computed over */
+  windowMs: number
+  /** Yaw swing (degrees) from the last extreme that counts as a reversal */
+  scanAmplitudeDeg: number
+  /** Reversals per second over the window that look like reading */
+  scanFrequencyHz: number
+  /** Continuous time off screen before it is reported */
+  offScreenDwellMs: number
+  /** Minimum gap between two reports of the same kind */
+  cooldownMs: number
+}
+
+export const DEFAULT_GAZE_OPTIONS: GazeOptions = {
+  yawThresholdDeg: 25,
+  pitchThresholdDeg: 20,
+  windowMs: 5000,
+  scanAmplitudeDeg: 8,
+  scanFrequencyHz: 0.8,
+  offScreenDwellMs: 3000,
+  cooldownMs: 15000,
+}
+
+export interface GazeFeatures {
+  /** Records in the window */
+  samples: number
+  /** Head pose of the newest record, null when it has no face */
+  pose: HeadPose | null
+  direction: GazeDirection
+  /** Time between the oldest and newest record in the window */
+  spanMs: number
+  /** Horizontal yaw reversals per second over the window */
+  scanFrequency: number
+  /** Time in the window spent off screen (or with no face) */
+  offScreenMs: number
+  /** Current continuous off-screen streak, 0 when looking at the screen */
+  offScreenStreakMs: number
+}
+
+/** Head pose of the packed face starting at `offset` in `faces`. */
+export function estimateHeadPose(faces: Float32Array, offset: number = 0, out: HeadPose = { yaw: 0, pitch: 0 }): HeadPose {
+  const landmark = offset + LANDMARKS_OFFSET
+  const x = (index: number) => faces[landmark + index * 2]
+  const y = (index: number) => faces[landmark + index * 2 + 1]
+
+  // Yaw: the nose sits closer to the ear the head is turning towards
+  const toRightEar = Math.abs(x(NOSE) - x(RIGHT_EAR))
+  const toLeftEar = Math.abs(x(NOSE) - x(LEFT_EAR))
+  const earRatio = (toRightEar - toLeftEar) / Math.max(toRightEar + toLeftEar, 1e-6)
+  out.yaw = (Math.asin(Math.max(-1, Math.min(1, earRatio))) * 180) / Math.PI
+
+  // Pitch: where the nose falls between the eye line and the mouth
+  const eyeY = (y(RIGHT_EYE) + y(LEFT_EYE)) / 2
+  const pitchRatio = (y(NOSE) - eyeY) / Math.max(y(MOUTH) - eyeY, 1e-6)
+  out.pitch = (NEUTRAL_PITCH_RATIO - pitchRatio) * PITCH_GAIN
+  return out
+}
+
+export function classifyGaze(pose: HeadPose | null, options: GazeOptions = DEFAULT_GAZE_OPTIONS): GazeDirection {
+  if (!pose) return "none"
+  if (pose.yaw > options.yawThresholdDeg) return "right"
+  if (pose.yaw < -options.yawThresholdDeg) return "left"
+  if (pose.pitch > options.pitchThresholdDeg) return "up"
+  if (pose.pitch < -options.pitchThresholdDeg) return "down"
+  return "center"
+}
+
+/** Gaze features over the last `options.windowMs` of `history`, read in place. */
+export function computeGazeFeatures(
+  history: PoseHistory,
+  now: number,
+  options: GazeOptions = DEFAULT_GAZE_OPTIONS
+): GazeFeatures {
+  const start = history.indexSince(now - options.windowMs)
+  const end = history.length
+  const scratch: HeadPose = { yaw: 0, pitch: 0 }
+
+  let reversals = 0
+  let extreme = NaN
+  let trend = 0
+  let offScreenMs = 0
+  let streakStart = NaN
+  let pose: HeadPose | null = null
+  let direction: GazeDirection = "none"
+
+  for (let index = start; index < end; index++) {
+    const at = history.time(index)
+    let current: HeadPose | null = null
+    if (history.faceCount(index) > 0) {
+      current = estimateHeadPose(history.data, history.offset(index) + HISTORY_FACE_OFFSET, scratch)
+      // Reversal counting with hysteresis: follow the extreme in the current
+      // direction; a swing of scanAmplitudeDeg back from it is a reversal
+      if (Number.isNaN(extreme)) {
+        extreme = current.yaw
+      } else if (trend === 0) {
+        if (Math.abs(current.yaw - extreme) >= options.scanAmplitudeDeg) {
+          trend = current.yaw > extreme ? 1 : -1
+          extreme = current.yaw
+        }
+      } else if ((trend > 0 && current.yaw > extreme) || (trend < 0 && current.yaw < extreme)) {
+        extreme = current.yaw
+      } else if (Math.abs(current.yaw - extreme) >= options.scanAmplitudeDeg) {
+        reversals++
+        trend = -trend
+        extreme = current.yaw
+      }
+    }
+    direction = classifyGaze(current, options)
+
+    const offScreen = direction !== "center"
+    if (index + 1 < end && offScreen) offScreenMs += history.time(index + 1) - at
+    if (offScreen) {
+      if (Number.isNaN(streakStart)) streakStart = at
+    } else {
+      streakStart = NaN
+    }
+    if (index === end - 1 && current) pose = { yaw: current.yaw, pitch: current.pitch }
+  }
+
+  const samples = end - start
+  const spanMs = samples > 1 ? history.time(end - 1) - history.time(start) : 0
+  return {
+    samples,
+    pose,
+    direction,
+    spanMs,
+    scanFrequency: spanMs > 0 ? (reversals * 1000) / spanMs : 0,
+    offScreenMs,
+    offScreenStreakMs: Number.isNaN(streakStart) ? 0 : now - streakStart,
+  }
+}
+
+/**
+ * Turns gaze features into strike events at the detection rate. Each kind of
+ * report has its own cooldown so one long look away is reported once.
+ */
+export class GazeMonitor {
+  private options: GazeOptions
+  private lastReported = { offScreen: -Infinity, scanning: -Infinity }
+  features: GazeFeatures | null = null
+
+  constructor(options: Partial<GazeOptions> = {}) {
+    this.options = { ...DEFAULT_GAZE_OPTIONS, ...options }
+  }
+
+  update(history: PoseHistory, now: number): StrikeEvent | null {
+    const features = computeGazeFeatures(history, now, this.options)
+    this.features = features
+    const { cooldownMs, offScreenDwellMs, scanFrequencyHz, windowMs } = this.options
+
+    if (features.offScreenStreakMs >= offScreenDwellMs && now - this.lastReported.offScreen >= cooldownMs) {
+      this.lastReported.offScreen = now
+      const seconds = Math.round(features.offScreenStreakMs / 1000)
+      return {
+        description: features.direction === "none"
+          ? `Face not visible to the camera for ${seconds}s`
+          : `Looking away from the screen (${features.direction}) for ${seconds}s`,
+        isDangerous: true,
+      }
+    }
+
+    // Need most of a window before judging frequency
+    const covered = features.spanMs >= windowMs * 0.8
+    if (covered && features.scanFrequency >= scanFrequencyHz && now - this.lastReported.scanning >= cooldownMs) {
+      this.lastReported.scanning = now
+      return {
+        description: `Repeated side-to-side head movement, possibly reading (${features.scanFrequency.toFixed(1)}/s over ${windowMs / 1000}s)`,
+        isDangerous: true,
+      }
+    }
+    return null
+  }
+
+  reset() {
+    this.lastReported = { offScreen: -Infinity, scanning: -Infinity }
+    this.features = null
+  }
+}
@@ -0,0 +1,191 @@
+import type { ModelParams, Part, UsageMetadata } from "@google/generative-ai";
+import { DETECTION_GENERATION_CONFIG, DETECTION_SYSTEM_INSTRUCTION, MOSAIC_INSTRUCTIONS, localSignalsSection, transcriptSection } from "./detectionPrompt";
+import type { FrameLayout } from "./detectionPrompt";
+import { createGoogleBackend, type DetectionModel, type ModelBackend } from "./modelBackend";
+import { createStubBackend } from "./geminiStub";
+
+// Process-wide registry for Gemini model handles and the detection prompt.
+// Model instances are reused per model name/config. The fixed instructions
+// live in a context cache created once per process (refreshed before its TTL
+// runs out) and are referenced by cache name; frames only carry the
+// transcript section and the image. Responses are requested as JSON matching
+// DETECTION_RESPONSE_SCHEMA.
+
+export const DETECTION_MODEL = "gemini-2.5-flash";
+const PROMPT_CACHE_TTL_SECONDS = 60 * 60;
+// Recreate the cache this long before it expires so in-flight frames never
+// reference a cache the API has already dropped
+const PROMPT_CACHE_REFRESH_MARGIN_MS = 60 * 1000;
+
+export interface RegistryStats {
+    backend: string | null;
+    modelsCreated: number;
+    modelCacheHits: number;
+    transcriptSectionsBuilt: number;
+    promptRequests: number;
+    promptCachesCreated: number;
+    promptCacheHits: number;
+    promptCacheFailures: number;
+    promptTokens: number;
+    cachedPromptTokens: number;
+    candidatesTokens: number;
+    /** Responses that were not plain JSON and needed the tolerant parser */
+    parseFallbacks: number;
+    /** Event elements (or whole responses) that could not be parsed */
+    parseFailures: number;
+}
+
+const stats: RegistryStats = {
+    backend: null,
+    modelsCreated: 0,
+    modelCacheHits: 0,
+    transcriptSectionsBuilt: 0,
+    promptRequests: 0,
+    promptCachesCreated: 0,
+    promptCacheHits: 0,
+    promptCacheFailures: 0,
+    promptTokens: 0,
+    cachedPromptTokens: 0,
+    candidatesTokens: 0,
+    parseFallbacks: 0,
+    parseFailures: 0,
+};
+
+let backendPromise: Promise<ModelBackend> | null = null;
+const models = new Map<string, DetectionModel>();
+
+interface PromptCacheEntry {
+    model: DetectionModel;
+    refreshAt: number;
+}
+let promptCache: Promise<PromptCacheEntry> | null = null;
+let promptCacheRefreshAt = 0;
+
+function getBackend(): Promise<ModelBackend> {
+    if (!backendPromise) {
+        backendPromise = process.env.DETECTION_BACKEND === 'stub'
+            ? Promise.resolve(createStubBackend())
+            : createGoogleBackend();
+        backendPromise.then(backend => { stats.backend = backend.name; }, () => { backendPromise = null; });
+    }
+    return backendPromise;
+}
+
+/**
+ * Swaps the model backend (e.g. for the offline stub) and drops every cached
+ * model handle and prompt cache created against the previous one.
+ */
+export function setModelBackend(backend: ModelBackend) {
+    backendPromise = Promise.resolve(backend);
+    stats.backend = backend.name;
+    models.clear();
+    promptCache = null;
+    promptCacheRefreshAt = 0;
+}
+
+export async function getModel(params: ModelParams = { model: DETECTION_MODEL }): Promise<DetectionModel> {
+    const key = JSON.stringify(params);
+    const cached = models.get(key);
+    if (cached) {
+        stats.modelCacheHits++;
+        return cached;
+    }
+    const backend = await getBackend();
+    const model = backend.getModel(params);
+    models.set(key, model);
+    stats.modelsCreated++;
+    return model;
+}
+
+async function createPromptCache(): Promise<PromptCacheEntry> {
+    const backend = await getBackend();
+    try {
+        const cache = await backend.createCache({
+            model: `models/${DETECTION_MODEL}`,
+            displayName: 'phenomitor-detection-prompt',
+            systemInstruction: DETECTION_SYSTEM_INSTRUCTION,
+            contents: [],
+            ttlSeconds: PROMPT_CACHE_TTL_SECONDS,
+        });
+        stats.promptCachesCreated++;
+        const expiresAt = cache.expireTime
+            ? new Date(cache.expireTime).getTime()
+            : Date.now() + PROMPT_CACHE_TTL_SECONDS * 1000;
+        return {
+            model: backend.getModelFromCache(cache, { generationConfig: DETECTION_GENERATION_CONFIG }),
+            refreshAt: expiresAt - PROMPT_CACHE_REFRESH_MARGIN_MS,
+        };
+    } catch (error) {
+        // Caching can be unavailable (quota, prompt below the minimum cacheable
+        // size); the plain system instruction still keeps frames small.
+        console.error('Error creating prompt cache, using system instruction:', error);
+        stats.promptCacheFailures++;
+        return {
+            model: await getModel({
+                model: DETECTION_MODEL,
+                systemInstruction: DETECTION_SYSTEM_INSTRUCTION,
+                generationConfig: DETECTION_GENERATION_CONFIG,
+            }),
+            refreshAt: Date.now() + PROMPT_CACHE_TTL_SECONDS * 1000,
+        };
+    }
+}
+
+/**
+ * Returns the detection model bound to the cached system instruction. The
+ * cache is created on first use; concurrent callers share the same creation.
+ */
+export async function getDetectionModel(): Promise<DetectionModel> {
+    if (promptCache && Date.now() < promptCacheRefreshAt) {
+        stats.promptCacheHits++;
+        return (await promptCache).model;
+    }
+    promptCache = createPromptCache();
+    promptCacheRefreshAt = Infinity;
+    try {
+        const entry = await promptCache;
+        promptCacheRefreshAt = entry.refreshAt;
+        return entry.model;
+    } catch (error) {
+        promptCache = null;
+        promptCacheRefreshAt = 0;
+        throw error;
+    }
+}
+
+/**
+ * Returns the per-frame prompt parts. The fixed instructions are already in
+ * the cached system instruction, so only the transcript section, any
+ * on-device detector flags and, for face-crop mosaics, the layout key are sent.
+ */
+export function getPromptParts(transcript: string = '', localSignals: string = '', layout: FrameLayout = 'full'): Part[] {
+    stats.promptRequests++;
+    const parts: Part[] = [];
+    if (transcript) {
+        stats.transcriptSectionsBuilt++;
+        parts.push({ text: transcriptSection(transcript) });
+    }
+    if (localSignals) {
+        parts.push({ text: localSignalsSection(localSignals) });
+    }
+    if (layout === 'mosaic') {
+        parts.push({ text: MOSAIC_INSTRUCTIONS });
+    }
+    return parts;
+}
+
+export function recordUsage(usage: UsageMetadata | undefined) {
+    if (!usage) return;
+    stats.promptTokens += usage.promptTokenCount;
+    stats.cachedPromptTokens += usage.cachedContentTokenCount ?? 0;
+    stats.candidatesTokens += usage.candidatesTokenCount;
+}
+
+export function recordParse(failures: number, recovered: boolean) {
+    if (recovered) stats.parseFallbacks++;
+    stats.parseFailures += failures;
+}
+
+export function getRegistryStats(): RegistryStats {
+    return { ...stats };
+}
@@ -0,0 +1,192 @@
+import type {
+    CachedContent,
+    Content,
+    GenerateContentRequest,
+    EnhancedGenerateContentResponse,
+    GenerateContentResult,
+    GenerateContentStreamResult,
+    ModelParams,
+    Part,
+} from "@google/generative-ai";
+import type { CachedContentCreateParams } from "@google/generative-ai/server";
+import type { DetectionModel, ModelBackend } from "./modelBackend";
+
+// Deterministic, offline stand-in for the Gemini API. It mimics the response
+// and usage metadata shapes (including cachedContentTokenCount) closely enough
+// to exercise prompt caching, parsing and the replay tooling without a key.
+
+// Gemini bills a small image as a flat 258 tokens; text is roughly 4 chars/token.
+const IMAGE_TOKENS = 258;
+const CHARS_PER_TOKEN = 4;
+// Characters per streamed chunk
+const STREAM_CHUNK_SIZE = 48;
+
+export interface StubBackendOptions {
+    /** Simulated round-trip latency per request, in milliseconds. */
+    latencyMs?: number;
+    /** Flag roughly one in `dangerousEvery` distinct frames as dangerous. */
+    dangerousEvery?: number;
+    /**
+     * Wrap responses in a ```json fence like the real model often does
+     * without structured output (ignored when JSON output is requested).
+     */
+    codeFence?: boolean;
+    /**
+     * Waits out simulated latency. Defaults to real timers; replay tooling
+     * passes a virtual clock here.
+     */
+    delay?: (ms: number, signal?: AbortSignal) => Promise<void>;
+}
+
+type PromptInput = GenerateContentRequest | string | Array<string | Part>;
+
+function toParts(input: string | Part | Content | Array<string | Part> | undefined): Part[] {
+    if (!input) return [];
+    if (typeof input === 'string') return [{ text: input }];
+    if (Array.isArray(input)) return input.map(part => typeof part === 'string' ? { text: part } : part);
+    if ('parts' in input) return input.parts;
+    return [input];
+}
+
+function requestParts(request: PromptInput): Part[] {
+    if (typeof request === 'string' || Array.isArray(request)) {
+        return toParts(request);
+    }
+    return [
+        ...toParts(request.systemInstruction),
+        ...request.contents.flatMap(content => content.parts),
+    ];
+}
+
+export function estimateTokens(parts: Part[]): number {
+    let tokens = 0;
+    for (const part of parts) {
+        if (part.text) tokens += Math.ceil(part.text.length / CHARS_PER_TOKEN);
+        if (part.inlineData) tokens += IMAGE_TOKENS;
+    }
+    return tokens;
+}
+
+// FNV-1a over a strided sample of the payload: cheap and stable per frame
+function hashPayload(data: string): number {
+    let hash = 0x811c9dc5;
+    const step = Math.max(1, Math.floor(data.length / 256));
+    for (let i = 0; i < data.length; i += step) {
+        hash ^= data.charCodeAt(i);
+        hash = Math.imul(hash, 0x01000193);
+    }
+    return hash >>> 0;
+}
+
+function respond(parts: Part[], options: StubBackendOptions, jsonMode: boolean): string {
+    const dangerousEvery = options.dangerousEvery ?? 5;
+    const images = parts.filter(part => part.inlineData);
+    // Batched requests get one event per frame, tagged with its index
+    const events = images.map((part, index) => {
+        const isDangerous = hashPayload(part.inlineData!.data) % dangerousEvery === 0;
+        return {
+            timestamp: '00:00',
+            ...(images.length > 1 ? { frame: index } : {}),
+            description: isDangerous
+                ? 'Eyes repeatedly scanning left to right below the camera'
+                : 'Candidate looking at camera and speaking naturally',
+            isDangerous,
+        };
+    });
+    const json = JSON.stringify({ events }, null, 2);
+    return options.codeFence && !jsonMode ? '```json\n' + json + '\n```' : json;
+}
+
+function delay(ms: number, signal?: AbortSignal): Promise<void> {
+    return new Promise((resolve, reject) => {
+        if (signal?.aborted) return reject(new Error('Request aborted'));
+        const timer = setTimeout(resolve, ms);
+        signal?.addEventListener('abort', () => {
+            clearTimeout(timer);
+            reject(new Error('Request aborted'));
+        }, { once: true });
+    });
+}
+
+export interface StubStats {
+    requests: number;
+    cachesCreated: number;
+}
+
+export function createStubBackend(options: StubBackendOptions = {}): ModelBackend & { stats: StubStats } {
+    const stats: StubStats = { requests: 0, cachesCreated: 0 };
+    const wait = options.delay ?? delay;
+
+    const createModel = (params: Partial<ModelParams>, cache?: CachedContent): DetectionModel => {
+        const systemParts = toParts(cache?.systemInstruction ?? params.systemInstruction);
+        const cachedTokens = cache ? estimateTokens(systemParts) : 0;
+        const jsonMode = params.generationConfig?.responseMimeType === 'application/json';
+
+        const buildResponse = (text: string, parts: Part[]): EnhancedGenerateContentResponse => {
+            const promptTokenCount = estimateTokens(systemParts) + estimateTokens(parts);
+            const candidatesTokenCount = Math.ceil(text.length / CHARS_PER_TOKEN);
+            return {
+                text: () => text,
+                functionCall: () => undefined,
+                functionCalls: () => undefined,
+                usageMetadata: {
+                    promptTokenCount,
+                    cachedContentTokenCount: cachedTokens,
+                    candidatesTokenCount,
+                    totalTokenCount: promptTokenCount + candidatesTokenCount,
+                },
+            } as EnhancedGenerateContentResponse;
+        };
+
+        return {
+            async generateContent(request, requestOptions): Promise<GenerateContentResult> {
+                stats.requests++;
+                await wait(options.latencyMs ?? 0, requestOptions?.signal);
+
+                const parts = requestParts(request);
+                return { response: buildResponse(respond(parts, options, jsonMode), parts) };
+            },
+
+            async generateContentStream(request, requestOptions): Promise<GenerateContentStreamResult> {
+                stats.requests++;
+                const parts = requestParts(request);
+                const text = respond(parts, options, jsonMode);
+                const chunks: string[] = [];
+                for (let i = 0; i < text.length; i += STREAM_CHUNK_SIZE) {
+                    chunks.push(text.slice(i, i + STREAM_CHUNK_SIZE));
+                }
+                // Spread the simulated latency over the chunks
+                const chunkDelay = (options.latencyMs ?? 0) / Math.max(chunks.length, 1);
+
+                async function* stream() {
+                    for (const chunk of chunks) {
+                        await wait(chunkDelay, requestOptions?.signal);
+                        yield buildResponse(chunk, []);
+                    }
+                }
+                const response = (async () => {
+                    await wait(options.latencyMs ?? 0, requestOptions?.signal);
+                    return buildResponse(text, parts);
+                })();
+                response.catch(() => {});
+                return { stream: stream(), response };
+            },
+        };
+    };
+
+    return {
+        name: 'stub',
+        stats,
+        getModel: (params) => createModel(params),
+        getModelFromCache: (cache, params = {}) => createModel(params, cache),
+        async createCache(params: CachedContentCreateParams): Promise<CachedContent> {
+            stats.cachesCreated++;
+            const ttlSeconds = params.ttlSeconds ?? 3600;
+            return {
+                ...params,
+                name: `cachedContents/stub-${stats.cachesCreated}`,
+                expireTime: new Date(Date.now() + ttlSeconds * 1000).toISOString(),
+            } as CachedContent;
+        },
+    };
+}
@@ -0,0 +1,123 @@
+// Incremental extractor for the elements of a top-level `"events": [...]`
+// array in streamed model output. Text is pushed in arbitrary chunks and each
+// element is returned as soon as its closing brace arrives, so callers can act
+// on the first event before the model has finished the response. Each
+// character is scanned once; consumed text is dropped from the buffer.
+
+const EVENTS_KEY = /"events"\s*:\s*\[/
+
+type Phase = "seek" | "array" | "done"
+
+export class EventArrayParser<T = unknown> {
+  private buffer = ""
+  private phase: Phase = "seek"
+  // Scan position within `buffer` and the start of the element in progress
+  private index = 0
+  private elementStart = -1
+  private depth = 0
+  private inString = false
+  private escaped = false
+  private failures = 0
+
+  /** Elements that could not be parsed as JSON (skipped). */
+  get parseFailures(): number {
+    return this.failures
+  }
+
+  /** Whether the `"events"` array has been located. */
+  get found(): boolean {
+    return this.phase !== "seek"
+  }
+
+  get done(): boolean {
+    return this.phase === "done"
+  }
+
+  push(chunk: string): T[] {
+    if (this.phase === "done") return []
+    this.buffer += chunk
+
+    if (this.phase === "seek") {
+      const match = EVENTS_KEY.exec(this.buffer)
+      if (!match) {
+        // Keep only a tail long enough to hold a split `"events": [`
+        if (this.buffer.length > 64) this.buffer = this.buffer.slice(-64)
+        return []
+      }
+      this.buffer = this.buffer.slice(match.index + match[0].length)
+      this.phase = "array"
+      this.index = 0
+    }
+
+    const elements: T[] = []
+    const buffer = this.buffer
+    for (; this.index < buffer.length; this.index++) {
+      const char = buffer[this.index]
+
+      if (this.inString) {
+        if (this.escaped) this.escaped = false
+        else if (char === "\\") this.escaped = true
+        else if (char === '"') this.inString = false
+        continue
+      }
+
+      if (char === '"') {
+        this.inString = true
+      } else if (char === "{" || char === "[") {
+        if (this.depth === 0) this.elementStart = this.index
+        this.depth++
+      } else if (char === "}" || char === "]") {
+        if (this.depth === 0) {
+          // Closing bracket of the events array itself
+          this.phase = "done"
+          break
+        }
+        this.depth--
+        if (this.depth === 0) {
+          try {
+            elements.push(JSON.parse(buffer.slice(this.elementStart, this.index + 1)))
+          } catch (error) {
+            this.failures++
+          }
+          this.elementStart = -1
+        }
+      }
+    }
+
+    // Drop everything before the element in progress
+    const keepFrom = this.elementStart >= 0 ? this.elementStart : this.index
+    this.buffer = buffer.slice(keepFrom)
+    this.index -= keepFrom
+    if (this.elementStart >= 0) this.elementStart = 0
+    return elements
+  }
+}
+
+export interface ParsedEvents<T> {
+  events: T[]
+  /** The response was not plain JSON and had to be scanned */
+  recovered: boolean
+  /** Elements that could not be parsed, or 1 if no events array was found */
+  failures: number
+}
+
+/**
+ * Tolerant parser for a complete model response. Well-formed JSON (the
+ * structured-output case) is parsed directly; anything else (code fences,
+ * surrounding prose, a truncated tail) is scanned once with
+ * `EventArrayParser`, keeping every element that parses.
+ */
+export function parseEventsResponse<T = unknown>(text: string): ParsedEvents<T> {
+  try {
+    const parsed = JSON.parse(text)
+    if (parsed && Array.isArray(parsed.events)) {
+      return { events: parsed.events, recovered: false, failures: 0 }
+    }
+  } catch (error) {
+    // Fall through to the scanning parser
+  }
+
+  const parser = new EventArrayParser<T>()
+  const events = parser.push(text)
+  return { events, recovered: true, failures: parser.found ? parser.parseFailures : 1 }
+}
@@ -0,0 +1,55 @@
+import type {
+    CachedContent,
+    GenerateContentRequest,
+    GenerateContentResult,
+    GenerateContentStreamResult,
+    ModelParams,
+    Part,
+    SingleRequestOptions,
+} from "@google/generative-ai";
+import type { CachedContentCreateParams } from "@google/generative-ai/server";
+
+// The slice of the Gemini SDK the detection pipeline relies on. Both the real
+// Google backend and the offline stub (lib/geminiStub.ts) implement it, so the
+// registry, route handlers and replay tooling never depend on which is active.
+
+export interface DetectionModel {
+    generateContent(
+        request: GenerateContentRequest | string | Array<string | Part>,
+        requestOptions?: SingleRequestOptions
+    ): Promise<GenerateContentResult>;
+    generateContentStream(
+        request: GenerateContentRequest | string | Array<string | Part>,
+        requestOptions?: SingleRequestOptions
+    ): Promise<GenerateContentStreamResult>;
+}
+
+export interface ModelBackend {
+    name: string;
+    getModel(params: ModelParams): DetectionModel;
+    getModelFromCache(cache: CachedContent, params?: Partial<ModelParams>): DetectionModel;
+    createCache(params: CachedContentCreateParams): Promise<CachedContent>;
+}
+
+/**
+ * Creates the production backend. The SDK is imported lazily so offline
+ * tooling running against the stub backend does not need it installed.
+ */
+export async function createGoogleBackend(apiKey: string | undefined = process.env.GOOGLE_API_KEY): Promise<ModelBackend> {
+    if (!apiKey) {
+        throw new Error('Missed GOOGLE_API_KEY environment');
+    }
+    const [{ GoogleGenerativeAI }, { GoogleAICacheManager }] = await Promise.all([
+        import("@google/generative-ai"),
+        import("@google/generative-ai/server"),
+    ]);
+    const genAI = new GoogleGenerativeAI(apiKey);
+    const cacheManager = new GoogleAICacheManager(apiKey);
+
+    return {
+        name: 'google',
+        getModel: (params) => genAI.getGenerativeModel(params),
+        getModelFromCache: (cache, params) => genAI.getGenerativeModelFromCachedContent(cache, params),
+        createCache: (params) => cacheManager.create(params),
+    };
+}
@@ -0,0 +1,97 @@
+import type * as tfjs from "@tensorflow/tfjs"
+
+// Persistent weight cache for the TF.js models. The first load fetches the
+// graph from its CDN and saves it to IndexedDB under a versioned
+// `indexeddb://` key; later page loads hand that key to the model package as
+// its `modelUrl`, skipping the download. Bumping a model's `version` makes
+// the next load fetch it again and removes the stale copy. Works in the
+// vision worker too (TF.js treats workers as a browser environment).
+
+export interface CachedModelSpec {
+  name: string
+  /** Bump when `url` changes so stale weights are replaced */
+  version: string
+  /** The package's default weights, fetched once to fill the cache */
+  url: string
+  fromTFHub: boolean
+}
+
+export const FACE_MODEL: CachedModelSpec = {
+  name: "blazeface",
+  version: "1",
+  url: "https://tfhub.dev/tensorflow/tfjs-model/blazeface/1/default/1",
+  fromTFHub: true,
+}
+
+export const POSE_MODEL: CachedModelSpec = {
+  name: "movenet-lightning",
+  version: "4",
+  url: "https://tfhub.dev/google/tfjs-model/movenet/singlepose/lightning/4",
+  fromTFHub: true,
+}
+
+export const OBJECT_MODEL: CachedModelSpec = {
+  name: "coco-ssd-lite",
+  version: "1",
+  url: "https://storage.googleapis.com/tfjs-models/savedmodel/ssdlite_mobilenet_v2/model.json",
+  fromTFHub: false,
+}
+
+const CACHE_PREFIX = "indexeddb://phenomitor-"
+
+export function modelCacheKey(spec: CachedModelSpec): string {
+  return `${CACHE_PREFIX}${spec.name}@${spec.version}`
+}
+
+export interface ModelSource {
+  url: string
+  /** Whether the weights were already in IndexedDB */
+  cached: boolean
+}
+
+/**
+ * Returns the IndexedDB key for `spec`, downloading and storing the weights
+ * first if needed. Null when IndexedDB is unavailable (private browsing,
+ * quota); the caller then lets the package load its default URL.
+ */
+export async function resolveModelSource(tf: typeof tfjs, spec: CachedModelSpec): Promise<ModelSource | null> {
+  const key = modelCacheKey(spec)
+  try {
+    const stored = await tf.io.listModels()
+    const stale = Object.keys(stored).filter((url) => url.startsWith(`${CACHE_PREFIX}${spec.name}@`) && url !== key)
+    await Promise.all(stale.map((url) => tf.io.removeModel(url)))
+    if (stored[key]) return { url: key, cached: true }
+
+    const graph = await tf.loadGraphModel(spec.url, { fromTFHub: spec.fromTFHub })
+    try {
+      await graph.save(key)
+    } finally {
+      graph.dispose()
+    }
+    return { url: key, cached: false }
+  } catch (err) {
+    console.warn(`Model cache unavailable for ${spec.name}, loading from the network:`, err)
+    return null
+  }
+}
+
+/**
+ * Loads a model through the cache. `load` receives the `indexeddb://` key, or
+ * undefined to use the package default. If the cached copy fails to load
+ * (e.g. a write was interrupted) it is removed and the default is used.
+ */
+export async function loadCachedModel<T>(
+  tf: typeof tfjs,
+  spec: CachedModelSpec,
+  load: (modelUrl: string | undefined) => Promise<T>
+): Promise<{ model: T; cached: boolean }> {
+  const source = await resolveModelSource(tf, spec)
+  if (!source) return { model: await load(undefined), cached: false }
+  try {
+    return { model: await load(source.url), cached: source.cached }
+  } catch (err) {
+    console.warn(`Cached ${spec.name} weights failed to load, refetching:`, err)
+    await tf.io.removeModel(source.url).catch(() => {})
+    return { model: await load(undefined), cached: false }
+  }
+}
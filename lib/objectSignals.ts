@@ -0,0 +1,137 @@
+import type { StrikeEvent } from "./strikeTracker"
+
+// Local signals from the optional COCO-SSD object detector (see
+// VisionPipelineOptions.objectDetection). The pipeline packs per-class counts
+// into a Float32Array in OBJECT_CLASSES order; `ObjectSignalMonitor` turns
+// them into strikes once a flag has been seen on consecutive samples, and
+// summarises recent flags for the remote prompt so the model neither has to
+// look for nor re-report the obvious ones. `gateFlags` feeds the confirmed
+// set to the frame gate (lib/frameGate.ts), where a new flag escalates a
+// remote call at once.
+
+// COCO class names, in packed order
+export const OBJECT_CLASSES = ["cell phone", "person", "book", "laptop", "tv"] as const
+
+export type ObjectClass = (typeof OBJECT_CLASSES)[number]
+
+export interface ObjectDetection {
+  class: string
+  score: number
+}
+
+export type ObjectFlag = "phone" | "extra-person" | "book" | "laptop" | "screen"
+
+const FLAG_DESCRIPTIONS: Record<ObjectFlag, string> = {
+  phone: "Phone visible in frame",
+  "extra-person": "More than one person in frame",
+  book: "Book or notes visible in frame",
+  laptop: "Additional laptop visible in frame",
+  screen: "Additional monitor or TV visible in frame",
+}
+
+export interface ObjectSignalOptions {
+  /** Consecutive samples a flag must appear in before it counts */
+  confirmSamples: number
+  /** Flags seen within this window are included in the prompt summary */
+  summaryWindowMs: number
+  /** Minimum gap between two strikes for the same flag */
+  cooldownMs: number
+}
+
+export const DEFAULT_OBJECT_SIGNAL_OPTIONS: ObjectSignalOptions = {
+  confirmSamples: 2,
+  summaryWindowMs: 10000,
+  cooldownMs: 20000,
+}
+
+/** Packs detections into per-class counts, in OBJECT_CLASSES order (into `counts` when given). */
+export function countObjects(
+  detections: ObjectDetection[],
+  minScore: number,
+  counts: Float32Array = new Float32Array(OBJECT_CLASSES.length)
+): Float32Array {
+  counts.fill(0)
+  for (const detection of detections) {
+    if (detection.score < minScore) continue
+    const index = OBJECT_CLASSES.indexOf(detection.class as ObjectClass)
+    if (index >= 0) counts[index]++
+  }
+  return counts
+}
+
+export function objectFlags(counts: Float32Array): ObjectFlag[] {
+  const flags: ObjectFlag[] = []
+  const count = (name: ObjectClass) => counts[OBJECT_CLASSES.indexOf(name)] ?? 0
+  if (count("cell phone") > 0) flags.push("phone")
+  if (count("person") > 1) flags.push("extra-person")
+  if (count("book") > 0) flags.push("book")
+  if (count("laptop") > 0) flags.push("laptop")
+  if (count("tv") > 0) flags.push("screen")
+  return flags
+}
+
+export class ObjectSignalMonitor {
+  private options: ObjectSignalOptions
+  private streaks = new Map<ObjectFlag, number>()
+  private lastSeen = new Map<ObjectFlag, number>()
+  private lastReported = new Map<ObjectFlag, number>()
+  private lastSampleAt = -Infinity
+
+  constructor(options: Partial<ObjectSignalOptions> = {}) {
+    this.options = { ...DEFAULT_OBJECT_SIGNAL_OPTIONS, ...options }
+  }
+
+  /** Records one detector sample; returns a strike event per newly confirmed flag. */
+  update(counts: Float32Array, at: number): StrikeEvent[] {
+    const flags = objectFlags(counts)
+    const events: StrikeEvent[] = []
+    this.lastSampleAt = at
+    for (const flag of this.streaks.keys()) {
+      if (!flags.includes(flag)) this.streaks.delete(flag)
+    }
+    for (const flag of flags) {
+      const streak = (this.streaks.get(flag) ?? 0) + 1
+      this.streaks.set(flag, streak)
+      if (streak < this.options.confirmSamples) continue
+
+      this.lastSeen.set(flag, at)
+      if (at - (this.lastReported.get(flag) ?? -Infinity) >= this.options.cooldownMs) {
+        this.lastReported.set(flag, at)
+        events.push({ description: `${FLAG_DESCRIPTIONS[flag]} (on-device detector)`, isDangerous: true })
+      }
+    }
+    return events
+  }
+
+  /** Confirmed flags seen within the summary window, for the remote prompt ("" if none). */
+  summary(now: number): string {
+    const recent: string[] = []
+    for (const [flag, at] of this.lastSeen) {
+      if (now - at <= this.options.summaryWindowMs) recent.push(FLAG_DESCRIPTIONS[flag])
+    }
+    return recent.join("; ")
+  }
+
+  /**
+   * Confirmed flags for the frame gate, `[]` for a scene with nothing of
+   * interest. Null while the detector has not sampled within the summary
+   * window (off or stalled) or a sighting is still unconfirmed.
+   */
+  gateFlags(now: number): ObjectFlag[] | null {
+    if (now - this.lastSampleAt > this.options.summaryWindowMs) return null
+    const confirmed: ObjectFlag[] = []
+    let settling = false
+    for (const [flag, streak] of this.streaks) {
+      if (streak >= this.options.confirmSamples) confirmed.push(flag)
+      else settling = true
+    }
+    return confirmed.length === 0 && settling ? null : confirmed
+  }
+
+  reset() {
+    this.lastSampleAt = -Infinity
+    this.streaks.clear()
+    this.lastSeen.clear()
+    this.lastReported.clear()
+  }
+}
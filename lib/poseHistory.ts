@@ -0,0 +1,124 @@
+import { FACE_STRIDE, KEYPOINT_NAMES, KEYPOINT_STRIDE, type VisionResult } from "./visionPipeline"
+
+// Fixed-capacity history of per-tick face and pose results. Everything lives
+// in typed arrays allocated once: appending overwrites the oldest record in
+// place and readers index straight into `data`, so neither side allocates per
+// frame. Records are addressed by logical index, 0 = oldest, `length - 1` =
+// newest; `offset(i)` gives the start of record i in `data`.
+//
+// Record layout (Float32):
+//   [HISTORY_FACE_OFFSET, +FACE_STRIDE)          first face, as packed by VisionPipeline
+//   [HISTORY_KEYPOINT_OFFSET, +KEYPOINT_FLOATS)  keypoints as x, y, score
+// Rows for a face or pose that was not detected are zero-filled; check
+// `faceCount(i)` / `hasPose(i)` before reading them.
+
+export const HISTORY_KEYPOINTS = KEYPOINT_NAMES.length
+export const HISTORY_FACE_OFFSET = 0
+export const HISTORY_KEYPOINT_OFFSET = FACE_STRIDE
+export const HISTORY_STRIDE = FACE_STRIDE + HISTORY_KEYPOINTS * KEYPOINT_STRIDE
+
+// 15 s at the detection loop's ~10 FPS
+export const DEFAULT_HISTORY_CAPACITY = 150
+
+export class PoseHistory {
+  readonly capacity: number
+  /** Packed records, HISTORY_STRIDE floats each; index with `offset(i)` */
+  readonly data: Float32Array
+  private times: Float64Array
+  private faceCounts: Uint8Array
+  private poseFlags: Uint8Array
+  private head = 0
+  private count = 0
+
+  constructor(capacity: number = DEFAULT_HISTORY_CAPACITY) {
+    this.capacity = capacity
+    this.data = new Float32Array(capacity * HISTORY_STRIDE)
+    this.times = new Float64Array(capacity)
+    this.faceCounts = new Uint8Array(capacity)
+    this.poseFlags = new Uint8Array(capacity)
+  }
+
+  get length(): number {
+    return this.count
+  }
+
+  /** Appends one tick, evicting the oldest record when full. O(1), no allocation. */
+  push(result: Pick<VisionResult, "faces" | "keypoints">, at: number) {
+    const slot = this.head
+    const base = slot * HISTORY_STRIDE
+    const { faces, keypoints } = result
+
+    const faceFloats = Math.min(faces.length, FACE_STRIDE)
+    for (let i = 0; i < faceFloats; i++) this.data[base + HISTORY_FACE_OFFSET + i] = faces[i]
+    this.data.fill(0, base + HISTORY_FACE_OFFSET + faceFloats, base + HISTORY_FACE_OFFSET + FACE_STRIDE)
+
+    const keypointFloats = Math.min(keypoints.length, HISTORY_KEYPOINTS * KEYPOINT_STRIDE)
+    for (let i = 0; i < keypointFloats; i++) this.data[base + HISTORY_KEYPOINT_OFFSET + i] = keypoints[i]
+    this.data.fill(0, base + HISTORY_KEYPOINT_OFFSET + keypointFloats, base + HISTORY_STRIDE)
+
+    this.times[slot] = at
+    this.faceCounts[slot] = Math.min(255, Math.floor(faces.length / FACE_STRIDE))
+    this.poseFlags[slot] = keypointFloats > 0 ? 1 : 0
+
+    this.head = (slot + 1) % this.capacity
+    if (this.count < this.capacity) this.count++
+  }
+
+  clear() {
+    this.head = 0
+    this.count = 0
+  }
+
+  private slot(index: number): number {
+    return (this.head - this.count + index + this.capacity) % this.capacity
+  }
+
+  /** Start of record `index` in `data`. */
+  offset(index: number): number {
+    return this.slot(index) * HISTORY_STRIDE
+  }
+
+  time(index: number): number {
+    return this.times[this.slot(index)]
+  }
+
+  faceCount(index: number): number {
+    return this.faceCounts[this.slot(index)]
+  }
+
+  hasPose(index: number): boolean {
+    return this.poseFlags[this.slot(index)] === 1
+  }
+
+  /** Logical index of the first record at or after `since` (`length` if none). */
+  indexSince(since: number): number {
+    let low = 0
+    let high = this.count
+    while (low < high) {
+      const mid = (low + high) >>> 1
+      if (this.times[this.slot(mid)] < since) low = mid + 1
+      else high = mid
+    }
+    return low
+  }
+
+  /** Newest record that has a pose, or -1. */
+  latestPoseIndex(): number {
+    for (let index = this.count - 1; index >= 0; index--) {
+      if (this.hasPose(index)) return index
+    }
+    return -1
+  }
+
+  /** Zero-copy view of record `index`'s first face (FACE_STRIDE floats). */
+  faceView(index: number): Float32Array {
+    const start = this.offset(index) + HISTORY_FACE_OFFSET
+    return this.data.subarray(start, start + FACE_STRIDE)
+  }
+
+  /** Zero-copy view of record `index`'s keypoints. */
+  keypointView(index: number): Float32Array {
+    const start = this.offset(index) + HISTORY_KEYPOINT_OFFSET
+    return this.data.subarray(start, start + HISTORY_KEYPOINTS * KEYPOINT_STRIDE)
+  }
+}
@@ -0,0 +1,257 @@
+// Recordings persisted to IndexedDB as they are captured. Every MediaRecorder
+// chunk (1 s) is written to the `chunks` store as soon as it arrives and the
+// session's manifest in `sessions` is updated in the same transaction, so
+// memory stays flat however long the interview runs and a crashed or closed
+// tab leaves a recording that is offered for recovery on every visit until it
+// is saved or deleted. Readers
+// pull chunks one at a time (`readRecording`) or feed them to a MediaSource
+// for playback (`recordingPlaybackUrl`).
+
+const DB_NAME = "phenomitor-recordings"
+const DB_VERSION = 1
+const SESSIONS = "sessions"
+const CHUNKS = "chunks"
+
+export type RecordingStatus = "recording" | "complete" | "interrupted"
+
+export interface RecordingManifest {
+  id: string
+  mimeType: string
+  startedAt: number
+  updatedAt: number
+  chunkCount: number
+  bytes: number
+  status: RecordingStatus
+  /** Set when the user saves the recording; unsaved complete ones are discarded later */
+  name?: string
+}
+
+interface StoredChunk {
+  sessionId: string
+  index: number
+  data: Blob
+}
+
+let dbPromise: Promise<IDBDatabase> | null = null
+
+function request<T>(req: IDBRequest<T>): Promise<T> {
+  return new Promise((resolve, reject) => {
+    req.onsuccess = () => resolve(req.result)
+    req.onerror = () => reject(req.error)
+  })
+}
+
+function transactionDone(tx: IDBTransaction): Promise<void> {
+  return new Promise((resolve, reject) => {
+    tx.oncomplete = () => resolve()
+    tx.onerror = () => reject(tx.error)
+    tx.onabort = () => reject(tx.error ?? new Error("Transaction aborted"))
+  })
+}
+
+function openDatabase(): Promise<IDBDatabase> {
+  if (typeof indexedDB === "undefined") return Promise.reject(new Error("IndexedDB is not available"))
+  dbPromise ??= new Promise<IDBDatabase>((resolve, reject) => {
+    const req = indexedDB.open(DB_NAME, DB_VERSION)
+    req.onupgradeneeded = () => {
+      const db = req.result
+      db.createObjectStore(SESSIONS, { keyPath: "id" })
+      db.createObjectStore(CHUNKS, { keyPath: ["sessionId", "index"] })
+    }
+    req.onsuccess = () => resolve(req.result)
+    req.onerror = () => reject(req.error)
+  }).catch((error) => {
+    dbPromise = null
+    throw error
+  })
+  return dbPromise
+}
+
+const chunkRange = (sessionId: string) => IDBKeyRange.bound([sessionId, 0], [sessionId, Infinity])
+
+/**
+ * Streams one recording into IndexedDB. Writes are queued and applied in
+ * order; each chunk is dropped from memory once stored. If IndexedDB is
+ * unavailable (private browsing, quota) the recording is not kept and
+ * `persisted` is false; detection is unaffected.
+ */
+export class RecordingWriter {
+  readonly sessionId: string
+  readonly mimeType: string
+  private manifest: RecordingManifest
+  private queue: Promise<void>
+  private available = true
+
+  constructor(mimeType: string) {
+    this.sessionId = `rec-${Date.now()}-${Math.random().toString(36).slice(2, 8)}`
+    this.mimeType = mimeType
+    const now = Date.now()
+    this.manifest = { id: this.sessionId, mimeType, startedAt: now, updatedAt: now, chunkCount: 0, bytes: 0, status: "recording" }
+    this.queue = this.putManifest().catch((error) => {
+      console.warn("Recording storage unavailable, the video will not be kept:", error)
+      this.available = false
+    })
+  }
+
+  get persisted(): boolean {
+    return this.available
+  }
+
+  append(data: Blob) {
+    if (data.size === 0) return
+    this.queue = this.queue.then(async () => {
+      if (!this.available) return
+      const db = await openDatabase()
+      const tx = db.transaction([CHUNKS, SESSIONS], "readwrite")
+      const chunk: StoredChunk = { sessionId: this.sessionId, index: this.manifest.chunkCount, data }
+      tx.objectStore(CHUNKS).put(chunk)
+      this.manifest = {
+        ...this.manifest,
+        chunkCount: this.manifest.chunkCount + 1,
+        bytes: this.manifest.bytes + data.size,
+        updatedAt: Date.now(),
+      }
+      tx.objectStore(SESSIONS).put(this.manifest)
+      await transactionDone(tx)
+    }).catch((error) => {
+      console.error("Failed to store recording chunk:", error)
+    })
+  }
+
+  /** Waits for pending writes and marks the recording complete. */
+  async finish(): Promise<RecordingManifest> {
+    await this.queue
+    this.manifest = { ...this.manifest, status: "complete", updatedAt: Date.now() }
+    if (this.available) await this.putManifest().catch(() => {})
+    return this.manifest
+  }
+
+  private async putManifest() {
+    const db = await openDatabase()
+    const tx = db.transaction(SESSIONS, "readwrite")
+    tx.objectStore(SESSIONS).put(this.manifest)
+    await transactionDone(tx)
+  }
+}
+
+export async function listRecordings(): Promise<RecordingManifest[]> {
+  const db = await openDatabase()
+  const manifests = await request(db.transaction(SESSIONS).objectStore(SESSIONS).getAll() as IDBRequest<RecordingManifest[]>)
+  return manifests.sort((a, b) => b.startedAt - a.startedAt)
+}
+
+export async function getRecording(sessionId: string): Promise<RecordingManifest | null> {
+  const db = await openDatabase()
+  const manifest = await request(db.transaction(SESSIONS).objectStore(SESSIONS).get(sessionId) as IDBRequest<RecordingManifest | undefined>)
+  return manifest ?? null
+}
+
+/**
+ * Marks recordings left in "recording" state by a previous page (crash, tab
+ * closed mid-interview) as interrupted and returns them, newest first. Their
+ * chunks up to the last completed write are intact.
+ */
+export async function recoverInterruptedRecordings(): Promise<RecordingManifest[]> {
+  const db = await openDatabase()
+  const tx = db.transaction(SESSIONS, "readwrite")
+  const sessions = tx.objectStore(SESSIONS)
+  const manifests = await request(sessions.getAll() as IDBRequest<RecordingManifest[]>)
+  const recovered: RecordingManifest[] = []
+  for (const manifest of manifests) {
+    if (manifest.status === "interrupted" && !manifest.name) {
+      recovered.push(manifest)
+    } else if (manifest.status === "recording") {
+      const updated = { ...manifest, status: "interrupted" as const }
+      sessions.put(updated)
+      recovered.push(updated)
+    }
+  }
+  await transactionDone(tx)
+  return recovered.filter((manifest) => manifest.chunkCount > 0).sort((a, b) => b.startedAt - a.startedAt)
+}
+
+export async function nameRecording(sessionId: string, name: string) {
+  const db = await openDatabase()
+  const tx = db.transaction(SESSIONS, "readwrite")
+  const sessions = tx.objectStore(SESSIONS)
+  const manifest = await request(sessions.get(sessionId) as IDBRequest<RecordingManifest | undefined>)
+  if (manifest) sessions.put({ ...manifest, name })
+  await transactionDone(tx)
+}
+
+export async function deleteRecording(sessionId: string) {
+  const db = await openDatabase()
+  const tx = db.transaction([CHUNKS, SESSIONS], "readwrite")
+  tx.objectStore(CHUNKS).delete(chunkRange(sessionId))
+  tx.objectStore(SESSIONS).delete(sessionId)
+  await transactionDone(tx)
+}
+
+/**
+ * Deletes complete recordings that were never saved, except `keep`.
+ * Interrupted ones stay until the user saves or deletes them.
+ */
+export async function discardUnsavedRecordings(keep: string[] = []) {
+  const manifests = await listRecordings()
+  await Promise.all(
+    manifests
+      .filter((manifest) => !manifest.name && manifest.status === "complete" && !keep.includes(manifest.id))
+      .map((manifest) => deleteRecording(manifest.id))
+  )
+}
+
+async function readChunk(sessionId: string, index: number): Promise<Blob | null> {
+  const db = await openDatabase()
+  const chunk = await request(db.transaction(CHUNKS).objectStore(CHUNKS).get([sessionId, index]) as IDBRequest<StoredChunk | undefined>)
+  return chunk?.data ?? null
+}
+
+/** The recording's bytes, read from IndexedDB one chunk per pull. */
+export function readRecording(manifest: RecordingManifest): ReadableStream<Uint8Array> {
+  let index = 0
+  return new ReadableStream<Uint8Array>({
+    async pull(controller) {
+      if (index >= manifest.chunkCount) {
+        controller.close()
+        return
+      }
+      const chunk = await readChunk(manifest.id, index++)
+      if (chunk) controller.enqueue(new Uint8Array(await chunk.arrayBuffer()))
+    },
+  })
+}
+
+/**
+ * Object URL for playing a stored recording. With MediaSource support the
+ * chunks are appended as the previous one is consumed; otherwise the chunk
+ * Blobs (disk-backed handles from IndexedDB) are joined into one Blob.
+ * Call `revoke` when done.
+ */
+export async function recordingPlaybackUrl(manifest: RecordingManifest): Promise<{ url: string; revoke: () => void }> {
+  if (typeof MediaSource !== "undefined" && MediaSource.isTypeSupported(manifest.mimeType)) {
+    const mediaSource = new MediaSource()
+    const url = URL.createObjectURL(mediaSource)
+    mediaSource.addEventListener("sourceopen", () => {
+      const buffer = mediaSource.addSourceBuffer(manifest.mimeType)
+      buffer.mode = "sequence"
+      const reader = readRecording(manifest).getReader()
+      const appendNext = async () => {
+        const { value, done } = await reader.read()
+        if (mediaSource.readyState !== "open") return
+        if (done) mediaSource.endOfStream()
+        else buffer.appendBuffer(value)
+      }
+      buffer.addEventListener("updateend", () => void appendNext())
+      void appendNext()
+    }, { once: true })
+    return { url, revoke: () => URL.revokeObjectURL(url) }
+  }
+
+  const chunks: Blob[] = []
+  for (let index = 0; index < manifest.chunkCount; index++) {
+    const chunk = await readChunk(manifest.id, index)
+    if (chunk) chunks.push(chunk)
+  }
+  const url = URL.createObjectURL(new Blob(chunks, { type: manifest.mimeType }))
+  return { url, revoke: () => URL.revokeObjectURL(url) }
+}
@@ -0,0 +1,110 @@
+import type { GateFace } from "./frameGate"
+
+// Region-of-interest frame for remote analysis. Instead of the whole frame
+// downscaled to 640x360, one 576x320 JPEG carries three tiles:
+//
+//   +-----------+---------+
+//   |           | context |  whole frame, downscaled
+//   |   face    +---------+
+//   |           |  desk   |  area below and around the face
+//   +-----------+---------+
+//
+// The face tile is cropped from the full-resolution video, so the eyes get
+// several times the pixels they had in the downscaled frame. The prompt is
+// told about the layout (see MOSAIC_INSTRUCTIONS in lib/detectionPrompt.ts).
+
+export interface Rect {
+  x: number
+  y: number
+  width: number
+  height: number
+}
+
+export interface MosaicLayout {
+  width: number
+  height: number
+  face: Rect
+  context: Rect
+  desk: Rect
+}
+
+export const MOSAIC_LAYOUT: MosaicLayout = {
+  width: 576,
+  height: 320,
+  face: { x: 0, y: 0, width: 320, height: 320 },
+  context: { x: 320, y: 0, width: 256, height: 144 },
+  desk: { x: 320, y: 144, width: 256, height: 176 },
+}
+
+// Face box padding on each side, as a fraction of the box size; keeps the
+// eyebrows, ears and hands near the face in the crop
+const FACE_MARGIN = 0.5
+
+function clampRect(rect: Rect, frameWidth: number, frameHeight: number): Rect {
+  const width = Math.min(rect.width, frameWidth)
+  const height = Math.min(rect.height, frameHeight)
+  return {
+    x: Math.min(Math.max(rect.x, 0), frameWidth - width),
+    y: Math.min(Math.max(rect.y, 0), frameHeight - height),
+    width,
+    height,
+  }
+}
+
+/** Source rect with the aspect of `tile`, centred on (cx, cy), at least `minWidth` wide. */
+function cropAround(cx: number, cy: number, minWidth: number, tile: Rect, frameWidth: number, frameHeight: number): Rect {
+  const aspect = tile.width / tile.height
+  let width = Math.max(minWidth, 1)
+  let height = width / aspect
+  // Keep the aspect when the frame cannot fit the requested size
+  const fit = Math.min(1, frameWidth / width, frameHeight / height)
+  width *= fit
+  height *= fit
+  return clampRect({ x: cx - width / 2, y: cy - height / 2, width, height }, frameWidth, frameHeight)
+}
+
+/** Source rect for the face tile: the padded face box, squared to the tile. */
+export function faceCropRect(face: GateFace, frameWidth: number, frameHeight: number, layout: MosaicLayout = MOSAIC_LAYOUT): Rect {
+  const [x1, y1] = face.topLeft
+  const [x2, y2] = face.bottomRight
+  const size = Math.max(x2 - x1, y2 - y1) * (1 + 2 * FACE_MARGIN)
+  return cropAround((x1 + x2) / 2, (y1 + y2) / 2, size, layout.face, frameWidth, frameHeight)
+}
+
+/** Source rect for the desk tile: three face widths wide, from the chin down. */
+export function deskCropRect(face: GateFace, frameWidth: number, frameHeight: number, layout: MosaicLayout = MOSAIC_LAYOUT): Rect {
+  const [x1, y1] = face.topLeft
+  const [x2, y2] = face.bottomRight
+  const width = (x2 - x1) * 3
+  const height = width / (layout.desk.width / layout.desk.height)
+  return cropAround((x1 + x2) / 2, y2 + height / 2, width, layout.desk, frameWidth, frameHeight)
+}
+
+/** Destination rect that fits a `sourceWidth` x `sourceHeight` image into `tile`, letterboxed. */
+export function fitRect(sourceWidth: number, sourceHeight: number, tile: Rect): Rect {
+  const scale = Math.min(tile.width / sourceWidth, tile.height / sourceHeight)
+  const width = sourceWidth * scale
+  const height = sourceHeight * scale
+  return { x: tile.x + (tile.width - width) / 2, y: tile.y + (tile.height - height) / 2, width, height }
+}
+
+type Context2D = CanvasRenderingContext2D | OffscreenCanvasRenderingContext2D
+
+/** Draws the mosaic for `face` from `source` (a video frame of `frameWidth` x `frameHeight`). */
+export function drawMosaic(
+  ctx: Context2D,
+  source: CanvasImageSource,
+  frameWidth: number,
+  frameHeight: number,
+  face: GateFace,
+  layout: MosaicLayout = MOSAIC_LAYOUT
+) {
+  ctx.fillStyle = "black"
+  ctx.fillRect(0, 0, layout.width, layout.height)
+  const draw = (from: Rect, to: Rect) =>
+    ctx.drawImage(source, from.x, from.y, from.width, from.height, to.x, to.y, to.width, to.height)
+
+  draw(faceCropRect(face, frameWidth, frameHeight, layout), layout.face)
+  draw({ x: 0, y: 0, width: frameWidth, height: frameHeight }, fitRect(frameWidth, frameHeight, layout.context))
+  draw(deskCropRect(face, frameWidth, frameHeight, layout), layout.desk)
+}
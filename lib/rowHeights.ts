@@ -0,0 +1,94 @@
+// Row offsets for a virtualized list with variable row heights. Rows start at
+// an estimated height and are corrected as they are measured; a Fenwick tree
+// over the heights keeps "offset of row i" and "row at scroll offset y" at
+// O(log n) while measurements arrive one row at a time. Used by
+// components/timestamp-list.tsx.
+
+export class RowHeights {
+  private estimate: number
+  private heights = new Float64Array(0)
+  // 1-based Fenwick tree over `heights`
+  private tree = new Float64Array(1)
+  private size = 0
+
+  constructor(estimate: number) {
+    this.estimate = estimate
+  }
+
+  get count(): number {
+    return this.size
+  }
+
+  /** Grows or shrinks to `count` rows; new rows get the estimated height. */
+  setCount(count: number) {
+    if (count === this.size) return
+    if (count < this.size) {
+      // Lists only shrink when cleared; rebuilding is simplest
+      this.rebuild(this.heights.slice(0, count), count)
+      return
+    }
+    if (count > this.heights.length) {
+      const heights = new Float64Array(Math.max(count, this.heights.length * 2, 64))
+      heights.set(this.heights.subarray(0, this.size))
+      heights.fill(this.estimate, this.size, count)
+      this.rebuild(heights, count)
+      return
+    }
+    for (let i = this.size; i < count; i++) {
+      this.heights[i] = this.estimate
+      this.add(i, this.estimate)
+    }
+    this.size = count
+  }
+
+  /** Records a measured height. Returns whether it changed. */
+  set(index: number, height: number): boolean {
+    if (index < 0 || index >= this.size) return false
+    const delta = height - this.heights[index]
+    if (Math.abs(delta) < 0.5) return false
+    this.heights[index] = height
+    this.add(index, delta)
+    return true
+  }
+
+  /** Top of row `index` (the total height when index === count). */
+  offset(index: number): number {
+    let sum = 0
+    for (let i = Math.min(index, this.size); i > 0; i -= i & -i) sum += this.tree[i]
+    return sum
+  }
+
+  total(): number {
+    return this.offset(this.size)
+  }
+
+  /** Row containing vertical offset `y`, clamped to the list. */
+  indexAt(y: number): number {
+    if (this.size === 0) return 0
+    let position = 0
+    let remaining = y
+    for (let step = 1 << Math.floor(Math.log2(this.size)); step > 0; step >>= 1) {
+      const next = position + step
+      if (next <= this.size && this.tree[next] <= remaining) {
+        position = next
+        remaining -= this.tree[next]
+      }
+    }
+    return Math.min(position, this.size - 1)
+  }
+
+  private add(index: number, delta: number) {
+    for (let i = index + 1; i < this.tree.length; i += i & -i) this.tree[i] += delta
+  }
+
+  private rebuild(heights: Float64Array, count: number) {
+    this.heights = heights
+    this.size = count
+    this.tree = new Float64Array(heights.length + 1)
+    for (let i = 0; i < count; i++) this.tree[i + 1] += heights[i]
+    for (let i = 1; i < this.tree.length; i++) {
+      const parent = i + (i & -i)
+      if (parent < this.tree.length) this.tree[parent] += this.tree[i]
+    }
+  }
+}
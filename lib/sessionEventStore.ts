@@ -0,0 +1,141 @@
+import { useCallback, useSyncExternalStore } from "react"
+import type { Timestamp } from "../app/types"
+import type { Strike } from "./strikeTracker"
+
+// Append-only log of a session's detection events and strikes. Appending is
+// O(1) (no array copies per event, unlike `setState(prev => [...prev, e])`),
+// and subscribers are notified at most once per animation frame however many
+// events arrive in it. The page, TimestampList and Timeline subscribe with a
+// selector on the snapshot and read rows straight from the logs.
+
+const CHUNK_SIZE = 256
+
+/** Append-only list stored as fixed-size chunks, so growing never copies earlier items. */
+export class ChunkedLog<T> {
+  private chunks: T[][] = []
+  private size = 0
+
+  get length(): number {
+    return this.size
+  }
+
+  push(item: T): number {
+    const last = this.chunks[this.chunks.length - 1]
+    if (!last || last.length === CHUNK_SIZE) {
+      this.chunks.push([item])
+    } else {
+      last.push(item)
+    }
+    return this.size++
+  }
+
+  get(index: number): T | undefined {
+    if (index < 0 || index >= this.size) return undefined
+    return this.chunks[Math.floor(index / CHUNK_SIZE)][index % CHUNK_SIZE]
+  }
+
+  /** Items in [start, end), like Array.prototype.slice without negative indexes. */
+  slice(start: number = 0, end: number = this.size): T[] {
+    const out: T[] = []
+    for (let i = Math.max(0, start); i < Math.min(end, this.size); i++) {
+      out.push(this.chunks[Math.floor(i / CHUNK_SIZE)][i % CHUNK_SIZE])
+    }
+    return out
+  }
+
+  forEach(callback: (item: T, index: number) => void) {
+    let index = 0
+    for (const chunk of this.chunks) {
+      for (const item of chunk) callback(item, index++)
+    }
+  }
+
+  clear() {
+    this.chunks = []
+    this.size = 0
+  }
+}
+
+export interface SessionEvent extends Timestamp {
+  /** Capture time of the analyzed frame (epoch ms) */
+  at: number
+  /** Seconds since recording started; `timestamp` is the same as mm:ss */
+  seconds: number
+}
+
+export interface SessionSnapshot {
+  /** Bumped on every append or clear; the published value lags by up to a frame */
+  version: number
+  eventCount: number
+  dangerousCount: number
+  strikeCount: number
+}
+
+const EMPTY_SNAPSHOT: SessionSnapshot = { version: 0, eventCount: 0, dangerousCount: 0, strikeCount: 0 }
+
+const scheduleFrame = (callback: () => void) =>
+  typeof requestAnimationFrame === "function" ? requestAnimationFrame(callback) : setTimeout(callback, 16)
+
+export class SessionEventStore {
+  readonly events = new ChunkedLog<SessionEvent>()
+  readonly strikes = new ChunkedLog<Strike>()
+  private version = 0
+  private dangerousCount = 0
+  private snapshot = EMPTY_SNAPSHOT
+  private flushPending = false
+  private listeners = new Set<() => void>()
+
+  appendEvent(event: SessionEvent) {
+    this.events.push(event)
+    if (event.isDangerous) this.dangerousCount++
+    this.changed()
+  }
+
+  appendStrike(strike: Strike) {
+    this.strikes.push(strike)
+    this.changed()
+  }
+
+  /** Drops the events but keeps strikes, which count across recordings. */
+  clearEvents() {
+    this.events.clear()
+    this.dangerousCount = 0
+    this.changed()
+  }
+
+  getSnapshot = (): SessionSnapshot => this.snapshot
+
+  subscribe = (listener: () => void): (() => void) => {
+    this.listeners.add(listener)
+    return () => {
+      this.listeners.delete(listener)
+    }
+  }
+
+  private changed() {
+    this.version++
+    if (this.flushPending) return
+    this.flushPending = true
+    scheduleFrame(this.flush)
+  }
+
+  private flush = () => {
+    this.flushPending = false
+    this.snapshot = {
+      version: this.version,
+      eventCount: this.events.length,
+      dangerousCount: this.dangerousCount,
+      strikeCount: this.strikes.length,
+    }
+    this.listeners.forEach((listener) => listener())
+  }
+}
+
+/**
+ * Subscribes a component to one value derived from the session snapshot.
+ * Select `version` to re-render on every batch of appends.
+ */
+export function useSessionSelector<T>(store: SessionEventStore, selector: (snapshot: SessionSnapshot) => T): T {
+  const getSelection = useCallback(() => selector(store.getSnapshot()), [store, selector])
+  return useSyncExternalStore(store.subscribe, getSelection, getSelection)
+}
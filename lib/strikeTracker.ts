@@ -0,0 +1,75 @@
+// Three-strike bookkeeping for dangerous events. Kept free of React and DOM so
+// the realtime page and the offline replay harness count strikes the same
+// way; callers decide how to surface each level (toast, alert, notification).
+
+export const STRIKE_LIMIT = 3
+
+export interface Strike {
+  time: string
+  reason: string
+}
+
+/**
+ * - "warning": a strike below the limit
+ * - "alert": the strike that reaches the limit (reported once per session)
+ * - "continued": any strike after the alert
+ */
+export type StrikeLevel = "warning" | "alert" | "continued"
+
+export interface StrikeUpdate {
+  count: number
+  level: StrikeLevel
+  strike: Strike
+  history: Strike[]
+}
+
+export interface StrikeEvent {
+  description: string
+  isDangerous: boolean
+}
+
+const formatClockTime = (at: number) => new Date(at).toLocaleTimeString()
+
+export class StrikeTracker {
+  private limit: number
+  private formatTime: (at: number) => string
+  private strikes: Strike[] = []
+  private alerted = false
+
+  constructor(limit: number = STRIKE_LIMIT, formatTime: (at: number) => string = formatClockTime) {
+    this.limit = limit
+    this.formatTime = formatTime
+  }
+
+  get count(): number {
+    return this.strikes.length
+  }
+
+  get history(): Strike[] {
+    return this.strikes
+  }
+
+  /** Records `event` seen at `at` (epoch ms). Returns null for harmless events. */
+  record(event: StrikeEvent, at: number): StrikeUpdate | null {
+    if (!event.isDangerous) return null
+
+    const strike = { time: this.formatTime(at), reason: event.description }
+    // Appended in place; the page mirrors strikes into lib/sessionEventStore.ts
+    this.strikes.push(strike)
+    const count = this.strikes.length
+
+    let level: StrikeLevel = "warning"
+    if (count >= this.limit && !this.alerted) {
+      this.alerted = true
+      level = "alert"
+    } else if (count > this.limit) {
+      level = "continued"
+    }
+    return { count, level, strike, history: this.strikes }
+  }
+
+  reset() {
+    this.strikes = []
+    this.alerted = false
+  }
+}
@@ -0,0 +1,199 @@
+// Data structures behind the canvas timeline (app/components/Timeline.tsx).
+// `TimelineBins` folds events into fixed time buckets that are projected onto
+// pixel columns when drawing, so drawing costs the same for ten events or ten
+// thousand; `IntervalIndex` answers "which events overlap this time range" for
+// hover in O(log n + k), and `IntervalLog` keeps such indexes up to date as
+// events are appended.
+
+export interface TimelineSpan {
+  start: number
+  end: number
+}
+
+// Shortest span the buckets cover; longer timelines double it
+const MIN_SPAN_SECONDS = 64
+
+/** Smallest power-of-two multiple of MIN_SPAN_SECONDS that covers `duration`. */
+export function binSpan(duration: number): number {
+  let span = MIN_SPAN_SECONDS
+  while (span < duration) span *= 2
+  return span
+}
+
+/**
+ * Event density in fixed time buckets. The buckets cover `span` seconds, the
+ * timeline's duration rounded up to a power of two, at two buckets per pixel
+ * column. A timeline that grows every second while recording therefore only
+ * re-bins when its duration doubles (O(log n) times), not on every change.
+ */
+export class TimelineBins {
+  /** Seconds covered by the buckets */
+  span = 0
+  columns = 0
+  /** Events overlapping each bucket */
+  density = new Uint32Array(0)
+  /** Warning events overlapping each bucket */
+  warnings = new Uint32Array(0)
+  /** Highest value in `density`, for scaling */
+  maxDensity = 0
+  /** Events added since the last reset */
+  added = 0
+
+  /** Whether the buckets must be reset (and refilled) to show `duration` on `columns` columns. */
+  needsReset(duration: number, columns: number): boolean {
+    return this.columns !== columns || this.span !== binSpan(duration)
+  }
+
+  reset(duration: number, columns: number) {
+    this.span = binSpan(duration)
+    this.columns = columns
+    const buckets = columns * 2
+    if (this.density.length !== buckets) {
+      this.density = new Uint32Array(buckets)
+      this.warnings = new Uint32Array(buckets)
+    } else {
+      this.density.fill(0)
+      this.warnings.fill(0)
+    }
+    this.maxDensity = 0
+    this.added = 0
+  }
+
+  add(start: number, end: number, warning: boolean) {
+    this.added++
+    const buckets = this.density.length
+    if (buckets === 0 || this.span <= 0) return
+    const scale = buckets / this.span
+    const first = Math.max(0, Math.floor(start * scale))
+    // A span always covers at least the bucket it starts in
+    const last = Math.min(buckets - 1, Math.max(first, Math.ceil(end * scale) - 1))
+    for (let bucket = first; bucket <= last; bucket++) {
+      const density = ++this.density[bucket]
+      if (density > this.maxDensity) this.maxDensity = density
+      if (warning) this.warnings[bucket]++
+    }
+  }
+
+  /**
+   * Visits each of `columns` columns showing [0, duration) that has events,
+   * with the highest density and warning count of the buckets under it.
+   */
+  project(columns: number, duration: number, visit: (column: number, density: number, warnings: number) => void) {
+    const buckets = this.density.length
+    if (buckets === 0 || duration <= 0) return
+    const bucketsPerColumn = (duration / this.span) * buckets / columns
+    for (let column = 0; column < columns; column++) {
+      const first = Math.floor(column * bucketsPerColumn)
+      if (first >= buckets) break
+      const last = Math.min(buckets - 1, Math.max(first, Math.ceil((column + 1) * bucketsPerColumn) - 1))
+      let density = 0
+      let warnings = 0
+      for (let bucket = first; bucket <= last; bucket++) {
+        if (this.density[bucket] > density) density = this.density[bucket]
+        if (this.warnings[bucket] > warnings) warnings = this.warnings[bucket]
+      }
+      if (density > 0) visit(column, density, warnings)
+    }
+  }
+}
+
+/**
+ * Static interval tree over spans: sorted by start, laid out as an implicit
+ * balanced tree (the middle of each range is its root) with the largest end
+ * in each subtree. Rebuild it when the spans change.
+ */
+export class IntervalIndex {
+  private starts: Float64Array
+  private ends: Float64Array
+  private maxEnds: Float64Array
+  private ids: Uint32Array
+
+  constructor(spans: ArrayLike<TimelineSpan>) {
+    const order = Array.from({ length: spans.length }, (_, i) => i).sort((a, b) => spans[a].start - spans[b].start)
+    this.starts = new Float64Array(order.length)
+    this.ends = new Float64Array(order.length)
+    this.maxEnds = new Float64Array(order.length)
+    this.ids = new Uint32Array(order)
+    order.forEach((id, i) => {
+      this.starts[i] = spans[id].start
+      this.ends[i] = spans[id].end
+    })
+    this.buildMaxEnds(0, order.length)
+  }
+
+  get size(): number {
+    return this.ids.length
+  }
+
+  /** Indexes (into the constructor's spans) of spans overlapping [from, to], by start time. */
+  query(from: number, to: number = from): number[] {
+    const hits: number[] = []
+    this.search(0, this.ids.length, from, to, hits)
+    return hits
+  }
+
+  private buildMaxEnds(low: number, high: number): number {
+    if (low >= high) return -Infinity
+    const mid = (low + high) >> 1
+    const maxEnd = Math.max(this.ends[mid], this.buildMaxEnds(low, mid), this.buildMaxEnds(mid + 1, high))
+    this.maxEnds[mid] = maxEnd
+    return maxEnd
+  }
+
+  private search(low: number, high: number, from: number, to: number, hits: number[]) {
+    if (low >= high) return
+    const mid = (low + high) >> 1
+    // Nothing in this subtree ends late enough
+    if (this.maxEnds[mid] < from) return
+    this.search(low, mid, from, to, hits)
+    // Everything right of mid starts at or after starts[mid]
+    if (this.starts[mid] > to) return
+    if (this.ends[mid] >= from) hits.push(this.ids[mid])
+    this.search(mid + 1, high, from, to, hits)
+  }
+}
+
+/**
+ * Interval index over spans appended one at a time (by event index). Spans
+ * live in static `IntervalIndex` blocks whose sizes are distinct powers of
+ * two; an append merges equal-sized blocks like a binary counter, so it costs
+ * O(log n) amortized and a query O(log² n + k).
+ */
+export class IntervalLog {
+  private blocks: { index: IntervalIndex; spans: TimelineSpan[]; offset: number }[] = []
+  private count = 0
+
+  get size(): number {
+    return this.count
+  }
+
+  add(span: TimelineSpan) {
+    let spans = [span]
+    let offset = this.count
+    let last = this.blocks[this.blocks.length - 1]
+    while (last && last.spans.length === spans.length) {
+      this.blocks.pop()
+      spans = last.spans.concat(spans)
+      offset = last.offset
+      last = this.blocks[this.blocks.length - 1]
+    }
+    this.blocks.push({ index: new IntervalIndex(spans), spans, offset })
+    this.count++
+  }
+
+  /** Indexes (in append order) of spans overlapping [from, to], by start time. */
+  query(from: number, to: number = from): number[] {
+    const hits: { start: number; id: number }[] = []
+    for (const block of this.blocks) {
+      for (const local of block.index.query(from, to)) {
+        hits.push({ start: block.spans[local].start, id: block.offset + local })
+      }
+    }
+    return hits.sort((a, b) => a.start - b.start || a.id - b.id).map((hit) => hit.id)
+  }
+
+  clear() {
+    this.blocks = []
+    this.count = 0
+  }
+}
@@ -0,0 +1,111 @@
+import { useSyncExternalStore } from "react"
+
+// Speech-recognition transcript as timestamped segments rather than one
+// growing string. Analysis requests take only the window around the frames
+// they carry (`window`), so their payload and prompt stay the same size
+// however long the session runs; the transcript panel subscribes to the
+// store and renders the segments without the page re-rendering.
+
+export interface TranscriptSegment {
+  text: string
+  /** When speech for this segment was first heard (first interim result) */
+  start: number
+  /** When the recognizer finalized it */
+  end: number
+}
+
+export interface TranscriptWindowOptions {
+  /** Speech before the first frame to include, for questions still being answered */
+  leadMs: number
+  /** Upper bound on the returned text; the oldest words are dropped first */
+  maxChars: number
+}
+
+export const DEFAULT_TRANSCRIPT_WINDOW: TranscriptWindowOptions = {
+  leadMs: 15000,
+  maxChars: 600,
+}
+
+export class TranscriptStore {
+  private segments: TranscriptSegment[] = []
+  private version = 0
+  private listeners = new Set<() => void>()
+
+  get length(): number {
+    return this.segments.length
+  }
+
+  append(text: string, start: number, end: number = start) {
+    const trimmed = text.trim()
+    if (!trimmed) return
+    this.segments.push({ text: trimmed, start: Math.min(start, end), end })
+    this.notify()
+  }
+
+  clear() {
+    this.segments = []
+    this.notify()
+  }
+
+  segmentsView(): readonly TranscriptSegment[] {
+    return this.segments
+  }
+
+  /** Index of the first segment that ends at or after `t` (segments are appended in time order). */
+  indexSince(t: number): number {
+    let low = 0
+    let high = this.segments.length
+    while (low < high) {
+      const mid = (low + high) >> 1
+      if (this.segments[mid].end < t) low = mid + 1
+      else high = mid
+    }
+    return low
+  }
+
+  /**
+   * Text spoken between `leadMs` before `from` and `to`, at most `maxChars`
+   * long. Segments that started after `to` are left out.
+   */
+  window(from: number, to: number = Infinity, options: Partial<TranscriptWindowOptions> = {}): string {
+    const { leadMs, maxChars } = { ...DEFAULT_TRANSCRIPT_WINDOW, ...options }
+    const parts: string[] = []
+    let length = 0
+    const first = this.indexSince(from - leadMs)
+    // Walk back from the newest segment so the size bound costs O(window)
+    for (let i = this.segments.length - 1; i >= first; i--) {
+      const segment = this.segments[i]
+      if (segment.start > to) continue
+      parts.push(segment.text)
+      length += segment.text.length + 1
+      if (length > maxChars) break
+    }
+    const text = parts.reverse().join(" ")
+    if (text.length <= maxChars) return text
+    const cut = text.slice(text.length - maxChars)
+    // Keep the first word when the cut already falls on a word boundary
+    if (text[text.length - maxChars - 1] === " ") return cut
+    const space = cut.indexOf(" ")
+    return space < 0 ? cut : cut.slice(space + 1)
+  }
+
+  getVersion = (): number => this.version
+
+  subscribe = (listener: () => void): (() => void) => {
+    this.listeners.add(listener)
+    return () => {
+      this.listeners.delete(listener)
+    }
+  }
+
+  private notify() {
+    this.version++
+    this.listeners.forEach((listener) => listener())
+  }
+}
+
+/** Re-renders the caller whenever a segment is added or the store is cleared. */
+export function useTranscriptSegments(store: TranscriptStore): readonly TranscriptSegment[] {
+  useSyncExternalStore(store.subscribe, store.getVersion, store.getVersion)
+  return store.segmentsView()
+}
@@ -0,0 +1,53 @@
+import { drawOverlay, VisionPipeline } from "./visionPipeline"
+import type { VisionRequest, VisionResponse } from "./visionClient"
+
+// Dedicated worker for face/pose inference. Frames arrive as transferred
+// ImageBitmaps; the overlay is drawn on the page's canvas, transferred here
+// as an OffscreenCanvas once the models are ready, and only the packed
+// results are posted back. Their buffer is transferred, and returns with a
+// "release" message for the next tick to reuse.
+
+const scope = self as unknown as {
+  onmessage: ((event: MessageEvent<VisionRequest>) => void) | null
+  postMessage(message: VisionResponse, transfer?: Transferable[]): void
+}
+
+const pipeline = new VisionPipeline()
+let context: OffscreenCanvasRenderingContext2D | null = null
+
+scope.onmessage = async (event) => {
+  const message = event.data
+
+  if (message.type === "init") {
+    try {
+      const timings = await pipeline.load(
+        (progress) => scope.postMessage({ type: "progress", message: progress }),
+        message.backend
+      )
+      scope.postMessage({ type: "ready", timings })
+    } catch (err) {
+      scope.postMessage({ type: "error", message: (err as Error).message })
+    }
+  } else if (message.type === "canvas") {
+    context = message.canvas.getContext("2d")
+  } else if (message.type === "frame") {
+    const { bitmap, seq } = message
+    try {
+      const result = await pipeline.detect(bitmap)
+      if (context) drawOverlay(context, bitmap, result)
+      // faces, keypoints and objects share one buffer
+      scope.postMessage({ type: "result", seq, result }, [result.faces.buffer as ArrayBuffer])
+    } catch (err) {
+      scope.postMessage({ type: "error", message: (err as Error).message, seq })
+    } finally {
+      bitmap.close()
+    }
+  } else if (message.type === "release") {
+    pipeline.releaseBuffer(message.buffer)
+  } else if (message.type === "configure") {
+    pipeline.configure(message.options)
+  } else if (message.type === "dispose") {
+    pipeline.dispose()
+    context = null
+  }
+}
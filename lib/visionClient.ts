@@ -0,0 +1,249 @@
+import { loadBackendChoice, saveBackendChoice, type BackendChoice } from "./backendSelector"
+import { drawOverlay, VisionPipeline, type VisionInitTimings, type VisionPipelineOptions, type VisionResult } from "./visionPipeline"
+
+// Main-thread side of face/pose inference. `WorkerVisionClient` hands frames
+// to lib/vision.worker.ts as transferred ImageBitmaps and gets packed results
+// back; the overlay canvas is transferred to the worker once its models are
+// ready, so a worker that fails to start leaves the canvas to the main thread.
+// Only one frame is in flight at a time, so a slow inference drops frames
+// instead of queueing them, and each result's buffer goes back to the pipeline
+// through `release` for reuse. `InlineVisionClient` runs the same pipeline on the
+// main thread, as a fallback where OffscreenCanvas is missing or the worker
+// fails, and as the baseline for frame-time comparisons (`?vision=main`).
+
+export type VisionRequest =
+  | { type: "init"; backend: BackendChoice | null }
+  | { type: "canvas"; canvas: OffscreenCanvas }
+  | { type: "frame"; seq: number; bitmap: ImageBitmap }
+  | { type: "release"; buffer: ArrayBuffer }
+  | { type: "configure"; options: Partial<VisionPipelineOptions> }
+  | { type: "dispose" }
+
+export type VisionResponse =
+  | { type: "progress"; message: string }
+  | { type: "ready"; timings: VisionInitTimings }
+  | { type: "result"; seq: number; result: VisionResult }
+  | { type: "error"; message: string; seq?: number }
+
+export interface VisionClient {
+  readonly mode: "worker" | "main"
+  /** Whether a frame is still being processed (new frames are skipped) */
+  readonly busy: boolean
+  /** Whether the client stopped for good (the worker crashed); frames are no longer processed */
+  readonly failed: boolean
+  /** Loads and warms up the models; resolves with per-phase startup times. */
+  init(onProgress?: (message: string) => void): Promise<VisionInitTimings>
+  /** Runs inference on the current video frame and draws the overlay. Resolves null if skipped. */
+  process(video: HTMLVideoElement): Promise<VisionResult | null>
+  /** Returns a consumed result's buffer for reuse; the result must not be read afterwards. */
+  release(result: VisionResult): void
+  /** Changes pipeline options (e.g. turns object detection on) without reloading. */
+  configure(options: Partial<VisionPipelineOptions>): void
+  dispose(): void
+}
+
+export class WorkerVisionClient implements VisionClient {
+  readonly mode = "worker"
+  private worker: Worker
+  private canvas: HTMLCanvasElement
+  private seq = 0
+  private pending: { seq: number; resolve: (result: VisionResult | null) => void } | null = null
+  private onProgress: (message: string) => void = () => {}
+  private initCallbacks: { resolve: (timings: VisionInitTimings) => void; reject: (error: Error) => void } | null = null
+  private initPromise: Promise<VisionInitTimings> | null = null
+  // Set once the worker failed to load or crashed; it is not restarted
+  private failure: Error | null = null
+
+  constructor(canvas: HTMLCanvasElement) {
+    this.canvas = canvas
+    this.worker = new Worker(new URL("./vision.worker.ts", import.meta.url), { type: "module" })
+    this.worker.onmessage = (event: MessageEvent<VisionResponse>) => this.handleMessage(event.data)
+    this.worker.onerror = (event) => {
+      event.preventDefault()
+      this.fail(new Error(event.message || "Vision worker failed to load"))
+    }
+    this.worker.onmessageerror = () => {
+      // A reply was lost; the frame or init it answered would never settle
+      this.settle(this.seq, null)
+      this.rejectInit(new Error("Vision worker sent a message that could not be read"))
+    }
+  }
+
+  get busy(): boolean {
+    return this.pending !== null
+  }
+
+  get failed(): boolean {
+    return this.failure !== null
+  }
+
+  init(onProgress: (message: string) => void = () => {}): Promise<VisionInitTimings> {
+    this.onProgress = onProgress
+    if (!this.initPromise) {
+      this.initPromise = new Promise((resolve, reject) => {
+        if (this.failure) {
+          reject(this.failure)
+          return
+        }
+        this.initCallbacks = { resolve, reject }
+        // Workers have no localStorage; the stored backend choice travels with init
+        this.post({ type: "init", backend: loadBackendChoice() })
+      })
+    }
+    return this.initPromise
+  }
+
+  async process(video: HTMLVideoElement): Promise<VisionResult | null> {
+    if (this.failure) throw this.failure
+    if (this.pending || video.readyState < 2) return null
+    const seq = ++this.seq
+    const promise = new Promise<VisionResult | null>((resolve) => {
+      this.pending = { seq, resolve }
+    })
+    try {
+      const bitmap = await createImageBitmap(video)
+      this.post({ type: "frame", seq, bitmap }, [bitmap])
+    } catch (err) {
+      this.settle(seq, null)
+      throw err
+    }
+    return promise
+  }
+
+  release(result: VisionResult) {
+    const buffer = result.faces.buffer as ArrayBuffer
+    if (this.failure || buffer.byteLength === 0) return
+    this.post({ type: "release", buffer }, [buffer])
+  }
+
+  configure(options: Partial<VisionPipelineOptions>) {
+    this.post({ type: "configure", options })
+  }
+
+  dispose() {
+    this.post({ type: "dispose" })
+    this.worker.terminate()
+    this.settle(this.seq, null)
+  }
+
+  private post(message: VisionRequest, transfer: Transferable[] = []) {
+    this.worker.postMessage(message, transfer)
+  }
+
+  private fail(error: Error) {
+    if (this.failure) return
+    this.failure = error
+    console.error("Vision worker stopped:", error.message)
+    this.worker.terminate()
+    this.rejectInit(error)
+    this.settle(this.seq, null)
+  }
+
+  private rejectInit(error: Error) {
+    this.initCallbacks?.reject(error)
+    this.initCallbacks = null
+  }
+
+  private settle(seq: number, result: VisionResult | null) {
+    if (this.pending?.seq !== seq) return
+    const { resolve } = this.pending
+    this.pending = null
+    resolve(result)
+  }
+
+  private handleMessage(message: VisionResponse) {
+    switch (message.type) {
+      case "progress":
+        this.onProgress(message.message)
+        break
+      case "ready": {
+        if (!this.initCallbacks) break
+        if (!message.timings.backendReused) saveBackendChoice(message.timings.backend)
+        // Models loaded; the overlay canvas can only hand over control once
+        const offscreen = this.canvas.transferControlToOffscreen()
+        this.post({ type: "canvas", canvas: offscreen }, [offscreen])
+        this.initCallbacks.resolve(message.timings)
+        this.initCallbacks = null
+        break
+      }
+      case "result":
+        this.settle(message.seq, message.result)
+        break
+      case "error":
+        if (message.seq !== undefined) {
+          console.error("Vision worker error:", message.message)
+          this.settle(message.seq, null)
+        } else {
+          this.rejectInit(new Error(message.message))
+        }
+        break
+    }
+  }
+}
+
+export class InlineVisionClient implements VisionClient {
+  readonly mode = "main"
+  readonly failed = false
+  private pipeline = new VisionPipeline()
+  private canvas: HTMLCanvasElement
+  private processing = false
+  private initPromise: Promise<VisionInitTimings> | null = null
+
+  constructor(canvas: HTMLCanvasElement) {
+    this.canvas = canvas
+  }
+
+  get busy(): boolean {
+    return this.processing
+  }
+
+  init(onProgress?: (message: string) => void): Promise<VisionInitTimings> {
+    this.initPromise ??= this.pipeline.load(onProgress, loadBackendChoice()).then((timings) => {
+      if (!timings.backendReused) saveBackendChoice(timings.backend)
+      return timings
+    })
+    return this.initPromise
+  }
+
+  async process(video: HTMLVideoElement): Promise<VisionResult | null> {
+    const ctx = this.canvas.getContext("2d")
+    if (this.processing || !ctx || video.readyState < 2) return null
+    this.processing = true
+    try {
+      const result = await this.pipeline.detect(video)
+      drawOverlay(ctx, video, result)
+      return result
+    } finally {
+      this.processing = false
+    }
+  }
+
+  release(result: VisionResult) {
+    this.pipeline.releaseBuffer(result.faces.buffer as ArrayBuffer)
+  }
+
+  configure(options: Partial<VisionPipelineOptions>) {
+    this.pipeline.configure(options)
+  }
+
+  dispose() {
+    this.pipeline.dispose()
+  }
+}
+
+export function supportsVisionWorker(): boolean {
+  return (
+    typeof Worker !== "undefined" &&
+    typeof OffscreenCanvas !== "undefined" &&
+    typeof createImageBitmap !== "undefined" &&
+    "transferControlToOffscreen" in HTMLCanvasElement.prototype
+  )
+}
+
+/** Worker-backed client where supported; `preferMainThread` forces the inline pipeline. */
+export function createVisionClient(canvas: HTMLCanvasElement, preferMainThread: boolean = false): VisionClient {
+  if (!preferMainThread && supportsVisionWorker()) {
+    return new WorkerVisionClient(canvas)
+  }
+  return new InlineVisionClient(canvas)
+}
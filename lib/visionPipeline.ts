@@ -0,0 +1,492 @@
+import type * as blazeface from "@tensorflow-models/blazeface"
+import type * as cocoSsd from "@tensorflow-models/coco-ssd"
+import type * as posedetection from "@tensorflow-models/pose-detection"
+import type * as tfjs from "@tensorflow/tfjs"
+import { BACKEND_CANDIDATES, deviceFingerprint, selectBackend, type BackendChoice, type BackendName } from "./backendSelector"
+import type { GateFace, GateKeypoint } from "./frameGate"
+import { FACE_MODEL, loadCachedModel, OBJECT_MODEL, POSE_MODEL } from "./modelCache"
+import { countObjects, OBJECT_CLASSES } from "./objectSignals"
+
+// Face (BlazeFace) and pose (MoveNet) inference plus the overlay drawing for
+// the realtime page, plus an optional low-rate COCO-SSD object detector. Runs inside lib/vision.worker.ts, or on the main thread
+// as a fallback / for comparison (see lib/visionClient.ts). Results are packed
+// into flat Float32Arrays so they can be transferred between threads without
+// structured-cloning objects. All three arrays of a tick are views into one
+// ArrayBuffer from a small pool; the client hands it back (`releaseBuffer`)
+// once the tick has been consumed, so steady-state ticks allocate no buffers.
+
+// Per face: x1, y1, x2, y2, probability, then 6 landmarks as x, y pairs
+// (right eye, left eye, nose, mouth, right ear, left ear)
+export const FACE_LANDMARKS = 6
+export const FACE_STRIDE = 5 + FACE_LANDMARKS * 2
+// Per keypoint: x, y, score
+export const KEYPOINT_STRIDE = 3
+
+// MoveNet keypoint order
+export const KEYPOINT_NAMES = [
+  "nose", "left_eye", "right_eye", "left_ear", "right_ear",
+  "left_shoulder", "right_shoulder", "left_elbow", "right_elbow",
+  "left_wrist", "right_wrist", "left_hip", "right_hip",
+  "left_knee", "right_knee", "left_ankle", "right_ankle",
+]
+
+// Most faces BlazeFace returns per tick (its `maxFaces`)
+export const MAX_FACES = 1
+
+// Layout of a pooled result buffer: faces, keypoints, object counts
+const FACE_FLOATS = MAX_FACES * FACE_STRIDE
+const KEYPOINT_FLOATS = KEYPOINT_NAMES.length * KEYPOINT_STRIDE
+const RESULT_BYTES = (FACE_FLOATS + KEYPOINT_FLOATS + OBJECT_CLASSES.length) * Float32Array.BYTES_PER_ELEMENT
+// One frame is in flight at a time, so a couple of spares cover the round trip
+const MAX_SPARE_BUFFERS = 2
+
+/** Faces, keypoints and object counts of one tick, sharing one pooled ArrayBuffer. */
+export interface VisionResult {
+  faces: Float32Array
+  keypoints: Float32Array
+  /** Per-class object counts (OBJECT_CLASSES order); empty on ticks the detector did not run */
+  objects: Float32Array
+  /** Source frame size, for scaling coordinates */
+  width: number
+  height: number
+  inferenceMs: number
+}
+
+/** Per-phase startup times, shown while initializing and logged once ready */
+export interface VisionInitTimings {
+  /** TF.js import plus tf.ready() */
+  tfReadyMs: number
+  /** Backend selection, including the benchmark when it had to run */
+  backendMs: number
+  backend: BackendChoice
+  /** Whether the stored backend choice was reused without benchmarking */
+  backendReused: boolean
+  /** Weight fetch (or IndexedDB read) and model construction */
+  loadMs: number
+  /** First inference on a blank frame, which compiles the WebGL shaders */
+  warmupMs: number
+  /** Models whose weights came from the IndexedDB cache */
+  cachedModels: number
+}
+
+export type VisionSource = ImageBitmap | HTMLVideoElement
+type Context2D = CanvasRenderingContext2D | OffscreenCanvasRenderingContext2D
+
+export interface VisionPipelineOptions {
+  /**
+   * Width the frame is downscaled to before inference (aspect preserved).
+   * Both models resize further internally (BlazeFace 128px, MoveNet 192px).
+   */
+  inputWidth: number
+  /** Run COCO-SSD for phones, extra people, books and screens (loaded on first enable) */
+  objectDetection: boolean
+  /** Object detection runs at most this often; it is much heavier than face/pose */
+  objectIntervalMs: number
+  objectMinScore: number
+}
+
+export const DEFAULT_VISION_OPTIONS: VisionPipelineOptions = {
+  inputWidth: 320,
+  objectDetection: false,
+  objectIntervalMs: 750,
+  objectMinScore: 0.5,
+}
+
+export class VisionPipeline {
+  private options: VisionPipelineOptions
+  private tf: typeof tfjs | null = null
+  private faceModel: blazeface.BlazeFaceModel | null = null
+  private poseModel: posedetection.PoseDetector | null = null
+  private objectModel: cocoSsd.ObjectDetection | null = null
+  private objectModelLoading: Promise<void> | null = null
+  private lastObjectsAt = -Infinity
+  private spareBuffers: ArrayBuffer[] = []
+
+  constructor(options: Partial<VisionPipelineOptions> = {}) {
+    this.options = { ...DEFAULT_VISION_OPTIONS, ...options }
+  }
+
+  get ready(): boolean {
+    return this.faceModel !== null && this.poseModel !== null
+  }
+
+  /** Loads TF.js and the models. `previousBackend` is the stored result of an earlier backend benchmark. */
+  async load(
+    onProgress: (message: string) => void = () => {},
+    previousBackend: BackendChoice | null = null
+  ): Promise<VisionInitTimings> {
+    const timings = { tfReadyMs: 0, backendMs: 0, backendReused: false, loadMs: 0, warmupMs: 0, cachedModels: 0 } as VisionInitTimings
+    const started = performance.now()
+
+    // Start loading TensorFlow.js in parallel with the model packages
+    onProgress("Loading TensorFlow.js...")
+    const tfPromise = import("@tensorflow/tfjs").then(async (tf) => {
+      this.tf = tf
+      await tf.ready()
+      timings.tfReadyMs = performance.now() - started
+      const backendStarted = performance.now()
+      // Fastest of webgl / wasm / cpu on this device, benchmarked once and
+      // then reused (WebGL in a worker needs OffscreenCanvas support)
+      const candidates = (await registerWasmBackend()) ? BACKEND_CANDIDATES : BACKEND_CANDIDATES.filter((b) => b !== "wasm")
+      if (!previousBackend) onProgress("Benchmarking TensorFlow.js backends...")
+      const selection = await selectBackend(tf, deviceFingerprint(), previousBackend, {
+        candidates,
+        onActivate: (backend) => applyBackendFlags(tf, backend),
+      })
+      timings.backend = selection.choice
+      timings.backendReused = selection.reused
+      timings.backendMs = performance.now() - backendStarted
+      return tf
+    })
+
+    const [blazefaceModule, poseDetection] = await Promise.all([
+      import("@tensorflow-models/blazeface"),
+      import("@tensorflow-models/pose-detection"),
+    ])
+    const tf = await tfPromise
+
+    onProgress(`Loading face and pose detection models... (tf.ready ${ms(timings.tfReadyMs)}, ${tf.getBackend()} backend ${timings.backendReused ? "" : "benchmarked "}${ms(timings.backendMs)})`)
+    const loadStarted = performance.now()
+    // Weights come from IndexedDB after the first visit (see lib/modelCache.ts)
+    const [face, pose] = await Promise.all([
+      loadCachedModel(tf, FACE_MODEL, (modelUrl) => blazefaceModule.load({
+        maxFaces: 1, // Limit to 1 face for better performance
+        scoreThreshold: 0.5, // Increase threshold for better performance
+        modelUrl,
+      })),
+      loadCachedModel(tf, POSE_MODEL, (modelUrl) => poseDetection.createDetector(poseDetection.SupportedModels.MoveNet, {
+        modelType: poseDetection.movenet.modelType.SINGLEPOSE_LIGHTNING,
+        enableSmoothing: true,
+        minPoseScore: 0.3,
+        modelUrl,
+      })),
+    ])
+    this.faceModel = face.model
+    this.poseModel = pose.model
+    timings.loadMs = performance.now() - loadStarted
+    timings.cachedModels = Number(face.cached) + Number(pose.cached)
+
+    onProgress(`Warming up models... (load ${ms(timings.loadMs)}, ${timings.cachedModels}/2 cached)`)
+    const warmupStarted = performance.now()
+    await this.warmUp()
+    timings.warmupMs = performance.now() - warmupStarted
+    onProgress(`Models ready (warm-up ${ms(timings.warmupMs)})`)
+
+    if (this.options.objectDetection) await this.loadObjectModel()
+    return timings
+  }
+
+  /**
+   * Runs each loaded model once on a blank frame of the inference size, so
+   * shader compilation and texture allocation happen during initialization
+   * rather than on the first real frame.
+   */
+  private async warmUp() {
+    const blank = this.blankFrame()
+    if (!blank) return
+    const buffer = this.takeBuffer()
+    const views = resultViews(buffer)
+    try {
+      await Promise.all([
+        this.faceModel ? this.estimateFaces(blank, 1, views.faces) : null,
+        this.poseModel ? this.estimateKeypoints(blank, 1, views.keypoints) : null,
+        this.objectModel ? this.estimateObjects(blank, views.objects) : null,
+      ])
+      // The pose smoother would otherwise carry the blank frame into the first real one
+      this.poseModel?.reset()
+    } finally {
+      blank.dispose()
+      this.releaseBuffer(buffer)
+    }
+  }
+
+  /** A 4:3 black frame at the inference width */
+  private blankFrame(): tfjs.Tensor3D | null {
+    if (!this.tf) return null
+    const width = this.options.inputWidth
+    return this.tf.zeros([Math.round((width * 3) / 4), width, 3]) as tfjs.Tensor3D
+  }
+
+  /** Updates options between frames; enabling object detection loads its model in the background. */
+  configure(options: Partial<VisionPipelineOptions>) {
+    this.options = { ...this.options, ...options }
+    if (this.options.objectDetection && this.tf) {
+      this.loadObjectModel().catch((err) => console.error("Object detector failed to load:", err))
+    }
+  }
+
+  private loadObjectModel(): Promise<void> {
+    const tf = this.tf!
+    this.objectModelLoading ??= import("@tensorflow-models/coco-ssd")
+      .then((module) => loadCachedModel(tf, OBJECT_MODEL, (modelUrl) => module.load({ base: "lite_mobilenet_v2", modelUrl })))
+      .then(async ({ model }) => {
+        this.objectModel = model
+        const warmupStarted = performance.now()
+        const blank = this.blankFrame()!
+        const buffer = this.takeBuffer()
+        await this.estimateObjects(blank, resultViews(buffer).objects).finally(() => {
+          blank.dispose()
+          this.releaseBuffer(buffer)
+        })
+        console.log(`Object detector ready (warm-up ${ms(performance.now() - warmupStarted)})`)
+      })
+      .catch((err) => {
+        this.objectModelLoading = null
+        throw err
+      })
+    return this.objectModelLoading
+  }
+
+  /**
+   * Takes back the buffer of a consumed result for a later tick. Its arrays
+   * must not be read afterwards. Detached (transferred) buffers are ignored.
+   */
+  releaseBuffer(buffer: ArrayBuffer) {
+    if (buffer.byteLength !== RESULT_BYTES || this.spareBuffers.length >= MAX_SPARE_BUFFERS) return
+    if (!this.spareBuffers.includes(buffer)) this.spareBuffers.push(buffer)
+  }
+
+  private takeBuffer(): ArrayBuffer {
+    return this.spareBuffers.pop() ?? new ArrayBuffer(RESULT_BYTES)
+  }
+
+  async detect(source: VisionSource): Promise<VisionResult> {
+    const started = performance.now()
+    const width = source instanceof ImageBitmap ? source.width : source.videoWidth
+    const height = source instanceof ImageBitmap ? source.height : source.videoHeight
+    const views = resultViews(this.takeBuffer())
+    const tf = this.tf
+    if (!tf || !this.faceModel || !this.poseModel || !width || !height) {
+      return { faces: views.faces.subarray(0, 0), keypoints: views.keypoints.subarray(0, 0), objects: views.objects.subarray(0, 0), width, height, inferenceMs: 0 }
+    }
+    const runObjects = this.options.objectDetection && this.objectModel !== null &&
+      started - this.lastObjectsAt >= this.options.objectIntervalMs
+    if (runObjects) this.lastObjectsAt = started
+
+    // One pixel read (texture upload) and one downscale per tick, shared by
+    // both models; normalisation stays model specific
+    const scale = Math.min(1, this.options.inputWidth / width)
+    const input = tf.tidy(() => {
+      const pixels = tf.browser.fromPixels(source)
+      if (scale === 1) return pixels
+      return tf.image.resizeBilinear(pixels, [Math.round(height * scale), Math.round(width * scale)])
+    })
+
+    try {
+      // Dispatch all models before awaiting any, so the tick costs
+      // max(face, pose[, objects]) rather than the sum
+      const [faceFloats, keypointFloats, objectFloats] = await Promise.all([
+        this.estimateFaces(input, 1 / scale, views.faces),
+        this.estimateKeypoints(input, 1 / scale, views.keypoints),
+        runObjects ? this.estimateObjects(input, views.objects) : 0,
+      ])
+      return {
+        faces: views.faces.subarray(0, faceFloats),
+        keypoints: views.keypoints.subarray(0, keypointFloats),
+        objects: views.objects.subarray(0, objectFloats),
+        width,
+        height,
+        inferenceMs: performance.now() - started,
+      }
+    } finally {
+      input.dispose()
+    }
+  }
+
+  /** Packs faces into `faces` (FACE_FLOATS long); returns the floats written. */
+  private async estimateFaces(input: tfjs.Tensor3D, scale: number, faces: Float32Array): Promise<number> {
+    try {
+      const predictions = await this.faceModel!.estimateFaces(input, false)
+      const count = Math.min(predictions.length, MAX_FACES)
+      // Reused buffer: clear landmarks a prediction may not fill
+      faces.fill(0, 0, count * FACE_STRIDE)
+      for (let index = 0; index < count; index++) {
+        const prediction = predictions[index]
+        const offset = index * FACE_STRIDE
+        const topLeft = prediction.topLeft as [number, number]
+        const bottomRight = prediction.bottomRight as [number, number]
+        faces[offset] = topLeft[0] * scale
+        faces[offset + 1] = topLeft[1] * scale
+        faces[offset + 2] = bottomRight[0] * scale
+        faces[offset + 3] = bottomRight[1] * scale
+        faces[offset + 4] = prediction.probability as number
+        const landmarks = (prediction.landmarks as number[][] | undefined) ?? []
+        for (let i = 0; i < FACE_LANDMARKS && i < landmarks.length; i++) {
+          faces[offset + 5 + i * 2] = landmarks[i][0] * scale
+          faces[offset + 6 + i * 2] = landmarks[i][1] * scale
+        }
+      }
+      return count * FACE_STRIDE
+    } catch (err) {
+      console.error("Face detection error:", err)
+      return 0
+    }
+  }
+
+  /** Packs the first pose into `keypoints` (KEYPOINT_FLOATS long); returns the floats written. */
+  private async estimateKeypoints(input: tfjs.Tensor3D, scale: number, keypoints: Float32Array): Promise<number> {
+    try {
+      const poses = await this.poseModel!.estimatePoses(input)
+      if (poses.length === 0) return 0
+      const count = Math.min(poses[0].keypoints.length, KEYPOINT_NAMES.length)
+      for (let index = 0; index < count; index++) {
+        const keypoint = poses[0].keypoints[index]
+        const offset = index * KEYPOINT_STRIDE
+        keypoints[offset] = keypoint.x * scale
+        keypoints[offset + 1] = keypoint.y * scale
+        keypoints[offset + 2] = keypoint.score ?? 0
+      }
+      return count * KEYPOINT_STRIDE
+    } catch (err) {
+      console.error("Pose detection error:", err)
+      return 0
+    }
+  }
+
+  /** Writes per-class counts into `objects`; returns the floats written. */
+  private async estimateObjects(input: tfjs.Tensor3D, objects: Float32Array): Promise<number> {
+    try {
+      const detections = await this.objectModel!.detect(input, 20, this.options.objectMinScore)
+      countObjects(detections, this.options.objectMinScore, objects)
+      return objects.length
+    } catch (err) {
+      console.error("Object detection error:", err)
+      return 0
+    }
+  }
+
+  dispose() {
+    this.faceModel?.dispose()
+    this.poseModel?.dispose()
+    this.objectModel?.dispose()
+    this.faceModel = null
+    this.poseModel = null
+    this.objectModel = null
+    this.objectModelLoading = null
+  }
+}
+
+/** Full-length faces / keypoints / objects views over a pooled result buffer. */
+function resultViews(buffer: ArrayBuffer) {
+  return {
+    faces: new Float32Array(buffer, 0, FACE_FLOATS),
+    keypoints: new Float32Array(buffer, FACE_FLOATS * Float32Array.BYTES_PER_ELEMENT, KEYPOINT_FLOATS),
+    objects: new Float32Array(buffer, (FACE_FLOATS + KEYPOINT_FLOATS) * Float32Array.BYTES_PER_ELEMENT, OBJECT_CLASSES.length),
+  }
+}
+
+// Served from public/tfjs-wasm/; absolute so it resolves the same from the worker
+const WASM_PATH = "/tfjs-wasm/"
+
+/** Registers the WASM backend (SIMD/threads are picked up automatically where supported). */
+async function registerWasmBackend(): Promise<boolean> {
+  try {
+    const wasm = await import("@tensorflow/tfjs-backend-wasm")
+    // The .wasm binaries are not bundled by Next.js; scripts/copy-tfjs-wasm.js
+    // copies the installed build into public/ before dev and build
+    wasm.setWasmPaths(WASM_PATH)
+    return true
+  } catch (err) {
+    console.warn("WASM backend unavailable:", err)
+    return false
+  }
+}
+
+function applyBackendFlags(tf: typeof tfjs, backend: BackendName) {
+  if (backend !== "webgl") return
+  tf.env().set("WEBGL_FORCE_F16_TEXTURES", true) // Use F16 textures for better performance
+  tf.env().set("WEBGL_PACK", true) // Enable texture packing
+  tf.env().set("WEBGL_CHECK_NUMERICAL_PROBLEMS", false) // Disable numerical checks in production
+}
+
+function ms(value: number): string {
+  return `${Math.round(value)} ms`
+}
+
+/** Draws the frame letterboxed into the canvas, then the face boxes and keypoints. */
+export function drawOverlay(ctx: Context2D, source: CanvasImageSource, result: VisionResult) {
+  const { width: canvasWidth, height: canvasHeight } = ctx.canvas
+  ctx.clearRect(0, 0, canvasWidth, canvasHeight)
+
+  const videoAspect = result.width / result.height
+  const canvasAspect = canvasWidth / canvasHeight
+  let drawWidth = canvasWidth
+  let drawHeight = canvasHeight
+  let offsetX = 0
+  let offsetY = 0
+  if (videoAspect > canvasAspect) {
+    drawHeight = canvasWidth / videoAspect
+    offsetY = (canvasHeight - drawHeight) / 2
+  } else {
+    drawWidth = canvasHeight * videoAspect
+    offsetX = (canvasWidth - drawWidth) / 2
+  }
+  ctx.drawImage(source, offsetX, offsetY, drawWidth, drawHeight)
+
+  // Scale for drawing predictions
+  const scaleX = canvasWidth / result.width
+  const scaleY = canvasHeight / result.height
+
+  const { faces, keypoints } = result
+  for (let offset = 0; offset < faces.length; offset += FACE_STRIDE) {
+    const x = faces[offset] * scaleX
+    const y = faces[offset + 1] * scaleY
+
+    // Draw bounding box
+    ctx.strokeStyle = "rgba(0, 255, 0, 0.8)"
+    ctx.lineWidth = 2
+    ctx.strokeRect(x, y, (faces[offset + 2] - faces[offset]) * scaleX, (faces[offset + 3] - faces[offset + 1]) * scaleX)
+
+    // Draw confidence
+    ctx.fillStyle = "white"
+    ctx.font = "16px Arial"
+    ctx.fillText(`${Math.round(faces[offset + 4] * 100)}%`, x, y - 5)
+  }
+
+  for (let index = 0; index * KEYPOINT_STRIDE < keypoints.length; index++) {
+    const offset = index * KEYPOINT_STRIDE
+    const score = keypoints[offset + 2]
+    if (score <= 0.3) continue
+    const x = keypoints[offset] * scaleX
+    const y = keypoints[offset + 1] * scaleY
+
+    // Draw keypoint
+    ctx.beginPath()
+    ctx.arc(x, y, 4, 0, 2 * Math.PI)
+    ctx.fillStyle = "rgba(255, 0, 0, 0.8)"
+    ctx.fill()
+
+    // Outer circle
+    ctx.beginPath()
+    ctx.arc(x, y, 6, 0, 2 * Math.PI)
+    ctx.strokeStyle = "white"
+    ctx.lineWidth = 1.5
+    ctx.stroke()
+
+    // Label
+    if (score > 0.5 && KEYPOINT_NAMES[index]) {
+      ctx.fillStyle = "white"
+      ctx.font = "12px Arial"
+      ctx.fillText(KEYPOINT_NAMES[index], x + 8, y)
+    }
+  }
+}
+
+export function decodeFaces(faces: Float32Array): GateFace[] {
+  const decoded: GateFace[] = []
+  for (let offset = 0; offset < faces.length; offset += FACE_STRIDE) {
+    decoded.push({
+      topLeft: [faces[offset], faces[offset + 1]],
+      bottomRight: [faces[offset + 2], faces[offset + 3]],
+    })
+  }
+  return decoded
+}
+
+export function decodeKeypoints(keypoints: Float32Array): GateKeypoint[] {
+  const decoded: GateKeypoint[] = []
+  for (let offset = 0; offset < keypoints.length; offset += KEYPOINT_STRIDE) {
+    decoded.push({ x: keypoints[offset], y: keypoints[offset + 1], score: keypoints[offset + 2] })
+  }
+  return decoded
+}
@@ -0,0 +1,95 @@
+import { useCallback, useSyncExternalStore } from "react"
+import type { GateFace, GateKeypoint } from "./frameGate"
+import { classifyGaze, estimateHeadPose, type GazeDirection } from "./gazeEstimator"
+import { PoseHistory } from "./poseHistory"
+import { decodeFaces, decodeKeypoints, KEYPOINT_STRIDE, type VisionResult } from "./visionPipeline"
+
+// External store for face/pose results. The detection loop publishes here at
+// ~10 FPS instead of calling setState, so the page itself does not re-render
+// per tick; components that display detection data subscribe with a selector
+// and re-render only when the selected value changes. Raw results go into a
+// typed-array `history` (see lib/poseHistory.ts); the snapshot only carries
+// summary numbers, and non-React readers (the analysis gate) decode the
+// latest record on demand.
+
+// Keypoints below this score are not drawn or counted
+const VISIBLE_KEYPOINT_SCORE = 0.3
+
+export interface VisionSnapshot {
+  faceCount: number
+  visibleKeypoints: number
+  /** Coarse head direction of the newest frame, see lib/gazeEstimator.ts */
+  gaze: GazeDirection
+  inferenceMs: number
+  /** Frames processed since the store was created/reset */
+  frames: number
+  updatedAt: number
+}
+
+const EMPTY_SNAPSHOT: VisionSnapshot = { faceCount: 0, visibleKeypoints: 0, gaze: "none", inferenceMs: 0, frames: 0, updatedAt: 0 }
+
+export class VisionStore {
+  readonly history: PoseHistory
+  private snapshot = EMPTY_SNAPSHOT
+  private listeners = new Set<() => void>()
+
+  constructor(history: PoseHistory = new PoseHistory()) {
+    this.history = history
+  }
+
+  publish(result: VisionResult, at: number = Date.now()) {
+    this.history.push(result, at)
+    let visibleKeypoints = 0
+    for (let offset = 2; offset < result.keypoints.length; offset += KEYPOINT_STRIDE) {
+      if (result.keypoints[offset] > VISIBLE_KEYPOINT_SCORE) visibleKeypoints++
+    }
+    const faceCount = this.history.faceCount(this.history.length - 1)
+    this.snapshot = {
+      faceCount,
+      visibleKeypoints,
+      gaze: classifyGaze(faceCount > 0 ? estimateHeadPose(result.faces) : null),
+      inferenceMs: result.inferenceMs,
+      frames: this.snapshot.frames + 1,
+      updatedAt: at,
+    }
+    this.listeners.forEach((listener) => listener())
+  }
+
+  reset() {
+    this.history.clear()
+    this.snapshot = EMPTY_SNAPSHOT
+    this.listeners.forEach((listener) => listener())
+  }
+
+  /** Faces from the newest record (the pipeline keeps at most one). */
+  latestFaces(): GateFace[] {
+    const index = this.history.length - 1
+    if (index < 0 || this.history.faceCount(index) === 0) return []
+    return decodeFaces(this.history.faceView(index))
+  }
+
+  /** Keypoints from the newest record that had a pose, so a dropped pose keeps the last one. */
+  latestKeypoints(): GateKeypoint[] {
+    const index = this.history.latestPoseIndex()
+    return index < 0 ? [] : decodeKeypoints(this.history.keypointView(index))
+  }
+
+  getSnapshot = (): VisionSnapshot => this.snapshot
+
+  subscribe = (listener: () => void): (() => void) => {
+    this.listeners.add(listener)
+    return () => {
+      this.listeners.delete(listener)
+    }
+  }
+}
+
+/**
+ * Subscribes a component to one value derived from the store. Return
+ * primitives (or objects taken as-is from the snapshot) so unchanged values
+ * compare equal and skip the re-render.
+ */
+export function useVisionSelector<T>(store: VisionStore, selector: (snapshot: VisionSnapshot) => T): T {
+  const getSelection = useCallback(() => selector(store.getSnapshot()), [store, selector])
+  return useSyncExternalStore(store.subscribe, getSelection, getSelection)
+}
@@ -0,0 +1,25 @@
+import { defineConfig, devices } from "@playwright/test";
+
+// Browser tests against the dev server. Chromium's fake camera and microphone
+// stand in for a webcam, and the stub model backend answers analysis requests,
+// so no Gemini key is needed.
+export default defineConfig({
+  testDir: "./e2e",
+  // Model download and warm-up on a cold cache
+  timeout: 3 * 60000,
+  use: {
+    ...devices["Desktop Chrome"],
+    baseURL: "http://localhost:3000",
+    permissions: ["camera", "microphone"],
+    launchOptions: {
+      args: ["--use-fake-device-for-media-stream", "--use-fake-ui-for-media-stream"],
+    },
+  },
+  webServer: {
+    command: "npm run dev",
+    url: "http://localhost:3000",
+    reuseExistingServer: true,
+    timeout: 2 * 60000,
+    env: { DETECTION_BACKEND: "stub" },
+  },
+});
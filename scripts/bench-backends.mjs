@@ -0,0 +1,51 @@
+#!/usr/bin/env node
+
+/**
+ * TF.js Backend Selection Benchmark
+ *
+ * Runs the startup backend benchmark from lib/backendSelector.ts headlessly
+ * (WASM and CPU; WebGL needs a browser), prints the per-backend timings and
+ * the pick, then checks that a stored choice is reused without benchmarking
+ * again and that a choice from another device is not.
+ *
+ * Usage:
+ *   npm run bench:backends -- [--backends=wasm,cpu] [--runs=5] [--size=192]
+ */
+
+import * as tf from '@tensorflow/tfjs';
+import '@tensorflow/tfjs-backend-wasm';
+import { selectBackend } from '@/lib/backendSelector';
+
+const arg = (name, fallback) => {
+  const match = process.argv.find(a => a.startsWith(`--${name}=`));
+  return match ? match.split('=')[1] : fallback;
+};
+const candidates = arg('backends', 'wasm,cpu').split(',');
+const runs = Number(arg('runs', 5));
+const inputSize = Number(arg('size', 192));
+const options = { candidates, runs, inputSize };
+const fingerprint = `node ${process.version} ${process.platform}/${process.arch}`;
+
+const started = performance.now();
+const first = await selectBackend(tf, fingerprint, null, options);
+const benchmarkMs = performance.now() - started;
+
+console.table(first.choice.results.map(result => ({
+  backend: result.backend,
+  'median ms': result.medianMs === null ? '-' : result.medianMs.toFixed(2),
+  error: result.error ?? '',
+})));
+console.log(`Selected ${first.choice.backend} (active: ${tf.getBackend()}) after ${benchmarkMs.toFixed(0)} ms`);
+
+// Persisted choice: same device reuses it, another device re-benchmarks
+const stored = JSON.parse(JSON.stringify(first.choice));
+const reuseStarted = performance.now();
+const second = await selectBackend(tf, fingerprint, stored, options);
+const reuseMs = performance.now() - reuseStarted;
+const other = await selectBackend(tf, 'another device', stored, { ...options, runs: 1 });
+
+console.log(`Stored choice reused: ${second.reused} (${reuseMs.toFixed(0)} ms); other device re-benchmarked: ${!other.reused}`);
+if (!second.reused || other.reused || tf.getBackend() !== other.choice.backend) {
+  console.error('Backend selection did not behave as expected');
+  process.exit(1);
+}
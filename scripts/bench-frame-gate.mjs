@@ -0,0 +1,143 @@
+#!/usr/bin/env node
+
+/**
+ * Frame Gate Replay Benchmark
+ *
+ * Replays a synthetic interview trace (pose keypoints, face boxes and frame
+ * hashes at 10 FPS, with injected suspicious events) through lib/frameGate.ts
+ * and compares it with the fixed-interval schedule for every analysis mode.
+ *
+ * An event counts as "seen" by a schedule if a remote call happens while it is
+ * in progress; "missed" events are those the fixed schedule saw but the gate
+ * did not. The "+ objects" rows add the on-device object detector's confirmed
+ * flags (lib/objectSignals.ts): phones and second people show up after the
+ * detector's confirmation delay.
+ *
+ * Usage:
+ *   npm run bench:gate -- [--minutes=20] [--seed=42]
+ */
+
+import { FrameGate } from '@/lib/frameGate';
+
+const arg = (name, fallback) => {
+  const match = process.argv.find(a => a.startsWith(`--${name}=`));
+  return match ? Number(match.split('=')[1]) : fallback;
+};
+const MINUTES = arg('minutes', 20);
+const SEED = arg('seed', 42);
+
+const FRAME_WIDTH = 640;
+const SAMPLE_MS = 100;
+// Two COCO-SSD samples at ~1.3 FPS before a flag is confirmed
+const OBJECT_CONFIRM_MS = 1500;
+const MODES = {
+  demo: { intervalMs: 500, maxStalenessMs: 5000 },
+  normal: { intervalMs: 10000, maxStalenessMs: 30000 },
+  conservative: { intervalMs: 20000, maxStalenessMs: 60000 },
+};
+
+// Event types and how they show up in the local signals. `eye-scan` moves
+// only the pupils, which none of the gate inputs can see.
+const EVENT_TYPES = {
+  'head-turn': { faceShift: [45, 0], keypointShift: 35, hashBits: 4 },
+  'look-down': { faceShift: [0, 35], keypointShift: 25, hashBits: 3 },
+  'second-person': { extraFace: true, keypointShift: 0, hashBits: 12, objectFlag: 'extra-person' },
+  'phone': { faceShift: [0, 0], keypointShift: 60, hashBits: 14, objectFlag: 'phone' },
+  'eye-scan': { faceShift: [0, 0], keypointShift: 0, hashBits: 0 },
+};
+
+function mulberry32(seed) {
+  return () => {
+    seed |= 0;
+    seed = (seed + 0x6d2b79f5) | 0;
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+const random = mulberry32(SEED);
+const gaussian = () => Math.sqrt(-2 * Math.log(random() || 1e-9)) * Math.cos(2 * Math.PI * random());
+
+function flipBits(hash, bits) {
+  const out = [hash[0], hash[1]];
+  for (let i = 0; i < bits; i++) {
+    const bit = Math.floor(random() * 64);
+    out[bit < 32 ? 0 : 1] ^= 1 << (bit % 32);
+  }
+  return [out[0] >>> 0, out[1] >>> 0];
+}
+
+function generateEvents(durationMs) {
+  const events = [];
+  const types = Object.keys(EVENT_TYPES);
+  let t = 5000;
+  while (t < durationMs) {
+    t += 20000 + random() * 50000;
+    const length = 2000 + random() * 6000;
+    events.push({ type: types[Math.floor(random() * types.length)], start: t, end: t + length });
+    t += length;
+  }
+  return events.filter(event => event.end < durationMs);
+}
+
+const BASE_FACE = { topLeft: [260, 110], bottomRight: [380, 250] };
+const BASE_KEYPOINTS = Array.from({ length: 17 }, (_, i) => ({ x: 200 + (i % 5) * 60, y: 100 + Math.floor(i / 5) * 60 }));
+const BASE_HASH = [0x9f3c10a5, 0x44e1c70b];
+
+function sampleAt(t, events) {
+  const active = events.find(event => t >= event.start && t <= event.end);
+  const effect = active ? EVENT_TYPES[active.type] : null;
+  const shift = effect?.faceShift ?? [0, 0];
+  const jitter = () => gaussian() * 2;
+
+  const face = {
+    topLeft: [BASE_FACE.topLeft[0] + shift[0] + jitter(), BASE_FACE.topLeft[1] + shift[1] + jitter()],
+    bottomRight: [BASE_FACE.bottomRight[0] + shift[0] + jitter(), BASE_FACE.bottomRight[1] + shift[1] + jitter()],
+  };
+  const faces = effect?.extraFace ? [face, { topLeft: [500, 80], bottomRight: [600, 200] }] : [face];
+  const keypointShift = effect?.keypointShift ?? 0;
+  const keypoints = BASE_KEYPOINTS.map(kp => ({ x: kp.x + keypointShift + jitter(), y: kp.y + jitter(), score: 0.9 }));
+  const frameHash = flipBits(BASE_HASH, Math.floor(random() * 3) + (effect?.hashBits ?? 0));
+  const objectFlags = effect?.objectFlag && t - active.start >= OBJECT_CONFIRM_MS ? [effect.objectFlag] : [];
+
+  return { keypoints, faces, frameHash, frameWidth: FRAME_WIDTH, objectFlags };
+}
+
+function replay(mode, events, samples, withObjects) {
+  const { intervalMs, maxStalenessMs } = MODES[mode];
+  const gate = new FrameGate({ maxStalenessMs });
+  const fixedCalls = [];
+  const gatedCalls = [];
+
+  for (let t = 0; t < samples.length * SAMPLE_MS; t += intervalMs) {
+    const traced = samples[Math.floor(t / SAMPLE_MS)];
+    const sample = withObjects ? traced : { ...traced, objectFlags: null };
+    fixedCalls.push(t);
+    if (gate.evaluate(sample, t).escalate) {
+      gate.commit(sample, t);
+      gatedCalls.push(t);
+    }
+  }
+
+  const seenBy = (calls, event) => calls.some(t => t >= event.start && t <= event.end);
+  const fixedSeen = events.filter(event => seenBy(fixedCalls, event));
+  const missed = fixedSeen.filter(event => !seenBy(gatedCalls, event));
+
+  return {
+    mode: withObjects ? `${mode} + objects` : mode,
+    'fixed calls': fixedCalls.length,
+    'gated calls': gatedCalls.length,
+    'calls avoided': `${((1 - gatedCalls.length / fixedCalls.length) * 100).toFixed(1)}%`,
+    'events seen (fixed)': fixedSeen.length,
+    'events missed (gated)': missed.length,
+    'missed types': [...new Set(missed.map(event => event.type))].join(', ') || '-',
+  };
+}
+
+const durationMs = MINUTES * 60 * 1000;
+const events = generateEvents(durationMs);
+const samples = Array.from({ length: durationMs / SAMPLE_MS }, (_, i) => sampleAt(i * SAMPLE_MS, events));
+
+console.log(`Replaying ${MINUTES} min synthetic interview with ${events.length} events (seed ${SEED})\n`);
+console.table(Object.keys(MODES).flatMap(mode => [replay(mode, events, samples, false), replay(mode, events, samples, true)]));
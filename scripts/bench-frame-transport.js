@@ -0,0 +1,133 @@
+#!/usr/bin/env node
+
+/**
+ * Frame Transport Benchmark
+ *
+ * Compares the legacy data-URL path (toDataURL -> server action -> split(','))
+ * with the binary path (toBlob -> multipart POST /api/detect/stream -> Buffer) for
+ * bytes on the wire and server CPU time per frame.
+ *
+ * Usage:
+ *   node scripts/bench-frame-transport.js [framesDir] [--frames=200]
+ *
+ * If framesDir contains .jpg/.jpeg files they are used as-is, otherwise
+ * synthetic frames with typical 640x360 q0.8 JPEG sizes are generated.
+ */
+
+const fs = require('fs');
+const path = require('path');
+const crypto = require('crypto');
+
+const args = process.argv.slice(2);
+const framesDir = args.find(arg => !arg.startsWith('--'));
+const frameCountArg = args.find(arg => arg.startsWith('--frames='));
+const FRAME_COUNT = frameCountArg ? parseInt(frameCountArg.split('=')[1], 10) : 200;
+const TRANSCRIPT = 'Let me think about that question for a second before I answer it.';
+
+function loadFrames() {
+  if (framesDir && fs.existsSync(framesDir)) {
+    const files = fs.readdirSync(framesDir)
+      .filter(file => /\.jpe?g$/i.test(file))
+      .sort();
+    if (files.length > 0) {
+      console.log(`Using ${files.length} frames from ${framesDir}`);
+      return files.map(file => fs.readFileSync(path.join(framesDir, file)));
+    }
+  }
+
+  console.log(`Using ${FRAME_COUNT} synthetic frames (30-60 KB)`);
+  return Array.from({ length: FRAME_COUNT }, () => {
+    const size = 30000 + Math.floor(Math.random() * 30000);
+    const bytes = crypto.randomBytes(size);
+    bytes[0] = 0xff;
+    bytes[1] = 0xd8;
+    return bytes;
+  });
+}
+
+function cpuMicros(fn) {
+  const start = process.cpuUsage();
+  return fn().then(() => {
+    const usage = process.cpuUsage(start);
+    return usage.user + usage.system;
+  });
+}
+
+// Legacy path: the client sends the data URL string as a server action
+// argument (JSON encoded) and the server splits off the base64 payload.
+async function legacyFrame(jpeg) {
+  const dataUrl = 'data:image/jpeg;base64,' + jpeg.toString('base64');
+  const body = JSON.stringify([dataUrl, TRANSCRIPT]);
+  const wireBytes = Buffer.byteLength(body);
+
+  const serverCpu = await cpuMicros(async () => {
+    const [image] = JSON.parse(body);
+    const base64Data = image.split(',')[1];
+    if (!base64Data) throw new Error('Invalid image data format');
+  });
+
+  return { wireBytes, serverCpu };
+}
+
+// Binary path: raw JPEG bytes in a multipart body, decoded by the route
+// handler and base64-encoded once for the Gemini inlineData part.
+async function binaryFrame(jpeg) {
+  const form = new FormData();
+  form.append('frame', new Blob([jpeg], { type: 'image/jpeg' }), 'frame.jpg');
+  form.append('transcript', TRANSCRIPT);
+  const encoded = new Response(form);
+  const contentType = encoded.headers.get('content-type');
+  const body = Buffer.from(await encoded.arrayBuffer());
+  const wireBytes = body.length;
+
+  const serverCpu = await cpuMicros(async () => {
+    const request = new Request('http://localhost/api/detect/stream', {
+      method: 'POST',
+      headers: { 'content-type': contentType },
+      body,
+    });
+    const formData = await request.formData();
+    const frame = formData.get('frame');
+    Buffer.from(await frame.arrayBuffer()).toString('base64');
+  });
+
+  return { wireBytes, serverCpu };
+}
+
+function summarize(label, results) {
+  const totalBytes = results.reduce((sum, r) => sum + r.wireBytes, 0);
+  const totalCpu = results.reduce((sum, r) => sum + r.serverCpu, 0);
+  return {
+    path: label,
+    'avg bytes/frame': Math.round(totalBytes / results.length),
+    'avg server CPU (us)': Math.round(totalCpu / results.length),
+  };
+}
+
+async function main() {
+  const frames = loadFrames();
+
+  // Warm up both paths so JIT effects don't skew the first run
+  for (const frame of frames.slice(0, 10)) {
+    await legacyFrame(frame);
+    await binaryFrame(frame);
+  }
+
+  const legacy = [];
+  const binary = [];
+  for (const frame of frames) {
+    legacy.push(await legacyFrame(frame));
+    binary.push(await binaryFrame(frame));
+  }
+
+  const rows = [summarize('data URL (legacy)', legacy), summarize('binary multipart', binary)];
+  console.table(rows);
+
+  const saved = 1 - rows[1]['avg bytes/frame'] / rows[0]['avg bytes/frame'];
+  console.log(`\nBytes on wire reduced by ${(saved * 100).toFixed(1)}%`);
+}
+
+main().catch(error => {
+  console.error('❌ Benchmark failed:', error);
+  process.exit(1);
+});
@@ -0,0 +1,175 @@
+#!/usr/bin/env node
+
+/**
+ * Face-Crop Mosaic Benchmark
+ *
+ * Compares the two single-frame payloads the realtime page can send: the full
+ * frame downscaled to 640x360, and the face-crop mosaic from lib/roiMosaic.ts
+ * (face at native resolution plus context and desk tiles, 576x320). Both are
+ * rendered from the same native-resolution frames with ffmpeg at the same
+ * JPEG quality and compared on bytes, encode time, estimated upload time and
+ * how many pixels the face gets. With --endpoint the frames are also posted
+ * to a running /api/detect/stream and the round trip is timed.
+ *
+ * Inputs (one of):
+ *   --video=<file>        sampled at 1 frame/s at its native resolution
+ *   --frames=<dir>        directory of native-resolution JPEG frames
+ *
+ * The face box is fixed for the whole run (pass the one BlazeFace reports
+ * for the clip, in source pixels); by default a centred head-and-shoulders
+ * framing is assumed.
+ *
+ * Usage:
+ *   npm run bench:roi -- --video=interview.mp4 [--face=x1,y1,x2,y2]
+ *     [--uplink=5] [--endpoint=http://localhost:3000/api/detect/stream] [--requests=5]
+ */
+
+import { spawnSync } from 'node:child_process';
+import fs from 'node:fs';
+import os from 'node:os';
+import path from 'node:path';
+import { MOSAIC_LAYOUT, deskCropRect, faceCropRect, fitRect } from '@/lib/roiMosaic';
+
+const arg = (name, fallback) => {
+  const match = process.argv.find(a => a.startsWith(`--${name}=`));
+  return match ? match.slice(name.length + 3) : fallback;
+};
+const UPLINK_MBPS = Number(arg('uplink', 5));
+const ENDPOINT = arg('endpoint', null);
+const REQUESTS = Number(arg('requests', 5));
+// Same quality as the page's encodeCanvasJpeg(canvas, 0.8)
+const JPEG_QSCALE = '4';
+const FULL_WIDTH = 640;
+const FULL_HEIGHT = 360;
+
+function ffmpeg(ffmpegArgs) {
+  const result = spawnSync('ffmpeg', ['-v', 'error', ...ffmpegArgs], { maxBuffer: 1 << 30 });
+  if (result.error || result.status !== 0) {
+    throw new Error(`ffmpeg failed: ${result.error?.message ?? result.stderr.toString()}`);
+  }
+  return result.stdout;
+}
+
+function frameSize(file) {
+  const result = spawnSync('ffprobe', ['-v', 'error', '-select_streams', 'v:0',
+    '-show_entries', 'stream=width,height', '-of', 'csv=p=0', file]);
+  if (result.error || result.status !== 0) throw new Error(`ffprobe failed on ${file}`);
+  const [width, height] = result.stdout.toString().trim().split(',').map(Number);
+  return { width, height };
+}
+
+const jpegs = dir => fs.readdirSync(dir).filter(file => /\.jpe?g$/i.test(file)).sort();
+
+function sourceFrames(tmp) {
+  const video = arg('video', null);
+  const framesDir = arg('frames', null);
+  if (video) {
+    const dir = path.join(tmp, 'source');
+    fs.mkdirSync(dir);
+    ffmpeg(['-i', video, '-vf', 'fps=1', '-q:v', '2', path.join(dir, '%06d.jpg')]);
+    return dir;
+  }
+  if (framesDir) return framesDir;
+  throw new Error('Pass --video=<file> or --frames=<dir> (native-resolution frames)');
+}
+
+const even = value => Math.max(2, Math.floor(value / 2) * 2);
+const crop = rect => `crop=${even(rect.width)}:${even(rect.height)}:${Math.round(rect.x)}:${Math.round(rect.y)}`;
+
+// The mosaic as an ffmpeg filter graph, using the page's geometry
+function mosaicFilter(face, width, height) {
+  const { face: faceTile, desk: deskTile } = MOSAIC_LAYOUT;
+  const context = fitRect(width, height, MOSAIC_LAYOUT.context);
+  return [
+    '[0:v]split=3[a][b][c]',
+    `[a]${crop(faceCropRect(face, width, height))},scale=${faceTile.width}:${faceTile.height}[face]`,
+    `[b]scale=${Math.round(context.width)}:${Math.round(context.height)}[context]`,
+    `[c]${crop(deskCropRect(face, width, height))},scale=${deskTile.width}:${deskTile.height}[desk]`,
+    `color=black:s=${MOSAIC_LAYOUT.width}x${MOSAIC_LAYOUT.height}[bg]`,
+    `[bg][face]overlay=${faceTile.x}:${faceTile.y}:shortest=1[m1]`,
+    `[m1][context]overlay=${Math.round(context.x)}:${Math.round(context.y)}[m2]`,
+    `[m2][desk]overlay=${deskTile.x}:${deskTile.y}`,
+  ].join(';');
+}
+
+// Renders every source frame with `filterArgs`; returns the JPEGs and ms per frame
+function render(sourceDir, outDir, filterArgs) {
+  fs.mkdirSync(outDir);
+  const started = performance.now();
+  ffmpeg(['-pattern_type', 'glob', '-i', path.join(sourceDir, '*.jpg'), ...filterArgs,
+    '-q:v', JPEG_QSCALE, path.join(outDir, '%06d.jpg')]);
+  const elapsed = performance.now() - started;
+  const files = jpegs(outDir).map(file => fs.readFileSync(path.join(outDir, file)));
+  return { files, msPerFrame: elapsed / files.length };
+}
+
+const median = values => [...values].sort((a, b) => a - b)[Math.floor(values.length / 2)];
+
+async function roundTrip(jpeg, layout) {
+  const times = [];
+  for (let i = 0; i < REQUESTS; i++) {
+    const body = new FormData();
+    body.append('frame', new Blob([jpeg], { type: 'image/jpeg' }), 'frame-0.jpg');
+    body.append('offsetMs', '0');
+    if (layout !== 'full') body.append('layout', layout);
+    const started = performance.now();
+    const response = await fetch(ENDPOINT, { method: 'POST', body });
+    // Errors after the stream has started arrive as an NDJSON error line
+    const text = await response.text();
+    if (!response.ok || text.includes('"type":"error"')) throw new Error(`${ENDPOINT} answered ${response.status}: ${text.slice(0, 200)}`);
+    times.push(performance.now() - started);
+  }
+  return median(times);
+}
+
+const tmp = fs.mkdtempSync(path.join(os.tmpdir(), 'bench-roi-'));
+try {
+  const sourceDir = sourceFrames(tmp);
+  const sources = jpegs(sourceDir);
+  if (sources.length === 0) throw new Error(`No JPEG frames in ${sourceDir}`);
+  const { width, height } = frameSize(path.join(sourceDir, sources[0]));
+
+  const faceArg = arg('face', null);
+  const [x1, y1, x2, y2] = faceArg
+    ? faceArg.split(',').map(Number)
+    : [width * 0.41, height * 0.2, width * 0.59, height * 0.52];
+  const face = { topLeft: [x1, y1], bottomRight: [x2, y2] };
+  console.log(`${sources.length} frames at ${width}x${height}, face box ${[x1, y1, x2, y2].map(Math.round).join(',')}`);
+
+  const full = render(sourceDir, path.join(tmp, 'full'), ['-vf', `scale=${FULL_WIDTH}:${FULL_HEIGHT}`]);
+  const mosaic = render(sourceDir, path.join(tmp, 'mosaic'), ['-filter_complex', mosaicFilter(face, width, height)]);
+
+  // Pixels covering the face box in each payload; upscaling adds none
+  const faceArea = (x2 - x1) * (y2 - y1);
+  const faceCrop = faceCropRect(face, width, height);
+  const fullFacePx = Math.min(faceArea, faceArea * (FULL_WIDTH / width) * (FULL_HEIGHT / height));
+  const mosaicFacePx = Math.min(faceArea, faceArea * (MOSAIC_LAYOUT.face.width / faceCrop.width) * (MOSAIC_LAYOUT.face.height / faceCrop.height));
+
+  const rows = [
+    ['full frame', `${FULL_WIDTH}x${FULL_HEIGHT}`, full, fullFacePx, 'full'],
+    ['face mosaic', `${MOSAIC_LAYOUT.width}x${MOSAIC_LAYOUT.height}`, mosaic, mosaicFacePx, 'mosaic'],
+  ];
+  const table = [];
+  for (const [label, size, result, facePx, layout] of rows) {
+    const avgBytes = result.files.reduce((sum, file) => sum + file.length, 0) / result.files.length;
+    const row = {
+      payload: label,
+      size,
+      'avg KB': (avgBytes / 1024).toFixed(1),
+      'encode ms (ffmpeg)': result.msPerFrame.toFixed(1),
+      [`upload ms @${UPLINK_MBPS} Mbps`]: ((avgBytes * 8) / (UPLINK_MBPS * 1000)).toFixed(0),
+      'face px': Math.round(facePx),
+    };
+    if (ENDPOINT) {
+      row['round trip ms (median)'] = (await roundTrip(result.files[Math.floor(result.files.length / 2)], layout)).toFixed(0);
+    }
+    table.push(row);
+  }
+  console.table(table);
+  console.log(`Face resolution gain: ${(mosaicFacePx / fullFacePx).toFixed(1)}x the pixels of the downscaled frame`);
+} catch (error) {
+  console.error(error.message);
+  process.exitCode = 1;
+} finally {
+  fs.rmSync(tmp, { recursive: true, force: true });
+}
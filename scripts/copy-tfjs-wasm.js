@@ -0,0 +1,42 @@
+#!/usr/bin/env node
+
+/**
+ * Copy TF.js WASM binaries
+ *
+ * Copies the .wasm files of the installed @tensorflow/tfjs-backend-wasm into
+ * public/tfjs-wasm/, where lib/visionPipeline.ts points setWasmPaths. Next.js
+ * does not bundle them, and serving them from the app keeps the WASM backend
+ * working offline and under a CSP without a third-party CDN. The copies always
+ * match the installed JS build. Runs before `npm run dev` and `npm run build`.
+ *
+ * Usage:
+ *   node scripts/copy-tfjs-wasm.js
+ */
+
+const fs = require('fs');
+const path = require('path');
+
+const ROOT = path.resolve(__dirname, '..');
+const TARGET = path.join(ROOT, 'public', 'tfjs-wasm');
+
+let source;
+try {
+  source = path.dirname(require.resolve('@tensorflow/tfjs-backend-wasm/package.json', { paths: [ROOT] }));
+} catch (err) {
+  console.error('@tensorflow/tfjs-backend-wasm is not installed; run npm install first.');
+  process.exit(1);
+}
+
+const dist = path.join(source, 'dist');
+const files = fs.readdirSync(dist).filter(file => file.endsWith('.wasm'));
+if (files.length === 0) {
+  console.error(`No .wasm files found in ${dist}`);
+  process.exit(1);
+}
+
+fs.rmSync(TARGET, { recursive: true, force: true });
+fs.mkdirSync(TARGET, { recursive: true });
+for (const file of files) {
+  fs.copyFileSync(path.join(dist, file), path.join(TARGET, file));
+}
+console.log(`Copied ${files.join(', ')} to public/tfjs-wasm/`);
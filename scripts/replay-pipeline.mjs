@@ -0,0 +1,484 @@
+#!/usr/bin/env node
+
+/**
+ * Analysis Pipeline Replay Harness
+ *
+ * Replays recorded frames through the same pipeline the realtime page runs:
+ * frame gate -> adaptive scheduler -> (optional) frame batcher -> multipart
+ * payload -> streamed detection -> frame sequencer -> strike tracker. No
+ * webcam or API key is needed; the model backend is the deterministic stub
+ * unless `--backend=google` is given.
+ *
+ * With the stub, time is virtual: frames are fed at their capture timestamps
+ * and simulated model latency advances a virtual clock, so a 10 minute
+ * recording replays in seconds and every run with the same input makes the
+ * same decisions. CPU stages (gate, encode, apply) are measured in real time.
+ *
+ * Inputs (one of):
+ *   --video=<file>        decoded with ffmpeg (required for video input)
+ *   --frames=<dir>        directory of JPEG frames, in file name order
+ *   --synthetic=<sec>     generated frames (default: 120 s)
+ *
+ * Frame hashes for the gate come from 8x8 ffmpeg thumbnails when ffmpeg is
+ * installed. Without it, real frames are gated on staleness only. Pose and
+ * face signals are not available outside the browser.
+ *
+ * Usage:
+ *   npm run replay -- [--video=interview.mp4 | --frames=dir | --synthetic=120]
+ *     [--fps=10] [--mode=demo|normal|conservative] [--batch]
+ *     [--latency=800] [--dangerous-every=5] [--backend=stub|google]
+ *     [--realtime] [--transcript="..."] [--seed=42] [--json]
+ */
+
+import { spawnSync } from 'node:child_process';
+import fs from 'node:fs';
+import os from 'node:os';
+import path from 'node:path';
+import { AnalysisScheduler, ANALYSIS_MODES, GATE_MAX_STALENESS_MS, SUPERSEDED } from '@/lib/analysisScheduler';
+import { streamEventsFromFrames } from '@/lib/eventDetection';
+import { FrameBatcher } from '@/lib/frameBatcher';
+import { FrameGate, HASH_SIZE, averageHash } from '@/lib/frameGate';
+import { parseFramePayload } from '@/lib/framePayload';
+import { FrameSequencer } from '@/lib/frameSequencer';
+import { buildFrameForm, FRAME_STREAM_ENDPOINT } from '@/lib/frameTransport';
+import { getRegistryStats, setModelBackend } from '@/lib/geminiRegistry';
+import { createStubBackend } from '@/lib/geminiStub';
+import { createGoogleBackend } from '@/lib/modelBackend';
+import { StrikeTracker } from '@/lib/strikeTracker';
+
+const args = Object.fromEntries(process.argv.slice(2).map(arg => {
+  const [key, ...value] = arg.replace(/^--/, '').split('=');
+  return [key, value.length ? value.join('=') : true];
+}));
+const num = (key, fallback) => (args[key] !== undefined ? Number(args[key]) : fallback);
+
+const FPS = num('fps', 10);
+const MODE = args.mode ?? 'demo';
+const BATCH = Boolean(args.batch);
+const LATENCY_MS = num('latency', 800);
+const BACKEND = args.backend ?? 'stub';
+const REALTIME = Boolean(args.realtime) || BACKEND !== 'stub';
+const TRANSCRIPT = typeof args.transcript === 'string' ? args.transcript : '';
+const SEED = num('seed', 42);
+// Matches the canvas size the page reports to the gate
+const FRAME_WIDTH = 640;
+
+if (!ANALYSIS_MODES[MODE]) {
+  console.error(`Unknown mode "${MODE}" (expected ${Object.keys(ANALYSIS_MODES).join(', ')})`);
+  process.exit(1);
+}
+
+// ---------------------------------------------------------------------------
+// Clocks
+// ---------------------------------------------------------------------------
+
+const nextTurn = () => new Promise(resolve => setImmediate(resolve));
+
+// Discrete-event clock. Timers fire in order as the replay advances; real
+// async work (form encoding/parsing) is tracked so time never moves while it
+// is still running.
+class VirtualClock {
+  time = 0;
+  timers = [];
+  nextId = 1;
+  busy = 0;
+
+  now() {
+    return this.time;
+  }
+
+  setTimeout(callback, ms) {
+    const id = this.nextId++;
+    this.timers.push({ id, at: this.time + Math.max(0, ms), callback });
+    return id;
+  }
+
+  clearTimeout(id) {
+    this.timers = this.timers.filter(timer => timer.id !== id);
+  }
+
+  sleep = (ms, signal) => new Promise((resolve, reject) => {
+    if (signal?.aborted) return reject(new Error('Request aborted'));
+    const id = this.setTimeout(resolve, ms);
+    signal?.addEventListener('abort', () => {
+      this.clearTimeout(id);
+      reject(new Error('Request aborted'));
+    }, { once: true });
+  });
+
+  async track(promise) {
+    this.busy++;
+    try {
+      return await promise;
+    } finally {
+      this.busy--;
+    }
+  }
+
+  async settle() {
+    do {
+      await nextTurn();
+    } while (this.busy > 0);
+  }
+
+  async advanceTo(time) {
+    for (;;) {
+      await this.settle();
+      let next = null;
+      for (const timer of this.timers) {
+        if (timer.at <= time && (!next || timer.at < next.at || (timer.at === next.at && timer.id < next.id))) next = timer;
+      }
+      if (!next) break;
+      this.timers.splice(this.timers.indexOf(next), 1);
+      this.time = Math.max(this.time, next.at);
+      next.callback();
+    }
+    this.time = Math.max(this.time, time);
+    await this.settle();
+  }
+}
+
+// Wall clock starting at 0, for live backends
+class RealClock {
+  origin = performance.now();
+
+  now() {
+    return performance.now() - this.origin;
+  }
+
+  setTimeout(callback, ms) {
+    return setTimeout(callback, ms);
+  }
+
+  clearTimeout(handle) {
+    clearTimeout(handle);
+  }
+
+  track(promise) {
+    return promise;
+  }
+
+  async advanceTo(time) {
+    const wait = time - this.now();
+    if (wait > 0) await new Promise(resolve => setTimeout(resolve, wait));
+  }
+}
+
+// ---------------------------------------------------------------------------
+// Frame sources
+// ---------------------------------------------------------------------------
+
+function mulberry32(seed) {
+  return () => {
+    seed |= 0;
+    seed = (seed + 0x6d2b79f5) | 0;
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+const hasFfmpeg = () => !spawnSync('ffmpeg', ['-version'], { stdio: 'ignore' }).error;
+
+function ffmpeg(ffmpegArgs) {
+  const result = spawnSync('ffmpeg', ['-v', 'error', ...ffmpegArgs], { maxBuffer: 1 << 30 });
+  if (result.error || result.status !== 0) {
+    throw new Error(`ffmpeg failed: ${result.error?.message ?? result.stderr.toString()}`);
+  }
+  return result.stdout;
+}
+
+// 8x8 RGBA thumbnails of every frame, hashed the way the page hashes its canvas
+function thumbnailHashes(inputArgs) {
+  const raw = ffmpeg([...inputArgs, '-vf', `scale=${HASH_SIZE}:${HASH_SIZE},format=rgba`, '-f', 'rawvideo', '-']);
+  const size = HASH_SIZE * HASH_SIZE * 4;
+  const hashes = [];
+  for (let offset = 0; offset + size <= raw.length; offset += size) {
+    hashes.push(averageHash(new Uint8ClampedArray(raw.buffer, raw.byteOffset + offset, size)));
+  }
+  return hashes;
+}
+
+function loadFrameDir(dir) {
+  const files = fs.readdirSync(dir).filter(file => /\.jpe?g$/i.test(file)).sort();
+  if (files.length === 0) throw new Error(`No JPEG frames in ${dir}`);
+  let hashes = [];
+  if (hasFfmpeg()) {
+    const list = path.join(os.tmpdir(), `replay-frames-${process.pid}.txt`);
+    fs.writeFileSync(list, files.map(file => `file '${path.resolve(dir, file)}'`).join('\n'));
+    hashes = thumbnailHashes(['-f', 'concat', '-safe', '0', '-i', list]);
+    fs.rmSync(list);
+  }
+  return files.map((file, index) => ({
+    jpeg: fs.readFileSync(path.join(dir, file)),
+    hash: hashes[index] ?? null,
+  }));
+}
+
+function loadVideo(file) {
+  if (!hasFfmpeg()) throw new Error('--video needs ffmpeg on PATH (or extract frames and use --frames=<dir>)');
+  const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'replay-'));
+  try {
+    // Same size and quality as the page's capture canvas (640x360, 0.8)
+    ffmpeg(['-i', file, '-vf', `fps=${FPS},scale=640:360`, '-q:v', '4', path.join(dir, '%06d.jpg')]);
+    return loadFrameDir(dir);
+  } finally {
+    fs.rmSync(dir, { recursive: true, force: true });
+  }
+}
+
+// Quiet stretches with occasional scene changes (head turns, someone walking
+// in) that flip enough hash bits to trip the gate. Payload bytes change with
+// the scene so the stub's per-frame verdicts vary.
+function syntheticFrames(seconds) {
+  const random = mulberry32(SEED);
+  const count = Math.round(seconds * FPS);
+  const frames = [];
+  let scene = 0;
+  let sceneHash = [0x9f3c10a5, 0x44e1c70b];
+  let changeAt = Math.round((10 + random() * 20) * FPS);
+  let jpeg = Buffer.alloc(0);
+
+  for (let i = 0; i < count; i++) {
+    if (i === changeAt) {
+      scene++;
+      sceneHash = [(sceneHash[0] ^ Math.floor(random() * 0xffffffff)) >>> 0, sceneHash[1]];
+      changeAt = i + Math.round((5 + random() * 25) * FPS);
+    }
+    if (i % FPS === 0 || jpeg.length === 0) {
+      // ~30 KB, the size of a 640x360 q0.8 webcam JPEG
+      jpeg = Buffer.alloc(4 * (7000 + Math.floor(random() * 1500)));
+      for (let b = 0; b < jpeg.length; b += 4) jpeg.writeUInt32LE(Math.floor(random() * 0xffffffff), b);
+      jpeg.write(`scene-${scene}-${i}`, 0);
+    }
+    const noise = 1 << Math.floor(random() * 32);
+    frames.push({ jpeg, hash: [sceneHash[0], (sceneHash[1] ^ (random() < 0.3 ? noise : 0)) >>> 0] });
+  }
+  return frames;
+}
+
+function loadFrames() {
+  if (args.video) return { source: `video ${args.video}`, frames: loadVideo(args.video) };
+  if (args.frames) return { source: `frames in ${args.frames}`, frames: loadFrameDir(args.frames) };
+  const seconds = num('synthetic', 120);
+  return { source: `synthetic ${seconds}s trace (seed ${SEED})`, frames: syntheticFrames(seconds) };
+}
+
+// ---------------------------------------------------------------------------
+// Metrics
+// ---------------------------------------------------------------------------
+
+const samples = {};
+const record = (stage, ms) => (samples[stage] ??= []).push(ms);
+
+function percentile(sorted, p) {
+  if (sorted.length === 0) return 0;
+  return sorted[Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1)];
+}
+
+function stageTable() {
+  return Object.entries(samples).map(([stage, values]) => {
+    const sorted = [...values].sort((a, b) => a - b);
+    const round = value => Number(value.toFixed(3));
+    return {
+      stage,
+      count: sorted.length,
+      'p50 ms': round(percentile(sorted, 50)),
+      'p95 ms': round(percentile(sorted, 95)),
+      'p99 ms': round(percentile(sorted, 99)),
+    };
+  });
+}
+
+// ---------------------------------------------------------------------------
+// Pipeline (mirrors analyzeFrame in app/pages/realtimeStreamPage/page.tsx)
+// ---------------------------------------------------------------------------
+
+const clock = REALTIME ? new RealClock() : new VirtualClock();
+const stub = BACKEND === 'stub'
+  ? createStubBackend({ latencyMs: LATENCY_MS, dangerousEvery: num('dangerous-every', 5), delay: clock.sleep })
+  : null;
+setModelBackend(stub ?? await createGoogleBackend());
+
+const { source, frames } = loadFrames();
+const frameIntervalMs = 1000 / FPS;
+const durationMs = frames.length * frameIntervalMs;
+
+const gate = new FrameGate({ maxStalenessMs: GATE_MAX_STALENESS_MS[MODE] });
+const sequencer = new FrameSequencer({ policy: 'latest-wins' });
+const strikes = new StrikeTracker(undefined, at => `${(at / 1000).toFixed(1)}s`);
+const alerts = [];
+const totals = { bytesSent: 0, tokens: 0, events: 0, dangerous: 0 };
+
+const schedulerOptions = { ...ANALYSIS_MODES[MODE] };
+const batcher = BATCH ? new FrameBatcher() : null;
+if (batcher) {
+  schedulerOptions.baseIntervalMs = Math.max(schedulerOptions.baseIntervalMs, batcher.options.windowMs);
+  schedulerOptions.minIntervalMs = Math.max(schedulerOptions.minIntervalMs, batcher.options.windowMs);
+}
+
+let current = null;
+
+function applyEvent(event, capturedAt) {
+  totals.events++;
+  const update = strikes.record(event, capturedAt);
+  if (!update) return;
+  totals.dangerous++;
+  if (update.level === 'alert') alerts.push(update.strike.time);
+}
+
+async function encodeRequest(batch, ticket) {
+  const form = buildFrameForm(
+    batch.map(frame => ({ blob: frame.blob, offsetMs: frame.capturedAt - ticket.capturedAt })),
+    TRANSCRIPT
+  );
+  // Serialize exactly what the browser would send, then parse it like the route
+  const body = new Response(form);
+  const bytes = await body.arrayBuffer();
+  totals.bytesSent += bytes.byteLength;
+  return parseFramePayload(new Request(`http://replay${FRAME_STREAM_ENDPOINT}`, {
+    method: 'POST',
+    body: bytes,
+    headers: { 'content-type': body.headers.get('content-type') },
+  }));
+}
+
+async function analyzeFrame() {
+  if (!current) return null;
+
+  let started = performance.now();
+  const gateSample = { keypoints: [], faces: [], frameHash: current.hash, frameWidth: FRAME_WIDTH };
+  const decision = gate.evaluate(gateSample, clock.now());
+  record('gate', performance.now() - started);
+  if (!decision.escalate) return null;
+
+  let batch = batcher?.flush() ?? [];
+  const ticket = sequencer.issue(batch[0]?.capturedAt ?? clock.now());
+  if (batch.length === 0) batch = [{ blob: current.blob, capturedAt: ticket.capturedAt }];
+
+  started = performance.now();
+  const payload = await clock.track(encodeRequest(batch, ticket));
+  record('encode', performance.now() - started);
+  if (!payload.ok) throw new Error(payload.error);
+
+  const frameTimes = batch.map(frame => frame.capturedAt);
+  const deferred = [];
+  let applyMs = 0;
+  let tokens = 0;
+  let suspicious = false;
+  const sentAt = clock.now();
+  let firstEventAt = null;
+  try {
+    for await (const message of streamEventsFromFrames(payload.frames, payload.transcript, { signal: ticket.signal })) {
+      if (message.type === 'done') {
+        tokens = message.tokens ?? 0;
+        continue;
+      }
+      firstEventAt ??= clock.now();
+      suspicious ||= message.event.isDangerous;
+      const applyStarted = performance.now();
+      if (sequencer.claim(ticket)) {
+        applyEvent(message.event, frameTimes[message.event.frame ?? 0] ?? ticket.capturedAt);
+      } else {
+        deferred.push(message.event);
+      }
+      applyMs += performance.now() - applyStarted;
+    }
+  } catch (error) {
+    sequencer.fail(ticket);
+    if (ticket.signal.aborted) return SUPERSEDED;
+    throw error;
+  }
+  record('model', clock.now() - sentAt);
+  if (firstEventAt !== null) record('first event', firstEventAt - sentAt);
+
+  const superseded = sequencer.isSuperseded(ticket);
+  if (!superseded) gate.commit(gateSample, sentAt);
+  started = performance.now();
+  for (const applied of sequencer.complete(ticket, { events: deferred, frameTimes })) {
+    for (const event of applied.result.events) {
+      applyEvent(event, applied.result.frameTimes[event.frame ?? 0] ?? applied.ticket.capturedAt);
+    }
+  }
+  record('apply', applyMs + performance.now() - started);
+
+  totals.tokens += tokens;
+  return { suspicious, tokens, superseded };
+}
+
+// ---------------------------------------------------------------------------
+// Replay
+// ---------------------------------------------------------------------------
+
+const log = console.log;
+const warn = console.warn;
+console.log = () => {};
+console.warn = () => {};
+
+const scheduler = new AnalysisScheduler(analyzeFrame, schedulerOptions, clock);
+let state = scheduler.getState();
+scheduler.subscribe(next => { state = next; });
+
+const wallStarted = performance.now();
+scheduler.start();
+for (let i = 0; i < frames.length; i++) {
+  const capturedAt = i * frameIntervalMs;
+  await clock.advanceTo(capturedAt);
+  // Detection loop tick: newest frame for the gate, and a batch capture when due
+  const frame = frames[i];
+  current = { blob: new Blob([frame.jpeg], { type: 'image/jpeg' }), hash: frame.hash };
+  if (batcher?.due(capturedAt)) batcher.add(current.blob, capturedAt);
+}
+await clock.advanceTo(durationMs);
+scheduler.stop();
+// Let in-flight requests finish, as stopRecording does not cancel them
+for (let guard = 0; state.inFlight > 0 && guard < 600; guard++) {
+  await clock.advanceTo(clock.now() + 100);
+}
+const wallMs = performance.now() - wallStarted;
+
+console.log = log;
+console.warn = warn;
+
+// ---------------------------------------------------------------------------
+// Report
+// ---------------------------------------------------------------------------
+
+const registry = getRegistryStats();
+const report = {
+  source,
+  mode: MODE,
+  batch: BATCH,
+  backend: registry.backend,
+  clock: REALTIME ? 'real' : 'virtual',
+  frames: frames.length,
+  durationSec: durationMs / 1000,
+  wallSec: Number((wallMs / 1000).toFixed(3)),
+  framesPerSec: Math.round(frames.length / (wallMs / 1000)),
+  gate: gate.stats,
+  scheduler: { requests: state.requests, skipped: state.skipped, superseded: state.superseded, errors: state.errors },
+  sequencer: sequencer.stats,
+  bytesSent: totals.bytesSent,
+  bytesPerRequest: state.requests ? Math.round(totals.bytesSent / state.requests) : 0,
+  tokens: totals.tokens,
+  events: totals.events,
+  strikes: strikes.count,
+  alertAt: alerts[0] ?? null,
+  parseFailures: registry.parseFailures,
+  stages: stageTable(),
+};
+
+if (args.json) {
+  log(JSON.stringify(report, null, 2));
+} else {
+  log(`Replayed ${report.frames} frames (${report.durationSec.toFixed(1)} s, ${source}) in ${report.wallSec} s`);
+  log(`Mode ${MODE}${BATCH ? ' (batched)' : ''}, ${report.backend} backend, ${report.clock} clock\n`);
+  log(`Throughput:   ${report.framesPerSec} frames/s (${(report.durationSec / report.wallSec).toFixed(1)}x realtime)`);
+  log(`Gate:         ${gate.stats.escalated} escalated / ${gate.stats.evaluated} ticks`);
+  log(`Requests:     ${state.requests} sent, ${state.errors} failed, ${sequencer.stats.aborted} aborted, ${sequencer.stats.dropped} dropped`);
+  log(`Bytes sent:   ${report.bytesSent} (${report.bytesPerRequest} per request)`);
+  log(`Tokens:       ${report.tokens}`);
+  log(`Strikes:      ${report.strikes} from ${report.events} events${report.alertAt ? `, 3-strike alert at ${report.alertAt}` : ''}\n`);
+  log(`Stage latency (gate/encode/apply: CPU time; model/first event: ${report.clock} round trip):`);
+  console.table(report.stages);
+}
@@ -0,0 +1,177 @@
+import assert from 'node:assert/strict';
+import { describe, test } from 'node:test';
+import { AnalysisScheduler, ANALYSIS_MODES, SUPERSEDED } from '@/lib/analysisScheduler';
+
+const nextTurn = () => new Promise(resolve => setImmediate(resolve));
+
+// Manual clock: timers fire in order as `advance` moves time forward
+class TestClock {
+  time = 0;
+  timers = [];
+  nextId = 1;
+
+  now() {
+    return this.time;
+  }
+
+  setTimeout(callback, ms) {
+    const id = this.nextId++;
+    this.timers.push({ id, at: this.time + ms, callback });
+    return id;
+  }
+
+  clearTimeout(id) {
+    this.timers = this.timers.filter(timer => timer.id !== id);
+  }
+
+  async advance(ms) {
+    const end = this.time + ms;
+    for (;;) {
+      await nextTurn();
+      const due = this.timers.filter(timer => timer.at <= end).sort((a, b) => a.at - b.at || a.id - b.id)[0];
+      if (!due) break;
+      this.clearTimeout(due.id);
+      this.time = due.at;
+      due.callback();
+    }
+    this.time = end;
+    await nextTurn();
+  }
+}
+
+// Task whose calls stay in flight until the test resolves them
+const manualTask = () => {
+  const calls = [];
+  const task = () => new Promise(resolve => calls.push(resolve));
+  return { task, calls };
+};
+
+const options = overrides => ({ ...ANALYSIS_MODES.normal, ...overrides });
+
+describe('AnalysisScheduler', () => {
+  test('never exceeds maxInFlight and coalesces ticks while busy', async () => {
+    const clock = new TestClock();
+    const { task, calls } = manualTask();
+    const scheduler = new AnalysisScheduler(task, options({ maxInFlight: 1 }), clock);
+    scheduler.start();
+    assert.equal(calls.length, 1);
+
+    await clock.advance(60000);
+    assert.equal(calls.length, 1);
+    assert.deepEqual([scheduler.getState().inFlight, scheduler.getState().queueDepth], [1, 1]);
+
+    // The coalesced tick runs as soon as the slot frees up
+    calls[0]({ suspicious: false });
+    await clock.advance(0);
+    assert.equal(calls.length, 2);
+    assert.equal(scheduler.getState().requests, 1);
+    scheduler.stop();
+  });
+
+  test('gate skips do not count as requests', async () => {
+    const clock = new TestClock();
+    const scheduler = new AnalysisScheduler(async () => null, options(), clock);
+    scheduler.start();
+    await clock.advance(35000);
+    const state = scheduler.getState();
+    assert.equal(state.requests, 0);
+    assert.equal(state.skipped, 4);
+    assert.equal(state.avgLatencyMs, null);
+    scheduler.stop();
+  });
+
+  test('speeds up after a suspicious result, backs off while calm', async () => {
+    const clock = new TestClock();
+    let suspicious = true;
+    // A per-minute cap below the boosted rate would hide the boost
+    const scheduler = new AnalysisScheduler(async () => ({ suspicious }), options({ requestsPerMinute: 60 }), clock);
+    const base = scheduler.intervalMs(0);
+    assert.equal(base, 10000);
+
+    scheduler.start();
+    await clock.advance(0);
+    assert.equal(scheduler.getState().boosted, true);
+    // Half the paced interval (the spent request moved the pace a little)
+    assert.equal(scheduler.intervalMs(), Math.max(base, scheduler.budgetIntervalMs()) / 2);
+
+    suspicious = false;
+    await clock.advance(5 * 60000);
+    assert.equal(scheduler.getState().boosted, false);
+    assert.ok(scheduler.intervalMs() > base);
+    scheduler.stop();
+  });
+
+  test('round-trip latency floors the interval', async () => {
+    const clock = new TestClock();
+    const { task, calls } = manualTask();
+    const scheduler = new AnalysisScheduler(task, options({ maxIntervalMs: 60000 }), clock);
+    scheduler.start();
+    await clock.advance(15000);
+    calls[0]({ suspicious: false });
+    await clock.advance(0);
+    assert.equal(scheduler.getState().avgLatencyMs, 15000);
+    assert.equal(scheduler.intervalMs(), 15000);
+    scheduler.stop();
+  });
+
+  test('superseded results use budget but are not latency samples', async () => {
+    const clock = new TestClock();
+    const { task, calls } = manualTask();
+    const scheduler = new AnalysisScheduler(task, options(), clock);
+    scheduler.start();
+    await clock.advance(3000);
+    calls[0](SUPERSEDED);
+    await clock.advance(0);
+    const state = scheduler.getState();
+    assert.equal(state.requests, 1);
+    assert.equal(state.superseded, 1);
+    assert.equal(state.avgLatencyMs, null);
+    scheduler.stop();
+  });
+
+  test('paces the session budget and stops once it is spent', async () => {
+    const clock = new TestClock();
+    const paced = options({
+      baseIntervalMs: 1000,
+      minIntervalMs: 1000,
+      maxIntervalMs: 60000,
+      requestsPerMinute: 60,
+      maxRequestsPerSession: 10,
+      expectedSessionMs: 100000,
+      minBudgetWindowMs: 20000,
+    });
+    const scheduler = new AnalysisScheduler(async () => ({ suspicious: false, tokens: 100 }), paced, clock);
+    // 10 requests over 100 s
+    assert.equal(scheduler.budgetIntervalMs(0), 10000);
+
+    scheduler.start();
+    await clock.advance(0);
+    assert.equal(scheduler.budgetIntervalMs(), 100000 / 9);
+
+    // Past the expected length, what is left is spread over minBudgetWindowMs
+    await clock.advance(95000);
+    const { requests } = scheduler.getState();
+    assert.ok(requests < 10);
+    assert.equal(scheduler.budgetIntervalMs(), 20000 / (10 - requests));
+
+    await clock.advance(10 * 60000);
+    const state = scheduler.getState();
+    assert.equal(state.requests, 10);
+    assert.equal(state.budgetExhausted, true);
+    assert.equal(state.running, false);
+  });
+
+  test('the token budget paces at the average cost per request', async () => {
+    const clock = new TestClock();
+    const scheduler = new AnalysisScheduler(
+      async () => ({ suspicious: false, tokens: 1000 }),
+      options({ maxRequestsPerSession: 1000, maxTokensPerSession: 11000, expectedSessionMs: 100000, minBudgetWindowMs: 10000 }),
+      clock,
+    );
+    scheduler.start();
+    await clock.advance(0);
+    // 10000 tokens left at 1000 per request
+    assert.equal(scheduler.budgetIntervalMs(), 10000);
+    scheduler.stop();
+  });
+});
@@ -0,0 +1,82 @@
+import assert from 'node:assert/strict';
+import { describe, test } from 'node:test';
+import { DetectionRateController } from '@/lib/detectionRateController';
+
+// Records `cost` until the controller changes width; returns [width, ticks]
+const recordUntilResize = (controller, cost, limit = 100) => {
+  for (let ticks = 1; ticks <= limit; ticks++) {
+    const width = controller.record(cost);
+    if (width !== null) return [width, ticks];
+  }
+  return [null, limit];
+};
+
+describe('DetectionRateController', () => {
+  test('starts at the input width closest to the pipeline width', () => {
+    assert.equal(new DetectionRateController(300).inputWidth, 320);
+    assert.equal(new DetectionRateController(100).inputWidth, 192);
+    assert.equal(new DetectionRateController(1000).inputWidth, 416);
+  });
+
+  test('ticks at most once per interval', () => {
+    const controller = new DetectionRateController(320);
+    assert.equal(controller.tick(0), true);
+    assert.equal(controller.tick(99), false);
+    assert.equal(controller.tick(100), true);
+    assert.equal(controller.tick(150), false);
+  });
+
+  test('sets the interval from the smoothed cost and the budget', () => {
+    const controller = new DetectionRateController(320);
+    controller.record(40);
+    // 40 ms at a 0.4 budget
+    assert.equal(controller.intervalMs, 100);
+    controller.record(90);
+    // EWMA 40 + 0.2 * 50 = 50
+    assert.equal(controller.state().costMs, 50);
+    assert.equal(controller.intervalMs, 125);
+  });
+
+  test('clamps the interval to 66..250 ms', () => {
+    const fast = new DetectionRateController(320);
+    fast.record(1);
+    assert.equal(fast.intervalMs, 66);
+    const slow = new DetectionRateController(320);
+    slow.record(1000);
+    assert.equal(slow.intervalMs, 250);
+  });
+
+  test('steps resolution down when the slowest rate is over budget', () => {
+    const controller = new DetectionRateController(320);
+    assert.deepEqual(recordUntilResize(controller, 200), [256, 20]);
+    // Smoothed cost is rescaled by the pixel ratio
+    assert.equal(controller.state().costMs, 128);
+    // And it waits settleTicks again before the next step
+    assert.deepEqual(recordUntilResize(controller, 200), [192, 20]);
+    assert.deepEqual(recordUntilResize(controller, 200), [null, 100]);
+    assert.equal(controller.inputWidth, 192);
+  });
+
+  test('steps resolution up only when the larger input fits the fastest rate', () => {
+    const controller = new DetectionRateController(192);
+    // 10 ms wants 25 ms; 256 px costs ~1.78x, still under 66 ms
+    assert.deepEqual(recordUntilResize(controller, 10), [256, 20]);
+
+    const busy = new DetectionRateController(192);
+    // 20 ms wants 50 ms; ~89 ms at 256 px would not fit
+    assert.deepEqual(recordUntilResize(busy, 20), [null, 100]);
+
+    const top = new DetectionRateController(416);
+    assert.deepEqual(recordUntilResize(top, 1), [null, 100]);
+  });
+
+  test('pauses while hidden', () => {
+    const controller = new DetectionRateController(320);
+    controller.setHidden(true);
+    assert.equal(controller.tick(0), false);
+    assert.deepEqual(controller.state(), { intervalMs: 100, inputWidth: 320, costMs: 0, paused: true });
+    controller.setHidden(false);
+    assert.equal(controller.paused, false);
+    assert.equal(controller.tick(0), true);
+  });
+});
@@ -0,0 +1,113 @@
+import assert from 'node:assert/strict';
+import { describe, test } from 'node:test';
+import { averageHash, FrameGate, hashDistance, HASH_SIZE } from '@/lib/frameGate';
+
+const WIDTH = 640;
+const face = (x, y, size = 100) => ({ topLeft: [x, y], bottomRight: [x + size, y + size] });
+const keypoints = (dx = 0) => [{ x: 100 + dx, y: 100, score: 0.9 }, { x: 200 + dx, y: 100, score: 0.9 }];
+const sample = ({ faces = [face(270, 100)], dx = 0, hash = [0, 0], objectFlags } = {}) =>
+  ({ keypoints: keypoints(dx), faces, frameHash: hash, frameWidth: WIDTH, objectFlags });
+
+// `bits` low bits set in the low word
+const hashWithBits = bits => [0, bits >= 32 ? 0xffffffff : (2 ** bits - 1) >>> 0];
+
+describe('averageHash', () => {
+  test('sets a bit per pixel brighter than the mean', () => {
+    const pixels = HASH_SIZE * HASH_SIZE;
+    const rgba = new Uint8ClampedArray(pixels * 4);
+    // Bright pixels at index 0 and 40 (one in each word)
+    for (const i of [0, 40]) rgba.fill(255, i * 4, i * 4 + 3);
+    assert.deepEqual(averageHash(rgba), [1, 1 << 8]);
+    assert.deepEqual(averageHash(new Uint8ClampedArray(pixels * 4)), [0, 0]);
+  });
+
+  test('hashDistance counts differing bits in both words', () => {
+    assert.equal(hashDistance([0xffffffff, 0], [0, 0]), 32);
+    assert.equal(hashDistance([0b1010, 0b1], [0b0110, 0b0]), 3);
+  });
+});
+
+describe('FrameGate', () => {
+  test('escalates the first frame, then only on change or staleness', () => {
+    const gate = new FrameGate({ maxStalenessMs: 30000 });
+    assert.equal(gate.evaluate(sample(), 0).reason, 'first');
+    gate.commit(sample(), 0);
+    assert.deepEqual(gate.evaluate(sample(), 1000), { escalate: false, reason: 'quiet', score: 0 });
+    assert.equal(gate.evaluate(sample(), 29999).reason, 'quiet');
+    assert.equal(gate.evaluate(sample(), 30000).reason, 'stale');
+    assert.deepEqual(gate.stats, { evaluated: 4, escalated: 2, skipped: 2 });
+  });
+
+  test('scores keypoint displacement against keypointScale of the frame width', () => {
+    const gate = new FrameGate({ keypointScale: 0.05 });
+    gate.commit(sample(), 0);
+    // 0.05 * 640 = 32 px is a score of 1
+    assert.equal(gate.evaluate(sample({ dx: 16 }), 1).score, 0.5);
+    assert.equal(gate.evaluate(sample({ dx: 31 }), 1).escalate, false);
+    const moved = gate.evaluate(sample({ dx: 32 }), 1);
+    assert.deepEqual([moved.escalate, moved.reason, moved.score], [true, 'change', 1]);
+  });
+
+  test('ignores low-confidence keypoints', () => {
+    const gate = new FrameGate();
+    gate.commit(sample(), 0);
+    const shaky = { ...sample(), keypoints: keypoints(200).map(point => ({ ...point, score: 0.1 })) };
+    assert.equal(gate.evaluate(shaky, 1).score, 0);
+  });
+
+  test('scores hash distance against hashBitsScale', () => {
+    const gate = new FrameGate({ hashBitsScale: 10 });
+    gate.commit(sample(), 0);
+    assert.equal(gate.evaluate(sample({ hash: hashWithBits(9) }), 1).escalate, false);
+    assert.equal(gate.evaluate(sample({ hash: hashWithBits(10) }), 1).reason, 'change');
+  });
+
+  test('scores face drift relative to face size and matches faces by position', () => {
+    const gate = new FrameGate({ faceDriftScale: 0.25 });
+    gate.commit(sample(), 0);
+    // 24 px on a 100 px face is just under the drift that scores 1
+    assert.equal(gate.evaluate(sample({ faces: [face(294, 100)] }), 1).escalate, false);
+    assert.equal(gate.evaluate(sample({ faces: [face(295, 100)] }), 1).reason, 'change');
+
+    const two = [face(100, 100), face(400, 100)];
+    gate.commit(sample({ faces: two }), 2);
+    assert.equal(gate.evaluate(sample({ faces: [...two].reverse() }), 3).score, 0);
+    assert.equal(gate.evaluate(sample({ faces: [two[0]] }), 3).score, Infinity);
+  });
+
+  test('a newly confirmed object flag escalates; known flags do not', () => {
+    const gate = new FrameGate();
+    gate.commit(sample({ objectFlags: [] }), 0);
+    assert.equal(gate.evaluate(sample({ objectFlags: null }), 1).reason, 'quiet');
+    assert.equal(gate.evaluate(sample({ objectFlags: ['phone'] }), 1).reason, 'objects');
+    gate.commit(sample({ objectFlags: ['phone'] }), 1);
+    assert.equal(gate.evaluate(sample({ objectFlags: ['phone'] }), 2).reason, 'quiet');
+  });
+
+  test('an empty object scene does not stretch staleness', () => {
+    const gate = new FrameGate({ maxStalenessMs: 30000 });
+    gate.commit(sample({ objectFlags: [] }), 0);
+    assert.equal(gate.evaluate(sample({ objectFlags: [] }), 30000).reason, 'stale');
+  });
+
+  test('evaluate does not move the baseline until commit', () => {
+    const gate = new FrameGate({ maxStalenessMs: 30000 });
+    gate.commit(sample(), 0);
+    const moved = sample({ dx: 64 });
+    // Escalated but never sent (e.g. the request was superseded): still a change
+    assert.equal(gate.evaluate(moved, 1000).reason, 'change');
+    assert.equal(gate.evaluate(moved, 2000).reason, 'change');
+    gate.commit(moved, 2000);
+    assert.equal(gate.evaluate(moved, 3000).reason, 'quiet');
+    // Staleness counts from the last commit
+    assert.equal(gate.evaluate(moved, 31999).reason, 'quiet');
+    assert.equal(gate.evaluate(moved, 32000).reason, 'stale');
+  });
+
+  test('reset forgets the baseline', () => {
+    const gate = new FrameGate();
+    gate.commit(sample(), 0);
+    gate.reset();
+    assert.equal(gate.evaluate(sample(), 1).reason, 'first');
+  });
+});
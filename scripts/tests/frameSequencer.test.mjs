@@ -0,0 +1,66 @@
+import assert from 'node:assert/strict';
+import { describe, test } from 'node:test';
+import { FrameSequencer } from '@/lib/frameSequencer';
+
+const applied = released => released.map(({ ticket, result }) => [ticket.seq, result]);
+
+describe('latest-wins', () => {
+  test('drops responses older than the last applied and aborts older requests', () => {
+    const sequencer = new FrameSequencer({ policy: 'latest-wins' });
+    const [a, b, c] = [0, 1, 2].map(at => sequencer.issue(at));
+    assert.deepEqual(applied(sequencer.complete(b, 'b')), [[1, 'b']]);
+    assert.equal(a.signal.aborted, true);
+    assert.equal(c.signal.aborted, false);
+    assert.equal(sequencer.isSuperseded(a), true);
+    assert.deepEqual(sequencer.complete(a, 'a'), []);
+    assert.deepEqual(applied(sequencer.complete(c, 'c')), [[2, 'c']]);
+    assert.deepEqual(sequencer.stats, { issued: 3, applied: 2, dropped: 1, aborted: 1 });
+  });
+
+  test('a claimed ticket keeps applying; older ones are superseded', () => {
+    const sequencer = new FrameSequencer({ policy: 'latest-wins' });
+    const a = sequencer.issue(0);
+    const b = sequencer.issue(1);
+    assert.equal(sequencer.claim(b), true);
+    assert.equal(sequencer.claim(b), true);
+    assert.equal(sequencer.claim(a), false);
+    assert.equal(sequencer.isSuperseded(b), false);
+    assert.deepEqual(applied(sequencer.complete(b, 'b')), [[1, 'b']]);
+  });
+
+  test('abortAll aborts everything in flight', () => {
+    const sequencer = new FrameSequencer();
+    const tickets = [0, 1].map(at => sequencer.issue(at));
+    sequencer.abortAll();
+    assert.ok(tickets.every(ticket => ticket.signal.aborted && sequencer.isSuperseded(ticket)));
+  });
+});
+
+describe('reorder-window', () => {
+  test('releases results in sequence order', () => {
+    const sequencer = new FrameSequencer({ policy: 'reorder-window', window: 3 });
+    const [a, b, c] = [0, 1, 2].map(at => sequencer.issue(at));
+    assert.equal(sequencer.claim(a), false);
+    assert.deepEqual(sequencer.complete(c, 'c'), []);
+    assert.deepEqual(sequencer.complete(b, 'b'), []);
+    assert.deepEqual(applied(sequencer.complete(a, 'a')), [[0, 'a'], [1, 'b'], [2, 'c']]);
+  });
+
+  test('skips failed frames', () => {
+    const sequencer = new FrameSequencer({ policy: 'reorder-window', window: 2 });
+    const [a, b] = [0, 1].map(at => sequencer.issue(at));
+    assert.deepEqual(sequencer.complete(b, 'b'), []);
+    assert.deepEqual(applied(sequencer.fail(a)), [[1, 'b']]);
+  });
+
+  test('gives up on a frame once the window is full', () => {
+    const sequencer = new FrameSequencer({ policy: 'reorder-window', window: 2 });
+    const [a, b, c] = [0, 1, 2].map(at => sequencer.issue(at));
+    assert.deepEqual(sequencer.complete(b, 'b'), []);
+    assert.deepEqual(applied(sequencer.complete(c, 'c')), [[1, 'b'], [2, 'c']]);
+    assert.equal(a.signal.aborted, true);
+    assert.deepEqual(sequencer.complete(a, 'a'), []);
+    assert.equal(sequencer.stats.aborted, 1);
+    assert.equal(sequencer.stats.dropped, 1);
+  });
+});
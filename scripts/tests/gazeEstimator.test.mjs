@@ -0,0 +1,136 @@
+import assert from 'node:assert/strict';
+import { describe, test } from 'node:test';
+import { classifyGaze, computeGazeFeatures, estimateHeadPose, GazeMonitor } from '@/lib/gazeEstimator';
+import { PoseHistory } from '@/lib/poseHistory';
+
+// Packed BlazeFace face: box, probability, then right eye, left eye, nose,
+// mouth, right ear, left ear. Facing the camera by default; `noseDx` turns
+// the head, `noseY` tilts it.
+const packedFace = ({ noseDx = 0, noseY = 50 } = {}) => new Float32Array([
+  20, 20, 80, 80, 0.99,
+  40, 40, 60, 40, 50 + noseDx, noseY, 50, 60, 30, 45, 70, 45,
+]);
+const noFace = new Float32Array(0);
+const noPose = new Float32Array(0);
+
+const fill = (history, from, to, stepMs, faceAt) => {
+  for (let at = from; at <= to; at += stepMs) history.push({ faces: faceAt(at), keypoints: noPose }, at);
+};
+
+describe('estimateHeadPose', () => {
+  test('reads a frontal face as zero yaw and pitch', () => {
+    const pose = estimateHeadPose(packedFace());
+    assert.ok(Math.abs(pose.yaw) < 1e-6);
+    assert.ok(Math.abs(pose.pitch) < 1e-6);
+  });
+
+  test('turns towards the ear the nose moves to', () => {
+    // Nose 30 px from the right ear and 10 px from the left: asin(0.5) = 30 degrees
+    assert.ok(Math.abs(estimateHeadPose(packedFace({ noseDx: 10 })).yaw - 30) < 1e-4);
+    assert.ok(Math.abs(estimateHeadPose(packedFace({ noseDx: -10 })).yaw + 30) < 1e-4);
+  });
+
+  test('tilts up when the nose rises towards the eye line', () => {
+    assert.ok(Math.abs(estimateHeadPose(packedFace({ noseY: 45 })).pitch - 30) < 1e-4);
+    assert.ok(Math.abs(estimateHeadPose(packedFace({ noseY: 55 })).pitch + 30) < 1e-4);
+  });
+
+  test('reads a face at an offset and writes into the given object', () => {
+    const faces = new Float32Array(34);
+    faces.set(packedFace({ noseDx: 10 }), 17);
+    const out = { yaw: 0, pitch: 0 };
+    assert.equal(estimateHeadPose(faces, 17, out), out);
+    assert.ok(out.yaw > 29);
+  });
+});
+
+describe('classifyGaze', () => {
+  test('applies the yaw threshold before the pitch threshold', () => {
+    assert.equal(classifyGaze(null), 'none');
+    assert.equal(classifyGaze({ yaw: 0, pitch: 0 }), 'center');
+    assert.equal(classifyGaze({ yaw: 25, pitch: 0 }), 'center');
+    assert.equal(classifyGaze({ yaw: 26, pitch: 0 }), 'right');
+    assert.equal(classifyGaze({ yaw: -26, pitch: 30 }), 'left');
+    assert.equal(classifyGaze({ yaw: 0, pitch: 21 }), 'up');
+    assert.equal(classifyGaze({ yaw: 0, pitch: -21 }), 'down');
+  });
+});
+
+describe('computeGazeFeatures', () => {
+  test('counts yaw reversals and off-screen time within the window', () => {
+    const history = new PoseHistory(64);
+    // Old records outside the window must not count
+    fill(history, 0, 900, 100, () => packedFace({ noseDx: 10 }));
+    // Side to side every 500 ms: +-11.5 degrees, a 23 degree swing
+    fill(history, 1000, 6000, 500, at => packedFace({ noseDx: (at / 500) % 2 ? -4 : 4 }));
+
+    const features = computeGazeFeatures(history, 6000);
+    assert.equal(features.samples, 11);
+    assert.equal(features.spanMs, 5000);
+    assert.equal(features.direction, 'center');
+    // The first swing sets the trend, every later one is a reversal
+    assert.ok(Math.abs(features.scanFrequency - 9 / 5) < 1e-9);
+    assert.equal(features.offScreenMs, 0);
+    assert.equal(features.offScreenStreakMs, 0);
+  });
+
+  test('ignores swings smaller than the scan amplitude', () => {
+    const history = new PoseHistory(32);
+    fill(history, 0, 5000, 500, at => packedFace({ noseDx: (at / 500) % 2 ? -1 : 1 }));
+    assert.equal(computeGazeFeatures(history, 5000).scanFrequency, 0);
+  });
+
+  test('tracks the current off-screen streak', () => {
+    const history = new PoseHistory(32);
+    fill(history, 0, 1000, 500, () => packedFace());
+    fill(history, 1500, 3000, 500, () => packedFace({ noseDx: 10 }));
+
+    const features = computeGazeFeatures(history, 3200);
+    assert.equal(features.direction, 'right');
+    assert.equal(features.offScreenStreakMs, 1700);
+    // Time up to the newest record only
+    assert.equal(features.offScreenMs, 1500);
+    assert.ok(features.pose.yaw > 29);
+  });
+});
+
+describe('GazeMonitor', () => {
+  test('reports a long look away once per cooldown', () => {
+    const history = new PoseHistory(64);
+    const monitor = new GazeMonitor();
+    fill(history, 0, 2900, 100, () => packedFace({ noseDx: 10 }));
+    assert.equal(monitor.update(history, 2900), null);
+
+    fill(history, 3000, 3000, 100, () => packedFace({ noseDx: 10 }));
+    const event = monitor.update(history, 3000);
+    assert.deepEqual(event, { description: 'Looking away from the screen (right) for 3s', isDangerous: true });
+    assert.equal(monitor.update(history, 3100), null);
+
+    fill(history, 3100, 18000, 500, () => packedFace({ noseDx: 10 }));
+    assert.notEqual(monitor.update(history, 18000), null);
+  });
+
+  test('reports a missing face as not visible', () => {
+    const history = new PoseHistory(64);
+    fill(history, 0, 3000, 100, () => noFace);
+    const event = new GazeMonitor().update(history, 3000);
+    assert.equal(event.description, 'Face not visible to the camera for 3s');
+  });
+
+  test('waits for most of a window before reporting scanning', () => {
+    const history = new PoseHistory(64);
+    const monitor = new GazeMonitor();
+    const scanning = at => packedFace({ noseDx: (at / 500) % 2 ? -4 : 4 });
+    fill(history, 0, 3500, 500, scanning);
+    assert.equal(monitor.update(history, 3500), null);
+
+    fill(history, 4000, 5000, 500, scanning);
+    const event = monitor.update(history, 5000);
+    assert.match(event.description, /^Repeated side-to-side head movement/);
+    assert.equal(monitor.update(history, 5500), null);
+
+    monitor.reset();
+    assert.equal(monitor.features, null);
+    assert.notEqual(monitor.update(history, 5500), null);
+  });
+});
@@ -0,0 +1,55 @@
+import assert from 'node:assert/strict';
+import { describe, test } from 'node:test';
+import { EventArrayParser, parseEventsResponse } from '@/lib/incrementalJson';
+
+const RESPONSE = '{"events": [{"description": "Looks away {left}", "isDangerous": true}, {"description": "Types \\"notes\\"", "isDangerous": false}]}';
+
+describe('EventArrayParser', () => {
+  test('returns each element as soon as it closes, for any chunking', () => {
+    for (const size of [1, 3, 7, RESPONSE.length]) {
+      const parser = new EventArrayParser();
+      const events = [];
+      for (let i = 0; i < RESPONSE.length; i += size) events.push(...parser.push(RESPONSE.slice(i, i + size)));
+      assert.deepEqual(events.map(event => event.description), ['Looks away {left}', 'Types "notes"']);
+      assert.equal(parser.done, true);
+      assert.equal(parser.parseFailures, 0);
+    }
+  });
+
+  test('emits the first element before the response ends', () => {
+    const parser = new EventArrayParser();
+    assert.deepEqual(parser.push('```json\n{"eve'), []);
+    assert.equal(parser.found, false);
+    assert.deepEqual(parser.push('nts": [{"a": [1, 2]}, {"b"'), [{ a: [1, 2] }]);
+    assert.equal(parser.found, true);
+    assert.equal(parser.done, false);
+    assert.deepEqual(parser.push(': 2}]}\n```'), [{ b: 2 }]);
+    assert.deepEqual(parser.push('{"events": [{"c": 3}]}'), []);
+  });
+
+  test('skips elements that are not valid JSON', () => {
+    const parser = new EventArrayParser();
+    assert.deepEqual(parser.push('{"events": [{"a": 1,}, {"b": 2}]}'), [{ b: 2 }]);
+    assert.equal(parser.parseFailures, 1);
+  });
+});
+
+describe('parseEventsResponse', () => {
+  test('parses well-formed JSON directly', () => {
+    const parsed = parseEventsResponse(RESPONSE);
+    assert.equal(parsed.events.length, 2);
+    assert.equal(parsed.recovered, false);
+    assert.equal(parsed.failures, 0);
+  });
+
+  test('recovers complete elements from fenced or truncated text', () => {
+    const parsed = parseEventsResponse('Here you go:\n```json\n{"events": [{"a": 1}, {"b": 2}, {"c": ');
+    assert.deepEqual(parsed.events, [{ a: 1 }, { b: 2 }]);
+    assert.equal(parsed.recovered, true);
+    assert.equal(parsed.failures, 0);
+  });
+
+  test('counts a missing events array as one failure', () => {
+    assert.deepEqual(parseEventsResponse('I cannot help with that.'), { events: [], recovered: true, failures: 1 });
+  });
+});
@@ -0,0 +1,97 @@
+import assert from 'node:assert/strict';
+import { describe, test } from 'node:test';
+import { countObjects, OBJECT_CLASSES, objectFlags, ObjectSignalMonitor } from '@/lib/objectSignals';
+
+// Counts array with the given per-class counts
+const counts = (byClass = {}) => {
+  const out = new Float32Array(OBJECT_CLASSES.length);
+  for (const [name, count] of Object.entries(byClass)) out[OBJECT_CLASSES.indexOf(name)] = count;
+  return out;
+};
+const phone = counts({ 'cell phone': 1, person: 1 });
+const empty = counts({ person: 1 });
+
+describe('countObjects', () => {
+  test('counts known classes above the score threshold', () => {
+    const detections = [
+      { class: 'person', score: 0.9 },
+      { class: 'person', score: 0.6 },
+      { class: 'cell phone', score: 0.4 },
+      { class: 'book', score: 0.5 },
+      { class: 'cup', score: 0.99 },
+    ];
+    assert.deepEqual(countObjects(detections, 0.5), counts({ person: 2, book: 1 }));
+  });
+
+  test('overwrites the counts it is given', () => {
+    const out = counts({ tv: 3, laptop: 1 });
+    assert.equal(countObjects([{ class: 'tv', score: 1 }], 0.5, out), out);
+    assert.deepEqual(out, counts({ tv: 1 }));
+  });
+});
+
+describe('objectFlags', () => {
+  test('derives one flag per suspicious class', () => {
+    assert.deepEqual(objectFlags(counts()), []);
+    assert.deepEqual(objectFlags(counts({ person: 1 })), []);
+    assert.deepEqual(objectFlags(counts({ person: 2 })), ['extra-person']);
+    assert.deepEqual(
+      objectFlags(counts({ 'cell phone': 2, book: 1, laptop: 1, tv: 1 })),
+      ['phone', 'book', 'laptop', 'screen']
+    );
+  });
+});
+
+describe('ObjectSignalMonitor', () => {
+  test('strikes once a flag is seen on consecutive samples', () => {
+    const monitor = new ObjectSignalMonitor();
+    assert.deepEqual(monitor.update(phone, 0), []);
+    assert.deepEqual(monitor.update(phone, 500), [
+      { description: 'Phone visible in frame (on-device detector)', isDangerous: true },
+    ]);
+  });
+
+  test('a gap resets the streak', () => {
+    const monitor = new ObjectSignalMonitor();
+    monitor.update(phone, 0);
+    monitor.update(empty, 500);
+    assert.deepEqual(monitor.update(phone, 1000), []);
+    assert.equal(monitor.update(phone, 1500).length, 1);
+  });
+
+  test('strikes again for the same flag only after the cooldown', () => {
+    const monitor = new ObjectSignalMonitor();
+    monitor.update(phone, 0);
+    monitor.update(phone, 500);
+    assert.deepEqual(monitor.update(phone, 20499), []);
+    assert.equal(monitor.update(phone, 20500).length, 1);
+  });
+
+  test('summarises confirmed flags within the window', () => {
+    const monitor = new ObjectSignalMonitor();
+    monitor.update(counts({ book: 1, person: 2 }), 0);
+    assert.equal(monitor.summary(0), '');
+    monitor.update(counts({ book: 1, person: 2 }), 500);
+    assert.equal(monitor.summary(500), 'More than one person in frame; Book or notes visible in frame');
+    assert.equal(monitor.summary(10500), 'More than one person in frame; Book or notes visible in frame');
+    assert.equal(monitor.summary(10501), '');
+  });
+
+  test('gateFlags reports confirmed flags, or null while unsure', () => {
+    const monitor = new ObjectSignalMonitor();
+    // Detector has not sampled yet
+    assert.equal(monitor.gateFlags(0), null);
+    monitor.update(empty, 0);
+    assert.deepEqual(monitor.gateFlags(0), []);
+    monitor.update(phone, 500);
+    assert.equal(monitor.gateFlags(500), null);
+    monitor.update(phone, 1000);
+    assert.deepEqual(monitor.gateFlags(1000), ['phone']);
+    // Stalled detector
+    assert.equal(monitor.gateFlags(11001), null);
+
+    monitor.reset();
+    assert.equal(monitor.gateFlags(1000), null);
+    assert.equal(monitor.summary(1000), '');
+  });
+});
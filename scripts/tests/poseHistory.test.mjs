@@ -0,0 +1,99 @@
+import assert from 'node:assert/strict';
+import { describe, test } from 'node:test';
+import { HISTORY_KEYPOINTS, HISTORY_STRIDE, PoseHistory } from '@/lib/poseHistory';
+import { FACE_STRIDE, KEYPOINT_STRIDE } from '@/lib/visionPipeline';
+
+// A tick whose face and keypoints are all filled with `value`
+const tick = (value, { face = true, pose = true } = {}) => ({
+  faces: new Float32Array(face ? FACE_STRIDE : 0).fill(value),
+  keypoints: new Float32Array(pose ? HISTORY_KEYPOINTS * KEYPOINT_STRIDE : 0).fill(value),
+});
+
+describe('PoseHistory', () => {
+  test('indexes records oldest first before wrapping', () => {
+    const history = new PoseHistory(4);
+    history.push(tick(1), 100);
+    history.push(tick(2), 200);
+    assert.equal(history.length, 2);
+    assert.equal(history.time(0), 100);
+    assert.equal(history.time(1), 200);
+    assert.equal(history.offset(1), HISTORY_STRIDE);
+    assert.equal(history.faceView(1)[0], 2);
+  });
+
+  test('overwrites the oldest record once full', () => {
+    const history = new PoseHistory(3);
+    for (let i = 1; i <= 5; i++) history.push(tick(i), i * 100);
+    assert.equal(history.length, 3);
+    assert.deepEqual([0, 1, 2].map(i => history.time(i)), [300, 400, 500]);
+    assert.deepEqual([0, 1, 2].map(i => history.faceView(i)[0]), [3, 4, 5]);
+    assert.deepEqual([0, 1, 2].map(i => history.keypointView(i)[0]), [3, 4, 5]);
+    // Record 5 went into the slot record 2 used
+    assert.equal(history.offset(2), HISTORY_STRIDE);
+    assert.equal(history.data.length, 3 * HISTORY_STRIDE);
+  });
+
+  test('zero-fills missing faces and poses and flags them', () => {
+    const history = new PoseHistory(2);
+    history.push(tick(7), 0);
+    history.push(tick(7), 100);
+    // Overwrites the first slot; its stale data must not show through
+    history.push(tick(7, { face: false, pose: false }), 200);
+    assert.equal(history.faceCount(1), 0);
+    assert.equal(history.hasPose(1), false);
+    assert.ok(history.faceView(1).every(value => value === 0));
+    assert.ok(history.keypointView(1).every(value => value === 0));
+    assert.equal(history.faceCount(0), 1);
+    assert.equal(history.hasPose(0), true);
+  });
+
+  test('counts every face but stores only the first', () => {
+    const history = new PoseHistory(2);
+    const faces = new Float32Array(FACE_STRIDE * 2).fill(1).fill(2, FACE_STRIDE);
+    history.push({ faces, keypoints: new Float32Array(0) }, 0);
+    assert.equal(history.faceCount(0), 2);
+    assert.ok(history.faceView(0).every(value => value === 1));
+    assert.equal(history.faceView(0).length, FACE_STRIDE);
+  });
+
+  test('views share memory with data', () => {
+    const history = new PoseHistory(2);
+    history.push(tick(1), 0);
+    history.keypointView(0)[0] = 42;
+    assert.equal(history.data[history.offset(0) + FACE_STRIDE], 42);
+    assert.equal(history.keypointView(0).length, HISTORY_KEYPOINTS * KEYPOINT_STRIDE);
+  });
+
+  test('indexSince searches across the wrap point', () => {
+    const history = new PoseHistory(4);
+    for (let i = 1; i <= 6; i++) history.push(tick(i), i * 100);
+    // Holds 300..600
+    assert.equal(history.indexSince(0), 0);
+    assert.equal(history.indexSince(300), 0);
+    assert.equal(history.indexSince(301), 1);
+    assert.equal(history.indexSince(600), 3);
+    assert.equal(history.indexSince(601), 4);
+  });
+
+  test('latestPoseIndex skips records without a pose', () => {
+    const history = new PoseHistory(4);
+    assert.equal(history.latestPoseIndex(), -1);
+    history.push(tick(1), 0);
+    history.push(tick(2, { pose: false }), 100);
+    history.push(tick(3, { pose: false }), 200);
+    assert.equal(history.latestPoseIndex(), 0);
+  });
+
+  test('clear empties the history', () => {
+    const history = new PoseHistory(2);
+    history.push(tick(1), 0);
+    history.push(tick(2), 100);
+    history.push(tick(3), 200);
+    history.clear();
+    assert.equal(history.length, 0);
+    assert.equal(history.indexSince(0), 0);
+    history.push(tick(4), 300);
+    assert.equal(history.time(0), 300);
+    assert.equal(history.faceView(0)[0], 4);
+  });
+});
@@ -0,0 +1,86 @@
+import assert from 'node:assert/strict';
+import { describe, test } from 'node:test';
+import { deskCropRect, drawMosaic, faceCropRect, fitRect, MOSAIC_LAYOUT } from '@/lib/roiMosaic';
+
+const WIDTH = 1280;
+const HEIGHT = 720;
+const face = (x1, y1, x2, y2) => ({ topLeft: [x1, y1], bottomRight: [x2, y2] });
+const approx = (actual, expected) => {
+  for (const key of Object.keys(expected)) {
+    assert.ok(Math.abs(actual[key] - expected[key]) < 1e-9, `${key}: ${actual[key]} != ${expected[key]}`);
+  }
+};
+
+describe('MOSAIC_LAYOUT', () => {
+  test('tiles cover the canvas without overlapping', () => {
+    const { width, height, face: faceTile, context, desk } = MOSAIC_LAYOUT;
+    assert.equal(faceTile.width + context.width, width);
+    assert.equal(context.x, faceTile.width);
+    assert.equal(desk.x, context.x);
+    assert.equal(desk.y, context.height);
+    assert.equal(context.height + desk.height, height);
+    assert.equal(faceTile.height, height);
+  });
+});
+
+describe('faceCropRect', () => {
+  test('pads the face box by half its size on each side', () => {
+    assert.deepEqual(faceCropRect(face(590, 310, 690, 410), WIDTH, HEIGHT), { x: 540, y: 260, width: 200, height: 200 });
+  });
+
+  test('squares a tall face box on its longer side', () => {
+    assert.deepEqual(faceCropRect(face(600, 300, 680, 420), WIDTH, HEIGHT), { x: 520, y: 240, width: 240, height: 240 });
+  });
+
+  test('shifts the crop back inside the frame at the edges', () => {
+    assert.deepEqual(faceCropRect(face(0, 0, 100, 100), WIDTH, HEIGHT), { x: 0, y: 0, width: 200, height: 200 });
+    assert.deepEqual(faceCropRect(face(1200, 650, 1280, 720), WIDTH, HEIGHT), { x: 1120, y: 560, width: 160, height: 160 });
+  });
+
+  test('shrinks the crop to the frame but keeps it square', () => {
+    // 600 px face pads to 1800 px; the frame is only 720 px high
+    assert.deepEqual(faceCropRect(face(340, 60, 940, 660), WIDTH, HEIGHT), { x: 280, y: 0, width: 720, height: 720 });
+  });
+});
+
+describe('deskCropRect', () => {
+  const { desk } = MOSAIC_LAYOUT;
+
+  test('is three face widths wide, starts at the chin and has the tile aspect', () => {
+    const rect = deskCropRect(face(590, 310, 690, 410), WIDTH, HEIGHT);
+    approx(rect, { x: 490, y: 410, width: 300, height: 300 * desk.height / desk.width });
+  });
+
+  test('moves up when the face is near the bottom of the frame', () => {
+    const rect = deskCropRect(face(590, 600, 690, 700), WIDTH, HEIGHT);
+    approx(rect, { y: HEIGHT - rect.height, width: 300 });
+    assert.ok(rect.y < 700);
+  });
+});
+
+describe('fitRect', () => {
+  test('fills a tile of the same aspect', () => {
+    assert.deepEqual(fitRect(WIDTH, HEIGHT, MOSAIC_LAYOUT.context), MOSAIC_LAYOUT.context);
+  });
+
+  test('letterboxes other aspects, centred in the tile', () => {
+    approx(fitRect(640, 480, MOSAIC_LAYOUT.context), { x: 352, y: 0, width: 192, height: 144 });
+    approx(fitRect(100, 400, { x: 0, y: 0, width: 200, height: 200 }), { x: 75, y: 0, width: 50, height: 200 });
+  });
+});
+
+describe('drawMosaic', () => {
+  test('clears the canvas and draws the three tiles', () => {
+    const calls = [];
+    const ctx = {
+      fillRect: (...args) => calls.push(['fillRect', ...args]),
+      drawImage: (source, ...args) => calls.push(['drawImage', ...args]),
+    };
+    drawMosaic(ctx, {}, WIDTH, HEIGHT, face(590, 310, 690, 410));
+    assert.deepEqual(calls[0], ['fillRect', 0, 0, 576, 320]);
+    assert.deepEqual(calls[1], ['drawImage', 540, 260, 200, 200, 0, 0, 320, 320]);
+    assert.deepEqual(calls[2], ['drawImage', 0, 0, WIDTH, HEIGHT, 320, 0, 256, 144]);
+    assert.deepEqual(calls[3].slice(5), [320, 144, 256, 176]);
+    assert.equal(calls.length, 4);
+  });
+});
@@ -0,0 +1,64 @@
+import assert from 'node:assert/strict';
+import { test } from 'node:test';
+import { RowHeights } from '@/lib/rowHeights';
+
+// Reference offsets by summing every row
+const offsets = heights => heights.reduce((acc, height) => [...acc, acc[acc.length - 1] + height], [0]);
+
+test('new rows start at the estimate', () => {
+  const rows = new RowHeights(40);
+  rows.setCount(5);
+  assert.equal(rows.count, 5);
+  assert.equal(rows.offset(3), 120);
+  assert.equal(rows.total(), 200);
+});
+
+test('measurements update offsets and lookups', () => {
+  const rows = new RowHeights(40);
+  const heights = [];
+  let seed = 7;
+  const random = () => (seed = (seed * 16807) % 2147483647) / 2147483647;
+  // Grow past the initial capacity in uneven steps, measuring as rows appear
+  for (const count of [3, 64, 65, 200, 500]) {
+    rows.setCount(count);
+    while (heights.length < count) heights.push(40);
+    for (let i = 0; i < 50; i++) {
+      const index = Math.floor(random() * count);
+      const height = 20 + Math.round(random() * 100);
+      assert.equal(rows.set(index, height), height !== heights[index]);
+      heights[index] = height;
+    }
+    const expected = offsets(heights);
+    for (let i = 0; i <= count; i++) assert.equal(rows.offset(i), expected[i]);
+    for (let i = 0; i < count; i++) {
+      assert.equal(rows.indexAt(expected[i]), i);
+      assert.equal(rows.indexAt(expected[i + 1] - 0.5), i);
+    }
+  }
+});
+
+test('ignores sub-pixel changes and rows out of range', () => {
+  const rows = new RowHeights(40);
+  rows.setCount(2);
+  assert.equal(rows.set(0, 40.3), false);
+  assert.equal(rows.set(2, 80), false);
+  assert.equal(rows.total(), 80);
+});
+
+test('indexAt clamps to the list', () => {
+  const rows = new RowHeights(40);
+  assert.equal(rows.indexAt(100), 0);
+  rows.setCount(3);
+  assert.equal(rows.indexAt(-10), 0);
+  assert.equal(rows.indexAt(1000), 2);
+});
+
+test('shrinking keeps the measured heights of the remaining rows', () => {
+  const rows = new RowHeights(40);
+  rows.setCount(4);
+  rows.set(1, 100);
+  rows.setCount(2);
+  assert.equal(rows.total(), 140);
+  rows.setCount(3);
+  assert.equal(rows.total(), 180);
+});
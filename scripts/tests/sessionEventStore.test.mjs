@@ -0,0 +1,87 @@
+import assert from 'node:assert/strict';
+import { describe, test } from 'node:test';
+import { ChunkedLog, SessionEventStore } from '@/lib/sessionEventStore';
+
+// Matches CHUNK_SIZE in the module
+const CHUNK = 256;
+const filled = count => {
+  const log = new ChunkedLog();
+  for (let i = 0; i < count; i++) assert.equal(log.push(i), i);
+  return log;
+};
+const nextFrame = () => new Promise(resolve => setTimeout(resolve, 20));
+const event = (isDangerous = false) => ({ at: 0, seconds: 0, timestamp: '00:00', description: 'x', isDangerous });
+
+describe('ChunkedLog', () => {
+  test('reads items on both sides of chunk boundaries', () => {
+    const log = filled(CHUNK * 2 + 1);
+    assert.equal(log.length, CHUNK * 2 + 1);
+    for (const index of [0, CHUNK - 1, CHUNK, CHUNK + 1, CHUNK * 2 - 1, CHUNK * 2]) {
+      assert.equal(log.get(index), index);
+    }
+    assert.equal(log.get(-1), undefined);
+    assert.equal(log.get(CHUNK * 2 + 1), undefined);
+  });
+
+  test('starts a new chunk exactly when the last one is full', () => {
+    const log = filled(CHUNK);
+    assert.equal(log.get(CHUNK), undefined);
+    log.push('next');
+    assert.equal(log.get(CHUNK - 1), CHUNK - 1);
+    assert.equal(log.get(CHUNK), 'next');
+  });
+
+  test('slices across chunks and clamps the range', () => {
+    const log = filled(CHUNK + 10);
+    assert.deepEqual(log.slice(CHUNK - 2, CHUNK + 2), [CHUNK - 2, CHUNK - 1, CHUNK, CHUNK + 1]);
+    assert.deepEqual(log.slice(CHUNK + 8), [CHUNK + 8, CHUNK + 9]);
+    assert.deepEqual(log.slice(-5, 2), [0, 1]);
+    assert.deepEqual(log.slice(CHUNK + 20), []);
+    assert.equal(log.slice().length, CHUNK + 10);
+  });
+
+  test('forEach visits every item in order with its index', () => {
+    const log = filled(CHUNK + 3);
+    let expected = 0;
+    log.forEach((item, index) => {
+      assert.equal(item, expected);
+      assert.equal(index, expected);
+      expected++;
+    });
+    assert.equal(expected, CHUNK + 3);
+  });
+
+  test('clear empties the log and restarts indexes', () => {
+    const log = filled(CHUNK + 1);
+    log.clear();
+    assert.equal(log.length, 0);
+    assert.equal(log.get(0), undefined);
+    assert.equal(log.push('a'), 0);
+    assert.equal(log.get(0), 'a');
+  });
+});
+
+describe('SessionEventStore', () => {
+  test('publishes one snapshot per frame however many appends arrive', async () => {
+    const store = new SessionEventStore();
+    let calls = 0;
+    store.subscribe(() => calls++);
+    store.appendEvent(event());
+    store.appendEvent(event(true));
+    store.appendStrike({ id: 1 });
+    assert.equal(store.getSnapshot().version, 0);
+
+    await nextFrame();
+    assert.equal(calls, 1);
+    assert.deepEqual(store.getSnapshot(), { version: 3, eventCount: 2, dangerousCount: 1, strikeCount: 1 });
+  });
+
+  test('clearEvents keeps strikes', async () => {
+    const store = new SessionEventStore();
+    store.appendEvent(event(true));
+    store.appendStrike({ id: 1 });
+    store.clearEvents();
+    await nextFrame();
+    assert.deepEqual(store.getSnapshot(), { version: 3, eventCount: 0, dangerousCount: 0, strikeCount: 1 });
+  });
+});
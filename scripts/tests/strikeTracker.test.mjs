@@ -0,0 +1,37 @@
+import assert from 'node:assert/strict';
+import { test } from 'node:test';
+import { StrikeTracker } from '@/lib/strikeTracker';
+
+const dangerous = description => ({ description, isDangerous: true });
+const formatTime = at => `t${at}`;
+
+test('ignores harmless events', () => {
+  const tracker = new StrikeTracker(3, formatTime);
+  assert.equal(tracker.record({ description: 'Typing', isDangerous: false }, 0), null);
+  assert.equal(tracker.count, 0);
+});
+
+test('warns below the limit, alerts once at it, then continues', () => {
+  const tracker = new StrikeTracker(3, formatTime);
+  const levels = [1, 2, 3, 4, 5].map(at => tracker.record(dangerous(`event ${at}`), at).level);
+  assert.deepEqual(levels, ['warning', 'warning', 'alert', 'continued', 'continued']);
+  assert.equal(tracker.count, 5);
+  assert.deepEqual(tracker.history[2], { time: 't3', reason: 'event 3' });
+});
+
+test('reports count, strike and history with each update', () => {
+  const tracker = new StrikeTracker(3, formatTime);
+  tracker.record(dangerous('first'), 10);
+  const update = tracker.record(dangerous('second'), 20);
+  assert.equal(update.count, 2);
+  assert.deepEqual(update.strike, { time: 't20', reason: 'second' });
+  assert.deepEqual(update.history.map(strike => strike.reason), ['first', 'second']);
+});
+
+test('reset starts a new session, with a new alert', () => {
+  const tracker = new StrikeTracker(1, formatTime);
+  assert.equal(tracker.record(dangerous('a'), 0).level, 'alert');
+  tracker.reset();
+  assert.equal(tracker.count, 0);
+  assert.equal(tracker.record(dangerous('b'), 1).level, 'alert');
+});
@@ -0,0 +1,108 @@
+import assert from 'node:assert/strict';
+import { describe, test } from 'node:test';
+import { binSpan, IntervalIndex, IntervalLog, TimelineBins } from '@/lib/timelineIndex';
+
+let seed = 11;
+const random = () => (seed = (seed * 16807) % 2147483647) / 2147483647;
+
+const randomSpans = count => Array.from({ length: count }, () => {
+  const start = random() * 3600;
+  return { start, end: start + random() * (random() < 0.1 ? 600 : 20) };
+});
+
+const overlapping = (spans, from, to) => spans
+  .map((span, id) => ({ ...span, id }))
+  .filter(span => span.start <= to && span.end >= from);
+
+describe('binSpan', () => {
+  test('rounds durations up to a power-of-two multiple of 64 s', () => {
+    assert.equal(binSpan(0), 64);
+    assert.equal(binSpan(64), 64);
+    assert.equal(binSpan(65), 128);
+    assert.equal(binSpan(3600), 4096);
+  });
+});
+
+describe('TimelineBins', () => {
+  test('only needs a reset when the duration outgrows the span or the width changes', () => {
+    const bins = new TimelineBins();
+    assert.equal(bins.needsReset(10, 100), true);
+    bins.reset(10, 100);
+    assert.equal(bins.needsReset(60, 100), false);
+    assert.equal(bins.needsReset(70, 100), true);
+    assert.equal(bins.needsReset(60, 120), true);
+
+    let resets = 0;
+    for (let duration = 1; duration <= 2 * 3600; duration++) {
+      if (bins.needsReset(duration, 100)) {
+        bins.reset(duration, 100);
+        resets++;
+      }
+    }
+    assert.equal(resets, 7);
+  });
+
+  test('projects bucket densities onto columns', () => {
+    const bins = new TimelineBins();
+    bins.reset(64, 32);
+    bins.add(0, 2, false);
+    bins.add(1, 3, true);
+    bins.add(40, 40, false);
+    assert.equal(bins.added, 3);
+    assert.equal(bins.maxDensity, 2);
+
+    // 32 s shown on 16 columns: 2 s per column
+    const columns = [];
+    bins.project(16, 32, (column, density, warnings) => columns.push([column, density, warnings]));
+    assert.deepEqual(columns, [[0, 2, 1], [1, 1, 1]]);
+
+    const all = [];
+    bins.project(32, 64, column => all.push(column));
+    assert.deepEqual(all, [0, 1, 20]);
+  });
+});
+
+describe('IntervalIndex', () => {
+  test('matches a linear scan', () => {
+    const spans = randomSpans(500);
+    const index = new IntervalIndex(spans);
+    assert.equal(index.size, 500);
+    for (let i = 0; i < 200; i++) {
+      const from = random() * 3700;
+      const to = from + (i % 2 ? 0 : random() * 60);
+      assert.deepEqual(
+        index.query(from, to).sort((a, b) => a - b),
+        overlapping(spans, from, to).map(span => span.id),
+      );
+    }
+  });
+});
+
+describe('IntervalLog', () => {
+  test('matches a linear scan as spans are appended, ordered by start', () => {
+    const spans = randomSpans(300);
+    const log = new IntervalLog();
+    spans.forEach((span, i) => {
+      log.add(span);
+      assert.equal(log.size, i + 1);
+      if (i % 25 !== 0) return;
+      const added = spans.slice(0, i + 1);
+      for (let q = 0; q < 20; q++) {
+        const from = random() * 3700;
+        const to = from + random() * 30;
+        const expected = overlapping(added, from, to)
+          .sort((a, b) => a.start - b.start || a.id - b.id)
+          .map(span => span.id);
+        assert.deepEqual(log.query(from, to), expected);
+      }
+    });
+  });
+
+  test('clear empties the log', () => {
+    const log = new IntervalLog();
+    log.add({ start: 0, end: 10 });
+    log.clear();
+    assert.equal(log.size, 0);
+    assert.deepEqual(log.query(5), []);
+  });
+});
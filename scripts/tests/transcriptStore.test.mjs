@@ -0,0 +1,72 @@
+import assert from 'node:assert/strict';
+import { describe, test } from 'node:test';
+import { TranscriptStore } from '@/lib/transcriptStore';
+
+// Segments a..e, each 1 s long, starting every 10 s from t=0
+const store = () => {
+  const transcript = new TranscriptStore();
+  for (const [index, word] of ['a', 'b', 'c', 'd', 'e'].entries()) {
+    transcript.append(word, index * 10000, index * 10000 + 1000);
+  }
+  return transcript;
+};
+
+describe('TranscriptStore', () => {
+  test('trims text, skips blank results and orders start before end', () => {
+    const transcript = new TranscriptStore();
+    transcript.append('  hello  ', 500, 200);
+    transcript.append('   ', 600);
+    assert.deepEqual(transcript.segmentsView(), [{ text: 'hello', start: 200, end: 200 }]);
+  });
+
+  test('indexSince finds the first segment ending at or after t', () => {
+    const transcript = store();
+    assert.equal(transcript.indexSince(0), 0);
+    assert.equal(transcript.indexSince(1000), 0);
+    assert.equal(transcript.indexSince(1001), 1);
+    assert.equal(transcript.indexSince(41001), 5);
+  });
+
+  test('window includes leadMs of speech before the first frame', () => {
+    const transcript = store();
+    assert.equal(transcript.window(30000, 30000, { leadMs: 0 }), 'd');
+    // c ends at 21000, inside the 15 s lead; b ends at 11000, outside it
+    assert.equal(transcript.window(30000, 30000), 'c d');
+    // A segment still being spoken at the lead boundary is kept
+    assert.equal(transcript.window(25500, 30000, { leadMs: 5000 }), 'c d');
+  });
+
+  test('window leaves out speech that started after the last frame', () => {
+    const transcript = store();
+    assert.equal(transcript.window(20000, 29999, { leadMs: 0 }), 'c');
+    assert.equal(transcript.window(20000, 30000, { leadMs: 0 }), 'c d');
+    // Without `to` everything after `from` counts
+    assert.equal(transcript.window(20000, undefined, { leadMs: 0 }), 'c d e');
+  });
+
+  test('window drops the oldest words to fit maxChars', () => {
+    const transcript = new TranscriptStore();
+    transcript.append('one two three', 0, 1000);
+    transcript.append('four five', 2000, 3000);
+    assert.equal(transcript.window(0, 3000, { maxChars: 100 }), 'one two three four five');
+    assert.equal(transcript.window(0, 3000, { maxChars: 15 }), 'three four five');
+    // Never cuts a word in half
+    assert.equal(transcript.window(0, 3000, { maxChars: 12 }), 'four five');
+    assert.equal(transcript.window(0, 3000, { maxChars: 4 }), 'five');
+  });
+
+  test('notifies subscribers on append and clear', () => {
+    const transcript = new TranscriptStore();
+    let calls = 0;
+    const unsubscribe = transcript.subscribe(() => calls++);
+    transcript.append('hi', 0);
+    transcript.append('', 0);
+    transcript.clear();
+    assert.equal(calls, 2);
+    assert.equal(transcript.getVersion(), 2);
+    assert.equal(transcript.length, 0);
+    unsubscribe();
+    transcript.append('again', 0);
+    assert.equal(calls, 2);
+  });
+});
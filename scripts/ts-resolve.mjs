@@ -0,0 +1,41 @@
+/**
+ * Module resolution hook for running the TypeScript sources under lib/ from
+ * Node benchmark scripts (Node 22.6+ with --experimental-strip-types).
+ *
+ * Resolves the `@/` path alias and extensionless relative imports to .ts
+ * files, mirroring what tsconfig/Next.js do for the app.
+ *
+ * Usage:
+ *   node --experimental-strip-types --import ./scripts/ts-resolve.mjs <script>
+ */
+
+import { register } from 'node:module';
+import { existsSync } from 'node:fs';
+import { fileURLToPath, pathToFileURL } from 'node:url';
+import path from 'node:path';
+
+const ROOT = path.resolve(path.dirname(fileURLToPath(import.meta.url)), '..');
+
+export async function resolve(specifier, context, nextResolve) {
+  let candidate = null;
+  if (specifier.startsWith('@/')) {
+    candidate = path.join(ROOT, specifier.slice(2));
+  } else if ((specifier.startsWith('./') || specifier.startsWith('../')) && context.parentURL?.startsWith('file:')) {
+    candidate = path.resolve(path.dirname(fileURLToPath(context.parentURL)), specifier);
+  }
+
+  if (candidate && !path.extname(candidate)) {
+    for (const file of [`${candidate}.ts`, path.join(candidate, 'index.ts')]) {
+      if (existsSync(file)) {
+        return nextResolve(pathToFileURL(file).href, context);
+      }
+    }
+  } else if (candidate) {
+    return nextResolve(pathToFileURL(candidate).href, context);
+  }
+  return nextResolve(specifier, context);
+}
+
+if (!import.meta.url.includes('?hooks')) {
+  register(`${import.meta.url}?hooks`, import.meta.url);
+}